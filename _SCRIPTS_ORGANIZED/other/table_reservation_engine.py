@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+"""
+🎱 Table Reservation Engine - conflict checks, day availability, bulk import
+Companion of deploy_table_reservations.py for the overlap guard in
+supabase/migrations/20251210060000_add_table_reservation_overlap_guard.sql:
+
+- check:    finds overlapping active reservations (the exclusion constraint
+            cannot be added while any exist)
+- deploy:   check, then apply the migration
+- day:      every hourly slot of a day with its free tables, one call to
+            get_table_availability_day()
+- import:   validates a CSV of reservations in memory - table numbers,
+            durations, overlaps with existing bookings and with each other
+            (interval tree per club table) - then writes them in one INSERT
+
+Import CSV columns: club_id, user_id, table_number, start_time, end_time and
+optionally price_per_hour, status, payment_status, notes, number_of_players.
+Times without an offset are read in --timezone. Imported reservations are
+'confirmed' unless the file says otherwise (pending + unpaid ones are
+cancelled by auto_cancel_expired_reservations() after 30 minutes).
+
+Usage:
+    python _SCRIPTS_ORGANIZED/other/table_reservation_engine.py check
+    python _SCRIPTS_ORGANIZED/other/table_reservation_engine.py deploy
+    python _SCRIPTS_ORGANIZED/other/table_reservation_engine.py day <club_id> 2025-12-20 --duration=2
+    python _SCRIPTS_ORGANIZED/other/table_reservation_engine.py import reservations.csv [--dry-run] [--skip-conflicts]
+"""
+
+import csv
+import os
+import random
+import sys
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import ROUND_HALF_UP, Decimal
+
+import psycopg2
+from psycopg2 import errors
+from psycopg2.extras import execute_values
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DEFAULTS = {
+    'db': '',
+    'duration': 2.0,          # hours per slot, same default as getAvailableSlots
+    'first-hour': 8,
+    'last-hour': 22,
+    'timezone': '+07:00',     # offset for import times without one
+    'price': 50000.0,         # price_per_hour when neither file nor club has one
+}
+
+MIGRATION = 'supabase/migrations/20251210060000_add_table_reservation_overlap_guard.sql'
+
+# Same statuses the exclusion constraint ignores
+INACTIVE = ('cancelled', 'no_show')
+STATUSES = ('pending', 'confirmed', 'cancelled', 'completed', 'no_show')
+PAYMENT_STATUSES = ('unpaid', 'deposit_paid', 'fully_paid', 'refunded')
+MAX_HOURS = 24
+
+IMPORT_COLUMNS = (
+    'club_id', 'user_id', 'table_number', 'start_time', 'end_time', 'duration_hours',
+    'price_per_hour', 'total_price', 'status', 'payment_status', 'notes', 'number_of_players',
+)
+
+
+def option(name):
+    """--name=value from sys.argv, typed like its default"""
+    default = DEFAULTS[name]
+    for arg in sys.argv[1:]:
+        if arg.startswith(f'--{name}='):
+            return type(default)(arg.split('=', 1)[1])
+    return default
+
+
+def connect():
+    return psycopg2.connect(option('db') or os.getenv('SUPABASE_DB_TRANSACTION_URL'))
+
+
+# ---------------------------------------------------------------------------
+# Interval tree
+# ---------------------------------------------------------------------------
+
+class _Node:
+    __slots__ = ('start', 'end', 'item', 'priority', 'max_end', 'left', 'right')
+
+    def __init__(self, start, end, item):
+        self.start = start
+        self.end = end
+        self.item = item
+        self.priority = random.random()
+        self.max_end = end
+        self.left = None
+        self.right = None
+
+
+class IntervalTree:
+    """Half-open [start, end) intervals in a randomized treap ordered by
+    start, each node keeping the largest end of its subtree. add() and
+    overlaps() are O(log n) expected (+ matches)."""
+
+    def __init__(self):
+        self.root = None
+        self.size = 0
+
+    def add(self, start, end, item=None):
+        self.root = self._insert(self.root, _Node(start, end, item))
+        self.size += 1
+
+    def overlaps(self, start, end):
+        """Items of all intervals overlapping [start, end)"""
+        found = []
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            # Nothing in this subtree ends after start
+            if node is None or node.max_end <= start:
+                continue
+            stack.append(node.left)
+            # Right subtree starts at node.start or later
+            if node.start < end:
+                if node.end > start:
+                    found.append(node.item)
+                stack.append(node.right)
+        return found
+
+    def _insert(self, node, new):
+        if node is None:
+            return new
+        if new.start < node.start:
+            node.left = self._insert(node.left, new)
+            if node.left.priority > node.priority:
+                node = self._rotate_right(node)
+        else:
+            node.right = self._insert(node.right, new)
+            if node.right.priority > node.priority:
+                node = self._rotate_left(node)
+        self._update(node)
+        return node
+
+    @staticmethod
+    def _update(node):
+        node.max_end = node.end
+        if node.left and node.left.max_end > node.max_end:
+            node.max_end = node.left.max_end
+        if node.right and node.right.max_end > node.max_end:
+            node.max_end = node.right.max_end
+
+    def _rotate_right(self, node):
+        pivot = node.left
+        node.left = pivot.right
+        pivot.right = node
+        self._update(node)
+        self._update(pivot)
+        return pivot
+
+    def _rotate_left(self, node):
+        pivot = node.right
+        node.right = pivot.left
+        pivot.left = node
+        self._update(node)
+        self._update(pivot)
+        return pivot
+
+
+# ---------------------------------------------------------------------------
+# Check / deploy
+# ---------------------------------------------------------------------------
+
+def find_overlaps(cur):
+    """(existing, new) id pairs of overlapping active reservations"""
+    cur.execute("""
+        SELECT id::text, club_id::text, table_number, start_time, end_time
+        FROM table_reservations
+        WHERE status NOT IN %s
+        ORDER BY club_id, table_number, start_time
+    """, (INACTIVE,))
+    trees = {}
+    pairs = []
+    rows = 0
+    for rid, club_id, table_number, start, end in cur:
+        rows += 1
+        tree = trees.setdefault((club_id, table_number), IntervalTree())
+        for other in tree.overlaps(start, end):
+            pairs.append((club_id, table_number, other, rid))
+        tree.add(start, end, rid)
+    return rows, pairs
+
+
+def check(conn):
+    with conn.cursor() as cur:
+        rows, pairs = find_overlaps(cur)
+    print(f'🔍 {rows:,} active reservations checked')
+    for club_id, table_number, first, second in pairs[:50]:
+        print(f'   ❌ club {club_id[:8]} table {table_number}: {first} overlaps {second}')
+    if len(pairs) > 50:
+        print(f'   ... {len(pairs) - 50:,} more')
+    print('✅ No overlapping reservations' if not pairs
+          else f'⚠️  {len(pairs):,} overlapping pairs - cancel or move them before deploying')
+    return not pairs
+
+
+def deploy(conn):
+    if not check(conn):
+        return
+    with open(MIGRATION, 'r', encoding='utf-8') as f:
+        sql = f.read()
+    print(f'\n📄 Applying {MIGRATION}')
+    with conn.cursor() as cur:
+        cur.execute(sql)
+    conn.commit()
+    print('✅ Overlap guard deployed')
+
+
+# ---------------------------------------------------------------------------
+# Day availability
+# ---------------------------------------------------------------------------
+
+def day(conn, club_id, date):
+    with conn.cursor() as cur:
+        cur.execute('SELECT name, total_tables FROM clubs WHERE id = %s', (club_id,))
+        club = cur.fetchone()
+        if not club:
+            print(f'❌ Club {club_id} not found')
+            return
+        name, total_tables = club
+        cur.execute('SELECT * FROM get_table_availability_day(%s, %s, %s, %s, %s)',
+                    (club_id, date, option('duration'), option('first-hour'), option('last-hour')))
+        slots = cur.fetchall()
+
+    print(f"📅 {name} - {date}, {total_tables} tables, {option('duration'):g}h slots")
+    print('   slot         free ' + ''.join(f'{n % 10}' for n in range(1, (total_tables or 0) + 1)))
+    for slot_start, slot_end, free in slots:
+        free = set(free or [])
+        grid = ''.join('·' if n in free else '█' for n in range(1, (total_tables or 0) + 1))
+        print(f'   {slot_start:%H:%M}-{slot_end:%H:%M} {len(free):>5} {grid}')
+
+
+# ---------------------------------------------------------------------------
+# Import
+# ---------------------------------------------------------------------------
+
+def parse_time(value, default_tz):
+    parsed = datetime.fromisoformat(value.strip())
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=default_tz)
+
+
+def parse_offset(value):
+    sign = -1 if value.startswith('-') else 1
+    hours, minutes = value.lstrip('+-').split(':')
+    return timezone(sign * timedelta(hours=int(hours), minutes=int(minutes)))
+
+
+def read_import(path):
+    """(line, record, problems) per CSV row; record is None when unusable"""
+    default_tz = parse_offset(option('timezone'))
+    parsed = []
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        for line, row in enumerate(csv.DictReader(f), start=2):
+            problems = []
+            try:
+                record = {
+                    'club_id': str(uuid.UUID(row['club_id'].strip())),
+                    'user_id': str(uuid.UUID(row['user_id'].strip())),
+                    'table_number': int(row['table_number']),
+                    'start_time': parse_time(row['start_time'], default_tz),
+                    'end_time': parse_time(row['end_time'], default_tz),
+                    'price_per_hour': Decimal(row['price_per_hour']) if row.get('price_per_hour') else None,
+                    'status': (row.get('status') or 'confirmed').strip(),
+                    'payment_status': (row.get('payment_status') or 'unpaid').strip(),
+                    'notes': row.get('notes') or None,
+                    'number_of_players': int(row['number_of_players']) if row.get('number_of_players') else 2,
+                }
+            except (KeyError, ValueError, ArithmeticError) as e:
+                parsed.append((line, None, [f'unreadable row: {e}']))
+                continue
+
+            hours = (record['end_time'] - record['start_time']).total_seconds() / 3600
+            if hours <= 0:
+                problems.append('end_time is not after start_time')
+            elif hours > MAX_HOURS:
+                problems.append(f'longer than {MAX_HOURS}h')
+            if record['status'] not in STATUSES:
+                problems.append(f"unknown status {record['status']}")
+            if record['payment_status'] not in PAYMENT_STATUSES:
+                problems.append(f"unknown payment_status {record['payment_status']}")
+            record['duration_hours'] = Decimal(str(hours)).quantize(Decimal('0.1'), ROUND_HALF_UP)
+            parsed.append((line, record, problems))
+    return parsed
+
+
+def load_context(cur, records):
+    """Clubs (total_tables, price_per_hour), known users and the active
+    reservations that fall inside the import's time window, one query each"""
+    club_ids = sorted({r['club_id'] for r in records})
+    cur.execute('SELECT id::text, total_tables, price_per_hour FROM clubs WHERE id = ANY(%s::uuid[])', (club_ids,))
+    clubs = {cid: (tables or 1, price) for cid, tables, price in cur.fetchall()}
+    cur.execute('SELECT id::text FROM auth.users WHERE id = ANY(%s::uuid[])',
+                (sorted({r['user_id'] for r in records}),))
+    users = {r[0] for r in cur.fetchall()}
+
+    trees = {}
+    cur.execute("""
+        SELECT id::text, club_id::text, table_number, start_time, end_time
+        FROM table_reservations
+        WHERE club_id = ANY(%s::uuid[])
+          AND status NOT IN %s
+          AND tstzrange(start_time, end_time, '[)') && tstzrange(%s, %s, '[)')
+    """, (club_ids, INACTIVE,
+          min(r['start_time'] for r in records), max(r['end_time'] for r in records)))
+    existing = 0
+    for rid, club_id, table_number, start, end in cur.fetchall():
+        trees.setdefault((club_id, table_number), IntervalTree()).add(start, end, f'reservation {rid}')
+        existing += 1
+    return clubs, users, trees, existing
+
+
+def validate(parsed, clubs, users, trees):
+    """Adds table-range and overlap problems; accepted rows join the trees
+    so later lines are checked against them too"""
+    for line, record, problems in parsed:
+        if record is None:
+            continue
+        club = clubs.get(record['club_id'])
+        if club is None:
+            problems.append('unknown club')
+        elif not 1 <= record['table_number'] <= club[0]:
+            problems.append(f"table {record['table_number']} outside 1..{club[0]}")
+        if record['user_id'] not in users:
+            problems.append('unknown user')
+        if problems or record['status'] in INACTIVE:
+            continue
+
+        tree = trees.setdefault((record['club_id'], record['table_number']), IntervalTree())
+        conflicts = tree.overlaps(record['start_time'], record['end_time'])
+        if conflicts:
+            problems.append('overlaps ' + ', '.join(conflicts[:3]) + (' ...' if len(conflicts) > 3 else ''))
+        else:
+            tree.add(record['start_time'], record['end_time'], f'line {line}')
+
+
+def insert_reservations(conn, records, clubs):
+    rows = []
+    for r in records:
+        price = r['price_per_hour'] or clubs[r['club_id']][1] or Decimal(str(option('price')))
+        total = (Decimal(price) * Decimal(r['duration_hours'])).quantize(Decimal('0.01'), ROUND_HALF_UP)
+        rows.append((r['club_id'], r['user_id'], r['table_number'], r['start_time'], r['end_time'],
+                     r['duration_hours'], price, total, r['status'], r['payment_status'],
+                     r['notes'], r['number_of_players']))
+    with conn.cursor() as cur:
+        execute_values(cur, f"""
+            INSERT INTO table_reservations ({', '.join(IMPORT_COLUMNS)})
+            VALUES %s
+        """, rows, page_size=1000)
+    conn.commit()
+    return len(rows)
+
+
+def import_reservations(conn, path):
+    dry_run = '--dry-run' in sys.argv
+    skip_conflicts = '--skip-conflicts' in sys.argv
+
+    parsed = read_import(path)
+    records = [record for _, record, _ in parsed if record is not None]
+    if not records:
+        print(f'📭 No readable reservations in {path}')
+        return
+    with conn.cursor() as cur:
+        clubs, users, trees, existing = load_context(cur, records)
+    conn.commit()
+    validate(parsed, clubs, users, trees)
+
+    bad = [(line, problems) for line, _, problems in parsed if problems]
+    good = [record for _, record, problems in parsed if record is not None and not problems]
+    print(f'📥 {path}: {len(parsed):,} rows, {len(clubs)} clubs, {existing:,} existing reservations in the window')
+    for line, problems in bad[:50]:
+        print(f"   ❌ line {line}: {'; '.join(problems)}")
+    if len(bad) > 50:
+        print(f'   ... {len(bad) - 50:,} more')
+    print(f'\n   Valid:    {len(good):,}')
+    print(f'   Rejected: {len(bad):,}')
+
+    if not good:
+        return
+    if bad and not skip_conflicts:
+        print('\n⚠️  Nothing written - fix the rows above or run with --skip-conflicts')
+        return
+    if dry_run:
+        print('\n💡 Dry run - no reservations written')
+        return
+
+    try:
+        written = insert_reservations(conn, good, clubs)
+    except errors.ExclusionViolation as e:
+        conn.rollback()
+        print(f'\n❌ A table was booked while importing, nothing written: {e.diag.message_detail}')
+        return
+    print(f'\n✅ Imported {written:,} reservations')
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    command = args[0] if args else ''
+    if command not in ('check', 'deploy', 'day', 'import') or \
+            (command == 'day' and len(args) < 3) or (command == 'import' and len(args) < 2):
+        print(__doc__)
+        return
+
+    conn = connect()
+    try:
+        if command == 'check':
+            check(conn)
+        elif command == 'deploy':
+            deploy(conn)
+        elif command == 'day':
+            day(conn, args[1], args[2])
+        else:
+            import_reservations(conn, args[1])
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except Exception as e:
+        print(f'\n❌ ERROR: {e}')
+        import traceback
+        traceback.print_exc()
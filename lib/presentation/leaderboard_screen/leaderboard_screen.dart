@@ -89,9 +89,9 @@ class _LeaderboardScreenState extends State<LeaderboardScreen>
         _error = null;
       });
 
-      // Call Supabase function for leaderboard
+      // Precomputed leaderboard (falls back to get_leaderboard until built)
       final response = await Supabase.instance.client.rpc(
-        'get_leaderboard',
+        'get_leaderboard_snapshot',
         params: {
           'board_type': _currentSort,
           'rank_filter': _currentFilter == 'all' ? null : _currentFilter,
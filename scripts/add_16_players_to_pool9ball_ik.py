@@ -8,6 +8,8 @@ import os
 import psycopg2
 from dotenv import load_dotenv
 import uuid
+from player_name_index import best_match, generate_username, resolve_player_names
+from reconcile_participant_counts import reconcile_participant_counts
 
 load_dotenv()
 
@@ -31,16 +33,6 @@ PLAYERS = [
     {"name": "Xin Con 1", "rank": "K"},
 ]
 
-def generate_username(name):
-    """Generate a username from display name"""
-    # Remove Vietnamese accents and convert to lowercase
-    import unicodedata
-    normalized = unicodedata.normalize('NFD', name)
-    ascii_name = ''.join(c for c in normalized if unicodedata.category(c) != 'Mn')
-    # Replace spaces with underscores and make lowercase
-    username = ascii_name.lower().replace(' ', '_')
-    return username
-
 def add_players_to_tournament():
     conn = psycopg2.connect(os.getenv('SUPABASE_DB_TRANSACTION_URL'))
     cur = conn.cursor()
@@ -73,7 +65,10 @@ def add_players_to_tournament():
     print(f'   ID: {tournament_id}')
     print(f'   Current participants: {current_participants}/{max_participants}\n')
     
-    # 2. Process each player
+    # 2. Resolve every name in one accent-insensitive lookup
+    resolved = resolve_player_names(cur, [p["name"] for p in PLAYERS])
+
+    # 3. Process each player
     added_count = 0
     for i, player in enumerate(PLAYERS, 1):
         name = player["name"]
@@ -83,16 +78,11 @@ def add_players_to_tournament():
         print(f'{i:2}. Processing: {name} ({rank})')
         
         # Check if user exists
-        cur.execute("""
-            SELECT id, display_name, username FROM users 
-            WHERE username = %s OR display_name = %s
-            LIMIT 1
-        """, (username, name))
-        existing_user = cur.fetchone()
+        existing_user = best_match(resolved[name])
         
         if existing_user:
-            user_id = existing_user[0]
-            print(f'    ✓ User exists: {existing_user[1]} (@{existing_user[2]})')
+            user_id = existing_user.user_id
+            print(f'    ✓ User exists: {existing_user.matched_name} (@{existing_user.username}) [{existing_user.score:.2f}]')
         else:
             # Create new user with generated email (required by constraint)
             user_id = str(uuid.uuid4())
@@ -159,16 +149,8 @@ def add_players_to_tournament():
         # Commit after each player to avoid FK issues with triggers
         conn.commit()
     
-    # 3. Update tournament participant count
-    cur.execute("""
-        UPDATE tournaments 
-        SET current_participants = (
-            SELECT COUNT(*) FROM tournament_participants 
-            WHERE tournament_id = %s AND status = 'registered'
-        ),
-        updated_at = NOW()
-        WHERE id = %s
-    """, (tournament_id, tournament_id))
+    # 4. Update tournament participant count (triggers were off)
+    reconcile_participant_counts(cur, [tournament_id])
     
     # Get final count
     cur.execute("""
@@ -1,18 +1,35 @@
 #!/usr/bin/env python3
 """
-🖼️ Add Avatars to Tournament Players
-Updates avatar_url for all players in POOL 9 BALL RANK I-K
+🖼️ Add Avatars to Players
+Assigns a DiceBear avatar to every user that has no avatar or a generated one.
+
+- The style and seed come from a hash of the user id, so reruns produce the
+  same URL and unchanged rows are never written (updated_at and client caches
+  stay untouched)
+- URLs are computed locally and written with one UPDATE ... FROM unnest(...)
+  per batch of users
+- Uploaded avatars (anything not served by DiceBear) are left alone
+
+Usage:
+    python scripts/add_avatars_to_players.py                 # whole users table
+    python scripts/add_avatars_to_players.py "POOL 9 BALL RANK I-K"
+    python scripts/add_avatars_to_players.py --dry-run
 """
 
 import os
+import sys
 import psycopg2
 from dotenv import load_dotenv
 import hashlib
 
 load_dotenv()
 
+BATCH_SIZE = 1000
+DICEBEAR_PREFIX = 'https://api.dicebear.com/'
+
 # Avatar styles to use (DiceBear API)
 # Styles: adventurer, avataaars, big-smile, bottts, croodles, fun-emoji, lorelei, micah, miniavs, notionists, open-peeps, personas, pixel-art, thumbs
+# Styles are picked by hash index - appending one reassigns existing avatars
 AVATAR_STYLES = [
     'adventurer',
     'avataaars', 
@@ -24,62 +41,91 @@ AVATAR_STYLES = [
     'thumbs'
 ]
 
-def generate_avatar_url(name, seed=None):
-    """Generate avatar URL using DiceBear API"""
-    import random
-    style = random.choice(AVATAR_STYLES)
-    # Use name as seed for consistent avatars
-    seed_value = seed or name.replace(' ', '-')
-    return f"https://api.dicebear.com/7.x/{style}/svg?seed={seed_value}&backgroundColor=b6e3f4,c0aede,d1d4f9,ffd5dc,ffdfbf"
+def generate_avatar_url(user_id):
+    """Deterministic DiceBear avatar URL for a user id"""
+    digest = hashlib.sha256(str(user_id).encode()).hexdigest()
+    style = AVATAR_STYLES[int(digest[:8], 16) % len(AVATAR_STYLES)]
+    return f"{DICEBEAR_PREFIX}7.x/{style}/svg?seed={digest[:16]}&backgroundColor=b6e3f4,c0aede,d1d4f9,ffd5dc,ffdfbf"
+
+
+def fetch_batches(cur, tournament_title=None):
+    """Yield batches of (id, avatar_url) with keyset pagination on id"""
+    last_id = None
+    while True:
+        cur.execute("""
+            SELECT u.id, u.avatar_url
+            FROM users u
+            WHERE (%(last_id)s::uuid IS NULL OR u.id > %(last_id)s::uuid)
+              AND (u.avatar_url IS NULL OR u.avatar_url = '' OR u.avatar_url LIKE %(prefix)s)
+              AND (%(title)s::text IS NULL OR EXISTS (
+                    SELECT 1
+                    FROM tournament_participants tp
+                    JOIN tournaments t ON t.id = tp.tournament_id
+                    WHERE tp.user_id = u.id AND t.title ILIKE %(title)s))
+            ORDER BY u.id
+            LIMIT %(limit)s
+        """, {
+            'last_id': last_id,
+            'prefix': DICEBEAR_PREFIX + '%',
+            'title': f'%{tournament_title}%' if tournament_title else None,
+            'limit': BATCH_SIZE,
+        })
+        rows = cur.fetchall()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1][0]
+
+
+def apply_avatar_batch(cur, changes):
+    """Write one batch of (id, url) pairs, returns the number of rows changed"""
+    cur.execute("""
+        UPDATE users u
+        SET avatar_url = c.avatar_url, updated_at = NOW()
+        FROM unnest(%s::uuid[], %s::text[]) AS c(id, avatar_url)
+        WHERE u.id = c.id AND u.avatar_url IS DISTINCT FROM c.avatar_url
+    """, ([c[0] for c in changes], [c[1] for c in changes]))
+    return cur.rowcount
+
 
 def update_player_avatars():
+    dry_run = '--dry-run' in sys.argv
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    tournament_title = args[0] if args else None
+
     conn = psycopg2.connect(os.getenv('SUPABASE_DB_TRANSACTION_URL'))
     cur = conn.cursor()
-    
-    print('🖼️ Adding Avatars to Tournament Players\n')
-    
-    # Find players in the tournament
-    cur.execute("""
-        SELECT u.id, u.display_name, u.username, u.avatar_url
-        FROM users u
-        JOIN tournament_participants tp ON tp.user_id = u.id
-        JOIN tournaments t ON t.id = tp.tournament_id
-        WHERE t.title ILIKE '%POOL 9 BALL RANK I-K%'
-        ORDER BY tp.seed_number
-    """)
-    players = cur.fetchall()
-    
-    if not players:
-        print('❌ No players found in tournament!')
-        return
-    
-    print(f'Found {len(players)} players\n')
-    
-    updated_count = 0
-    for i, (user_id, display_name, username, current_avatar) in enumerate(players, 1):
-        # Generate new avatar
-        avatar_url = generate_avatar_url(display_name or username, seed=str(i))
-        
-        # Update user
-        cur.execute("""
-            UPDATE users 
-            SET avatar_url = %s, updated_at = NOW()
-            WHERE id = %s
-        """, (avatar_url, user_id))
-        
-        status = "🔄 Updated" if current_avatar else "✅ Added"
-        print(f'{i:2}. {display_name or username}: {status}')
-        print(f'    {avatar_url[:60]}...')
-        updated_count += 1
-    
-    conn.commit()
+
+    scope = f'players in "{tournament_title}"' if tournament_title else 'all users'
+    print(f'🖼️ Assigning avatars to {scope}\n')
+
+    scanned = added = replaced = 0
+    for rows in fetch_batches(cur, tournament_title):
+        scanned += len(rows)
+        changes = []
+        for user_id, current_avatar in rows:
+            avatar_url = generate_avatar_url(user_id)
+            if avatar_url != current_avatar:
+                changes.append((user_id, avatar_url))
+                if current_avatar:
+                    replaced += 1
+                else:
+                    added += 1
+        if changes and not dry_run:
+            apply_avatar_batch(cur, changes)
+            conn.commit()
+        print(f'   📦 {scanned} scanned, {added + replaced} to write')
+
     cur.close()
     conn.close()
-    
+
     print('\n' + '='*60)
-    print('🎉 AVATARS ADDED SUCCESSFULLY!')
+    print('🎉 AVATARS UP TO DATE!' if not dry_run else '🔍 DRY RUN - NOTHING WRITTEN')
     print('='*60)
-    print(f'\n📊 Updated {updated_count} players with avatars')
+    print(f'\n📊 Scanned:   {scanned}')
+    print(f'   ✅ Added:    {added}')
+    print(f'   🔄 Replaced: {replaced}')
+    print(f'   ⏭️ Unchanged: {scanned - added - replaced}')
     print('\n💡 Tip: Refresh the app to see the new avatars!')
 
 if __name__ == '__main__':
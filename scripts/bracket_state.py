@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+🎱 Bracket State - snapshot, restore and reset a tournament's matches
+- snapshot: COPY every match row of a tournament to a gzipped CSV file
+- restore:  COPY the file into a temp table, then one UPDATE ... FROM (plus
+            INSERT/DELETE for matches created or removed since the snapshot)
+- reset:    one UPDATE back to "round 1 seeded" for any format: entry matches
+            keep their players, every other match is emptied
+
+Entry matches are the ones no other match advances into (for SABO formats
+WB R1 and nothing else), the group stage when there is one, or the lowest
+round_number for formats without advancement links.
+
+Usage:
+    python scripts/bracket_state.py snapshot <tournament_id> [file.csv.gz]
+    python scripts/bracket_state.py restore <file.csv.gz> [--dry-run] [--no-triggers]
+    python scripts/bracket_state.py reset <tournament_id> [--dry-run]
+
+--no-triggers skips match triggers (stats, notifications) while restoring;
+it needs a role that may set session_replication_role.
+"""
+
+import gzip
+import os
+import sys
+from datetime import datetime
+
+import psycopg2
+from psycopg2 import sql
+from dotenv import load_dotenv
+
+load_dotenv()
+
+SNAPSHOT_DIR = 'bracket_snapshots'
+
+RESET_SQL = """
+    WITH t AS (
+        SELECT id, display_order, round_number, bracket_type,
+               winner_advances_to, loser_advances_to
+        FROM matches
+        WHERE tournament_id = %(tid)s
+    ),
+    targets AS (
+        SELECT winner_advances_to AS display_order FROM t WHERE winner_advances_to IS NOT NULL
+        UNION
+        SELECT loser_advances_to FROM t WHERE loser_advances_to IS NOT NULL
+    ),
+    info AS (
+        SELECT EXISTS (SELECT 1 FROM targets) AS linked,
+               bool_or(bracket_type = 'groups') AS grouped,
+               min(round_number) AS first_round
+        FROM t
+    ),
+    entry AS (
+        SELECT t.id,
+               CASE WHEN info.grouped THEN t.bracket_type IS NOT DISTINCT FROM 'groups'
+                    WHEN info.linked THEN t.display_order NOT IN (SELECT display_order FROM targets)
+                    ELSE t.round_number = info.first_round
+               END AS is_entry
+        FROM t, info
+    )
+    UPDATE matches m
+    SET player1_id = CASE WHEN e.is_entry THEN m.player1_id END,
+        player2_id = CASE WHEN e.is_entry THEN m.player2_id END,
+        player1_score = NULL,
+        player2_score = NULL,
+        winner_id = NULL,
+        status = 'pending',
+        start_time = NULL,
+        end_time = NULL,
+        updated_at = NOW()
+    FROM entry e
+    WHERE m.id = e.id
+    RETURNING e.is_entry, m.player1_id IS NOT NULL AND m.player2_id IS NOT NULL
+"""
+
+
+def match_columns(cur):
+    """Storable columns of matches, in table order"""
+    cur.execute("""
+        SELECT attname FROM pg_attribute
+        WHERE attrelid = 'public.matches'::regclass
+          AND attnum > 0 AND NOT attisdropped AND attgenerated = ''
+        ORDER BY attnum
+    """)
+    return [r[0] for r in cur.fetchall()]
+
+
+def snapshot_bracket(cur, tournament_id, path):
+    """Write every match of the tournament to path (gzipped CSV with header)"""
+    columns = sql.SQL(', ').join(map(sql.Identifier, match_columns(cur)))
+    query = sql.SQL(
+        'COPY (SELECT {} FROM matches WHERE tournament_id = {} ORDER BY display_order, match_number) '
+        'TO STDOUT WITH (FORMAT csv, HEADER true)'
+    ).format(columns, sql.Literal(tournament_id))
+    with gzip.open(path, 'wt', encoding='utf-8', newline='') as f:
+        cur.copy_expert(query.as_string(cur), f)
+    cur.execute('SELECT count(*) FROM matches WHERE tournament_id = %s', (tournament_id,))
+    return cur.fetchone()[0]
+
+
+def restore_bracket(cur, path):
+    """Restore a snapshot in the caller's transaction.
+
+    Returns (tournament_id, updated, inserted, deleted).
+    """
+    with gzip.open(path, 'rt', encoding='utf-8', newline='') as f:
+        header = f.readline().strip().split(',')
+    # Columns dropped from matches since the snapshot are ignored
+    known = set(match_columns(cur))
+    columns = [c for c in header if c in known]
+    if 'id' not in columns or 'tournament_id' not in columns:
+        raise ValueError(f'{path} is not a bracket snapshot')
+    # The rest still has to be read from the file, into throwaway columns
+    load_columns = [c if c in columns else f'_ignored_{i}' for i, c in enumerate(header)]
+
+    cur.execute(sql.SQL("""
+        CREATE TEMP TABLE bracket_restore ON COMMIT DROP AS
+        SELECT {} FROM matches WITH NO DATA
+    """).format(sql.SQL(', ').join(map(sql.Identifier, columns))))
+    for name in load_columns:
+        if name not in columns:
+            cur.execute(sql.SQL('ALTER TABLE bracket_restore ADD COLUMN {} text').format(sql.Identifier(name)))
+    with gzip.open(path, 'rt', encoding='utf-8', newline='') as f:
+        cur.copy_expert(sql.SQL('COPY bracket_restore ({}) FROM STDIN WITH (FORMAT csv, HEADER true)').format(
+            sql.SQL(', ').join(map(sql.Identifier, load_columns))).as_string(cur), f)
+
+    cur.execute('SELECT DISTINCT tournament_id::text FROM bracket_restore')
+    tournaments = [r[0] for r in cur.fetchall()]
+    if len(tournaments) != 1:
+        raise ValueError(f'{path} must contain exactly one tournament, found {len(tournaments)}')
+    tournament_id = tournaments[0]
+
+    cols = sql.SQL(', ').join(map(sql.Identifier, columns))
+    updatable = [c for c in columns if c != 'id']
+    params = {'tid': tournament_id}
+
+    cur.execute("""
+        DELETE FROM matches m
+        WHERE m.tournament_id = %(tid)s
+          AND NOT EXISTS (SELECT 1 FROM bracket_restore r WHERE r.id = m.id)
+    """, params)
+    deleted = cur.rowcount
+
+    cur.execute(sql.SQL("""
+        UPDATE matches m
+        SET ({cols}) = ROW({values})
+        FROM bracket_restore r
+        WHERE m.id = r.id
+    """).format(
+        cols=sql.SQL(', ').join(map(sql.Identifier, updatable)),
+        values=sql.SQL(', ').join(sql.SQL('r.{}').format(sql.Identifier(c)) for c in updatable),
+    ))
+    updated = cur.rowcount
+
+    cur.execute(sql.SQL("""
+        INSERT INTO matches ({cols})
+        SELECT {cols} FROM bracket_restore r
+        WHERE NOT EXISTS (SELECT 1 FROM matches m WHERE m.id = r.id)
+    """).format(cols=cols))
+    inserted = cur.rowcount
+
+    return tournament_id, updated, inserted, deleted
+
+
+def reset_bracket(cur, tournament_id):
+    """Reset to round 1 seeded in one statement, returns (entry, seeded_entry, emptied)"""
+    cur.execute(RESET_SQL, {'tid': tournament_id})
+    rows = cur.fetchall()
+    entry = [seeded for is_entry, seeded in rows if is_entry]
+    return len(entry), sum(entry), len(rows) - len(entry)
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    if len(args) < 2 or args[0] not in ('snapshot', 'restore', 'reset'):
+        print('Usage: python scripts/bracket_state.py snapshot <tournament_id> [file.csv.gz]')
+        print('       python scripts/bracket_state.py restore <file.csv.gz> [--dry-run] [--no-triggers]')
+        print('       python scripts/bracket_state.py reset <tournament_id> [--dry-run]')
+        return
+    command, target = args[0], args[1]
+    dry_run = '--dry-run' in sys.argv
+
+    conn = psycopg2.connect(os.getenv('SUPABASE_DB_TRANSACTION_URL'))
+    cur = conn.cursor()
+    started = datetime.now()
+
+    try:
+        if command == 'snapshot':
+            os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+            path = args[2] if len(args) > 2 else os.path.join(
+                SNAPSHOT_DIR, f'{target[:8]}_{started:%Y%m%d_%H%M%S}.csv.gz')
+            count = snapshot_bracket(cur, target, path)
+            conn.rollback()
+            print(f'📸 Snapshot: {count} matches → {path} ({os.path.getsize(path):,} bytes)')
+
+        elif command == 'restore':
+            if '--no-triggers' in sys.argv:
+                cur.execute("SET LOCAL session_replication_role = 'replica'")
+            tournament_id, updated, inserted, deleted = restore_bracket(cur, target)
+            print(f'♻️ Restore {target} → tournament {tournament_id}')
+            print(f'   Updated: {updated}  Inserted: {inserted}  Deleted: {deleted}')
+
+        else:
+            entry, seeded, emptied = reset_bracket(cur, target)
+            print(f'🔄 Reset tournament {target}')
+            print(f'   Entry matches: {entry} ({seeded} with both players) - scores/winner cleared')
+            print(f'   Later matches: {emptied} - emptied, waiting for auto-advancement')
+
+        if command != 'snapshot':
+            if dry_run:
+                conn.rollback()
+                print('🔍 Dry run - rolled back')
+            else:
+                conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+        conn.close()
+
+    print(f'✅ Done in {(datetime.now() - started).total_seconds() * 1000:.0f} ms')
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except Exception as e:
+        print(f'\n❌ ERROR: {e}')
+        import traceback
+        traceback.print_exc()
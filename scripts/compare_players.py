@@ -1,6 +1,7 @@
 import os
 import psycopg2
 from dotenv import load_dotenv
+from player_name_index import AUTO_MATCH_SIMILARITY, normalize_name, similarity
 
 load_dotenv()
 
@@ -49,7 +50,15 @@ for i, (seed, user_id, full_name, display_name, rank) in enumerate(participants)
     current_name = display_name or full_name or "N/A"
     new_name = NEW_PLAYERS[i][0] if i < len(NEW_PLAYERS) else "N/A"
     new_rank = NEW_PLAYERS[i][1] if i < len(NEW_PLAYERS) else "N/A"
-    match = "✅" if current_name == new_name else "❌"
+    score = similarity(normalize_name(current_name), normalize_name(new_name))
+    if current_name == new_name:
+        match = "✅"
+    elif normalize_name(current_name) == normalize_name(new_name):
+        match = "≈ (accents)"
+    elif score >= AUTO_MATCH_SIMILARITY:
+        match = f"≈ {score:.2f}"
+    else:
+        match = "❌"
     print(f"{seed:<6} {current_name:<25} {new_name:<25} {match}")
 
 print("-"*70)
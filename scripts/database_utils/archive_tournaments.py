@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+📦 Archive old tournaments in bounded chunks
+Moves completed tournaments older than the cutoff (6 months, same as
+DataArchivalService.tournamentArchiveAge) and their dependent rows into the
+archive schema (migration 20251210020000_create_tournament_archive.sql):
+
+- matches, tournament_participants, tournament_results,
+  tournament_completion_logs, tournament_payments and
+  tournament_result_history are copied to archive.* and deleted - as is any
+  other table with a NOT NULL foreign key to tournaments (its archive table is
+  created on the first run)
+- rows that belong to a user's history (elo_history and any other table with
+  a foreign key to tournaments/matches) stay in public; their link is saved in
+  archive.detached_links and the column is set to NULL
+- each chunk is one short transaction with lock_timeout, so hot tables never
+  wait on a long lock; --sleep throttles between chunks
+- progress is checkpointed in archive.archival_runs, an interrupted run
+  continues where it stopped
+
+Usage:
+    python scripts/database_utils/archive_tournaments.py [--dry-run]
+    python scripts/database_utils/archive_tournaments.py --days=365 --chunk=10 --sleep=2
+    python scripts/database_utils/archive_tournaments.py --restart
+"""
+
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+import psycopg2
+from psycopg2 import errors, sql
+from dotenv import load_dotenv
+
+load_dotenv()
+
+JOB = 'tournaments'
+
+# Moved in this order (children first), tournaments last
+MOVED_TABLES = [
+    ('matches', 'tournament_id'),
+    ('tournament_participants', 'tournament_id'),
+    ('tournament_results', 'tournament_id'),
+    ('tournament_completion_logs', 'tournament_id'),
+    ('tournament_payments', 'tournament_id'),
+    ('tournament_result_history', 'tournament_id'),
+]
+
+# Always detached even without a foreign key constraint
+EXTRA_DETACHED = [
+    ('elo_history', 'tournament_id', 'tournaments'),
+]
+
+MAX_LOCK_RETRIES = 3
+
+DEFAULTS = {
+    'days': 180,          # archive tournaments older than this
+    'chunk': 20,          # tournaments per transaction
+    'sleep': 0.5,         # pause between chunks (seconds)
+    'max-chunks': 0,      # stop after N chunks (0 = all)
+    'lock-timeout': '3s',
+}
+
+
+def option(name):
+    """--name=value from sys.argv, typed like its default"""
+    default = DEFAULTS[name]
+    for arg in sys.argv[1:]:
+        if arg.startswith(f'--{name}='):
+            return type(default)(arg.split('=', 1)[1])
+    return default
+
+
+def table_exists(cur, schema, table):
+    cur.execute('SELECT to_regclass(%s) IS NOT NULL', (f'{schema}.{table}',))
+    return cur.fetchone()[0]
+
+
+def sync_archive_columns(cur, table):
+    """Add public columns the archive copy does not have yet, returns shared column names"""
+    cur.execute("""
+        SELECT a.attname, format_type(a.atttypid, a.atttypmod),
+               EXISTS (SELECT 1 FROM pg_attribute b
+                       WHERE b.attrelid = to_regclass('archive.' || %(t)s)
+                         AND b.attname = a.attname AND NOT b.attisdropped)
+        FROM pg_attribute a
+        WHERE a.attrelid = to_regclass('public.' || %(t)s)
+          AND a.attnum > 0 AND NOT a.attisdropped
+        ORDER BY a.attnum
+    """, {'t': table})
+    columns = []
+    for name, col_type, in_archive in cur.fetchall():
+        if not in_archive:
+            cur.execute(sql.SQL('ALTER TABLE archive.{} ADD COLUMN {} ' + col_type).format(
+                sql.Identifier(table), sql.Identifier(name)))
+            print(f'   ➕ archive.{table}.{name} ({col_type})')
+        columns.append(name)
+    return columns
+
+
+def ensure_archive_table(cur, table, column):
+    """Create archive.<table> like the migration does, for tables moved since"""
+    if table_exists(cur, 'archive', table):
+        return
+    cur.execute(sql.SQL('CREATE TABLE archive.{t} (LIKE public.{t} INCLUDING DEFAULTS)').format(
+        t=sql.Identifier(table)))
+    cur.execute(sql.SQL('ALTER TABLE archive.{} ADD PRIMARY KEY (id), '
+                        'ADD COLUMN archived_at TIMESTAMPTZ NOT NULL DEFAULT NOW()').format(
+        sql.Identifier(table)))
+    cur.execute(sql.SQL('CREATE INDEX ON archive.{} ({})').format(
+        sql.Identifier(table), sql.Identifier(column)))
+    print(f'   ➕ archive.{table}')
+
+
+def detached_references(cur, moved):
+    """FKs into tournaments/matches outside the moved set.
+
+    Returns (detached, extra_moved): (table, column, parent) links to clear,
+    and (table, column) of NOT NULL tournament children that have to be
+    moved instead.
+    """
+    cur.execute("""
+        SELECT cl.relname, a.attname, pcl.relname, a.attnotnull,
+               EXISTS (SELECT 1 FROM pg_attribute i
+                       WHERE i.attrelid = c.conrelid AND i.attname = 'id' AND NOT i.attisdropped)
+        FROM pg_constraint c
+        JOIN pg_class cl ON cl.oid = c.conrelid
+        JOIN pg_namespace n ON n.oid = cl.relnamespace
+        JOIN pg_class pcl ON pcl.oid = c.confrelid
+        JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = c.conkey[1]
+        WHERE c.contype = 'f'
+          AND n.nspname = 'public'
+          AND c.confrelid IN ('public.tournaments'::regclass, 'public.matches'::regclass)
+          AND array_length(c.conkey, 1) = 1
+    """)
+    refs, extra_moved, blocked = [], [], []
+    for table, column, parent, not_null, has_id in cur.fetchall():
+        if table in moved or table == 'tournaments':
+            continue
+        if not_null:
+            if parent == 'tournaments' and has_id:
+                extra_moved.append((table, column))
+            else:
+                blocked.append(f'{table}.{column}')
+            continue
+        refs.append((table, column, parent))
+    for table, column, parent in EXTRA_DETACHED:
+        if (table, column, parent) not in refs and table_exists(cur, 'public', table):
+            refs.append((table, column, parent))
+    if blocked:
+        raise RuntimeError('Cannot detach NOT NULL references: ' + ', '.join(blocked))
+    return refs, extra_moved
+
+
+def load_checkpoint(cur, cutoff, restart, dry_run=False):
+    if dry_run:
+        # Read-only: the resume state the real run would start from
+        cur.execute("""
+            SELECT cutoff, last_tournament_id, tournaments_archived
+            FROM archive.archival_runs
+            WHERE job = %s AND finished_at IS NULL AND NOT %s
+        """, (JOB, restart))
+        return cur.fetchone() or (cutoff, None, 0)
+    if restart:
+        cur.execute('DELETE FROM archive.archival_runs WHERE job = %s', (JOB,))
+    cur.execute("""
+        INSERT INTO archive.archival_runs (job, cutoff)
+        VALUES (%s, %s)
+        ON CONFLICT (job) DO UPDATE
+        SET finished_at = NULL, updated_at = NOW(),
+            -- a finished run starts over with the new cutoff
+            cutoff = CASE WHEN archival_runs.finished_at IS NULL
+                          THEN archival_runs.cutoff ELSE EXCLUDED.cutoff END,
+            last_tournament_id = CASE WHEN archival_runs.finished_at IS NULL
+                                      THEN archival_runs.last_tournament_id END
+        RETURNING cutoff, last_tournament_id, tournaments_archived
+    """, (JOB, cutoff))
+    return cur.fetchone()
+
+
+def next_chunk(cur, cutoff, after_id, size):
+    """Lock the next chunk of candidates, skipping rows someone else holds"""
+    cur.execute("""
+        SELECT id FROM tournaments
+        WHERE status = 'completed'
+          AND COALESCE(end_date, start_date) < %s
+          AND (%s::uuid IS NULL OR id > %s::uuid)
+        ORDER BY id
+        LIMIT %s
+        FOR UPDATE SKIP LOCKED
+    """, (cutoff, after_id, after_id, size))
+    return [r[0] for r in cur.fetchall()]
+
+
+def archive_chunk(cur, ids, plan):
+    """Move/detach everything for ids, returns (rows_moved, rows_detached)"""
+    moved = detached = 0
+
+    # Detach first: match-level links need the match ids before matches go away
+    for table, column, parent in plan['detached']:
+        if parent == 'matches':
+            parent_filter = sql.SQL('{} IN (SELECT id FROM matches WHERE tournament_id = ANY(%(ids)s::uuid[]))').format(
+                sql.Identifier(column))
+        else:
+            parent_filter = sql.SQL('{} = ANY(%(ids)s::uuid[])').format(sql.Identifier(column))
+        cur.execute(sql.SQL("""
+            WITH links AS (
+                INSERT INTO archive.detached_links (table_name, column_name, row_id, parent_id)
+                SELECT %(table)s, %(column)s, id::text, {col}
+                FROM {tbl} WHERE {filter}
+                ON CONFLICT DO NOTHING
+                RETURNING row_id
+            )
+            UPDATE {tbl} SET {col} = NULL WHERE {filter}
+        """).format(tbl=sql.Identifier(table), col=sql.Identifier(column), filter=parent_filter),
+            {'ids': ids, 'table': table, 'column': column})
+        detached += cur.rowcount
+
+    for table, column in plan['moved'] + [('tournaments', 'id')]:
+        cols = sql.SQL(', ').join(map(sql.Identifier, plan['columns'][table]))
+        cur.execute(sql.SQL("""
+            WITH gone AS (
+                DELETE FROM {tbl} WHERE {key} = ANY(%(ids)s::uuid[])
+                RETURNING {cols}
+            )
+            INSERT INTO archive.{tbl} ({cols})
+            SELECT {cols} FROM gone
+            ON CONFLICT (id) DO NOTHING
+        """).format(tbl=sql.Identifier(table), key=sql.Identifier(column), cols=cols), {'ids': ids})
+        moved += cur.rowcount
+
+    return moved, detached
+
+
+def save_checkpoint(cur, last_id, tournaments, moved, detached):
+    cur.execute("""
+        UPDATE archive.archival_runs
+        SET last_tournament_id = %s,
+            tournaments_archived = tournaments_archived + %s,
+            rows_moved = rows_moved + %s,
+            rows_detached = rows_detached + %s,
+            updated_at = NOW()
+        WHERE job = %s
+    """, (last_id, tournaments, moved, detached, JOB))
+
+
+def main():
+    dry_run = '--dry-run' in sys.argv      # process one chunk and roll back
+    restart = '--restart' in sys.argv      # ignore the saved checkpoint
+    chunk_size = option('chunk')
+    pause = option('sleep')
+    max_chunks = option('max-chunks')
+
+    conn = psycopg2.connect(os.getenv('SUPABASE_DB_TRANSACTION_URL'))
+    cur = conn.cursor()
+
+    print('📦 Archiving old tournaments\n')
+    if not table_exists(cur, 'archive', 'tournaments'):
+        print('❌ archive schema missing - apply 20251210020000_create_tournament_archive.sql first')
+        return
+
+    moved_tables = [(t, c) for t, c in MOVED_TABLES if table_exists(cur, 'public', t)]
+    detached, extra_moved = detached_references(cur, {t for t, _ in moved_tables})
+    moved_tables += extra_moved
+    for table, column in moved_tables:
+        ensure_archive_table(cur, table, column)
+    plan = {
+        'moved': moved_tables,
+        'detached': detached,
+        'columns': {t: sync_archive_columns(cur, t) for t, _ in moved_tables + [('tournaments', 'id')]},
+    }
+    cutoff, last_id, done_before = load_checkpoint(
+        cur, datetime.now(timezone.utc) - timedelta(days=option('days')), restart, dry_run)
+    if not dry_run:
+        # A dry run keeps the archive table and column DDL in its transaction and rolls it back
+        conn.commit()
+
+    print(f'   Cutoff:   {cutoff:%Y-%m-%d}')
+    print(f'   Moved:    {", ".join(t for t, _ in plan["moved"])}, tournaments')
+    print(f'   Detached: {", ".join(f"{t}.{c}" for t, c, _ in plan["detached"]) or "-"}')
+    if last_id:
+        print(f'   ▶️ Resuming after {last_id} ({done_before} tournaments already archived)')
+    print()
+
+    chunks = total_tournaments = total_moved = total_detached = 0
+    retries = 0
+    finished = False
+    while True:
+        try:
+            cur.execute('SET LOCAL lock_timeout = %s', (option('lock-timeout'),))
+            ids = next_chunk(cur, cutoff, last_id, chunk_size)
+            if not ids:
+                conn.rollback()
+                finished = not dry_run
+                break
+            moved, detached = archive_chunk(cur, ids, plan)
+            if dry_run:
+                conn.rollback()
+                print(f'🔍 Dry run: chunk of {len(ids)} tournaments → {moved} rows moved, {detached} detached (rolled back)')
+                break
+            save_checkpoint(cur, ids[-1], len(ids), moved, detached)
+            conn.commit()
+        except errors.LockNotAvailable:
+            conn.rollback()
+            if dry_run:
+                print('⚠️ Lock timeout - dry run stopped')
+                break
+            retries += 1
+            if retries > MAX_LOCK_RETRIES:
+                print('⚠️ Lock timeout persists - stopping, rerun to resume')
+                break
+            print(f'   ⏳ Lock timeout, retry {retries}/{MAX_LOCK_RETRIES}')
+            time.sleep(max(pause * 4, 1))
+            continue
+
+        retries = 0
+        chunks += 1
+        last_id = ids[-1]
+        total_tournaments += len(ids)
+        total_moved += moved
+        total_detached += detached
+        print(f'   📦 chunk {chunks}: {len(ids)} tournaments, {moved} rows moved, {detached} detached')
+
+        if max_chunks and chunks >= max_chunks:
+            print(f'   ⏸️ Stopped after {chunks} chunks, rerun to resume')
+            break
+        time.sleep(pause)
+
+    if finished:
+        cur.execute('UPDATE archive.archival_runs SET finished_at = NOW() WHERE job = %s', (JOB,))
+        conn.commit()
+
+    cur.close()
+    conn.close()
+
+    print('\n' + '='*60)
+    print(f'✅ Archived {total_tournaments} tournaments in {chunks} chunks')
+    print(f'   Rows moved:    {total_moved}')
+    print(f'   Rows detached: {total_detached}')
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except Exception as e:
+        print(f'\n❌ ERROR: {e}')
+        import traceback
+        traceback.print_exc()
@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+"""
+🗂️ Catalog snapshot, schema diff and schema report
+Pulls the whole catalog (tables, columns, constraints, indexes, functions,
+RLS policies, triggers, enums) in a handful of pg_catalog queries and saves
+it as one JSON snapshot, instead of one information_schema round trip per
+table/enum/constraint like check_schema.py and check_table_schema.py.
+
+Snapshots of different environments can then be compared offline, and
+_DATABASE_INFO/COMPLETE_SCHEMA_REPORT.md is regenerated from a snapshot.
+
+Usage:
+    python scripts/database_utils/catalog_snapshot.py snapshot --label=prod
+    python scripts/database_utils/catalog_snapshot.py snapshot --label=local --db=postgresql://localhost/sabo_arena
+    python scripts/database_utils/catalog_snapshot.py diff catalog_snapshots/prod.json catalog_snapshots/local.json
+    python scripts/database_utils/catalog_snapshot.py report catalog_snapshots/prod.json
+"""
+
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+import psycopg2
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DEFAULTS = {
+    'db': '',
+    'label': 'current',
+    'schemas': 'public',
+    'out': '',
+}
+
+OUT_DIR = 'catalog_snapshots'
+REPORT_PATH = os.path.join('_DATABASE_INFO', 'COMPLETE_SCHEMA_REPORT.md')
+
+CONSTRAINT_TYPES = {'p': 'primary_key', 'f': 'foreign_key', 'u': 'unique', 'c': 'check', 'x': 'exclusion'}
+RELATION_KINDS = {'r': 'table', 'p': 'partitioned_table', 'v': 'view', 'm': 'materialized_view'}
+
+COLUMNS_SQL = """
+    SELECT n.nspname, c.relname, c.relkind, c.relrowsecurity,
+           GREATEST(c.reltuples, COALESCE(s.n_live_tup, 0))::bigint AS row_estimate,
+           a.attname, a.attnum, format_type(a.atttypid, a.atttypmod), a.attnotnull,
+           pg_get_expr(d.adbin, d.adrelid), a.attidentity, a.attgenerated
+    FROM pg_class c
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    LEFT JOIN pg_stat_all_tables s ON s.relid = c.oid
+    LEFT JOIN pg_attribute a ON a.attrelid = c.oid AND a.attnum > 0 AND NOT a.attisdropped
+    LEFT JOIN pg_attrdef d ON d.adrelid = c.oid AND d.adnum = a.attnum
+    WHERE n.nspname = ANY(%(schemas)s) AND c.relkind IN ('r', 'p', 'v', 'm')
+    ORDER BY n.nspname, c.relname, a.attnum
+"""
+
+CONSTRAINTS_SQL = """
+    SELECT n.nspname, c.relname, con.conname, con.contype, pg_get_constraintdef(con.oid),
+           ARRAY(SELECT a.attname FROM unnest(con.conkey) WITH ORDINALITY k(num, ord)
+                 JOIN pg_attribute a ON a.attrelid = con.conrelid AND a.attnum = k.num ORDER BY k.ord),
+           fn.nspname, fc.relname,
+           ARRAY(SELECT a.attname FROM unnest(con.confkey) WITH ORDINALITY k(num, ord)
+                 JOIN pg_attribute a ON a.attrelid = con.confrelid AND a.attnum = k.num ORDER BY k.ord)
+    FROM pg_constraint con
+    JOIN pg_class c ON c.oid = con.conrelid
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    LEFT JOIN pg_class fc ON fc.oid = con.confrelid
+    LEFT JOIN pg_namespace fn ON fn.oid = fc.relnamespace
+    WHERE n.nspname = ANY(%(schemas)s)
+"""
+
+INDEXES_SQL = """
+    SELECT n.nspname, t.relname, i.relname, pg_get_indexdef(ix.indexrelid),
+           ix.indisunique, ix.indisprimary, ix.indisvalid
+    FROM pg_index ix
+    JOIN pg_class i ON i.oid = ix.indexrelid
+    JOIN pg_class t ON t.oid = ix.indrelid
+    JOIN pg_namespace n ON n.oid = t.relnamespace
+    WHERE n.nspname = ANY(%(schemas)s)
+"""
+
+TRIGGERS_SQL = """
+    SELECT n.nspname, c.relname, tg.tgname, pg_get_triggerdef(tg.oid), tg.tgenabled
+    FROM pg_trigger tg
+    JOIN pg_class c ON c.oid = tg.tgrelid
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname = ANY(%(schemas)s) AND NOT tg.tgisinternal
+"""
+
+POLICIES_SQL = """
+    SELECT n.nspname, c.relname, p.polname, p.polpermissive, p.polcmd,
+           ARRAY(SELECT CASE WHEN r = 0 THEN 'public' ELSE pg_get_userbyid(r) END
+                 FROM unnest(p.polroles) r ORDER BY 1),
+           pg_get_expr(p.polqual, p.polrelid), pg_get_expr(p.polwithcheck, p.polrelid)
+    FROM pg_policy p
+    JOIN pg_class c ON c.oid = p.polrelid
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname = ANY(%(schemas)s)
+"""
+
+FUNCTIONS_SQL = """
+    SELECT n.nspname, p.proname, pg_get_function_identity_arguments(p.oid),
+           pg_get_function_result(p.oid), l.lanname, p.provolatile, p.prosecdef,
+           md5(p.prosrc), p.prokind
+    FROM pg_proc p
+    JOIN pg_namespace n ON n.oid = p.pronamespace
+    JOIN pg_language l ON l.oid = p.prolang
+    LEFT JOIN pg_depend d ON d.objid = p.oid AND d.deptype = 'e'
+    WHERE n.nspname = ANY(%(schemas)s) AND p.prokind IN ('f', 'p') AND d.objid IS NULL
+"""
+
+ENUMS_SQL = """
+    SELECT n.nspname, t.typname, array_agg(e.enumlabel ORDER BY e.enumsortorder)
+    FROM pg_type t
+    JOIN pg_enum e ON e.enumtypid = t.oid
+    JOIN pg_namespace n ON n.oid = t.typnamespace
+    WHERE n.nspname = ANY(%(schemas)s)
+    GROUP BY n.nspname, t.typname
+"""
+
+
+def option(name):
+    """--name=value from sys.argv, typed like its default"""
+    default = DEFAULTS[name]
+    for arg in sys.argv[1:]:
+        if arg.startswith(f'--{name}='):
+            return type(default)(arg.split('=', 1)[1])
+    return default
+
+
+def qualified(schema, name):
+    """public objects keep their bare name, like the app and the schema report use"""
+    return name if schema == 'public' else f'{schema}.{name}'
+
+
+# ---------------------------------------------------------------------------
+# Snapshot
+# ---------------------------------------------------------------------------
+
+def take_snapshot(conn, schemas):
+    cur = conn.cursor()
+    params = {'schemas': schemas}
+    tables = {}
+
+    def table(schema, name):
+        return tables[qualified(schema, name)]
+
+    cur.execute(COLUMNS_SQL, params)
+    for (schema, name, kind, rls, rows, column, position, data_type, not_null,
+         default, identity, generated) in cur.fetchall():
+        entry = tables.setdefault(qualified(schema, name), {
+            'kind': RELATION_KINDS[kind],
+            'rls_enabled': rls,
+            'row_estimate': max(rows, 0),
+            'columns': {}, 'constraints': {}, 'indexes': {}, 'triggers': {}, 'policies': {},
+        })
+        if column is None:
+            continue
+        entry['columns'][column] = {
+            'position': position,
+            'type': data_type,
+            'nullable': not not_null,
+            'default': default,
+        }
+        if identity:
+            entry['columns'][column]['identity'] = {'a': 'always', 'd': 'by default'}[identity]
+        if generated:
+            entry['columns'][column]['generated'] = True
+
+    cur.execute(CONSTRAINTS_SQL, params)
+    for schema, name, conname, contype, definition, columns, ref_schema, ref_table, ref_columns in cur.fetchall():
+        constraint = {'type': CONSTRAINT_TYPES.get(contype, contype), 'columns': columns, 'definition': definition}
+        if ref_table:
+            constraint['references'] = {'table': qualified(ref_schema, ref_table), 'columns': ref_columns}
+        table(schema, name)['constraints'][conname] = constraint
+
+    cur.execute(INDEXES_SQL, params)
+    for schema, name, index, definition, unique, primary, valid in cur.fetchall():
+        if qualified(schema, name) in tables:
+            table(schema, name)['indexes'][index] = {
+                'definition': definition, 'unique': unique, 'primary': primary, 'valid': valid,
+            }
+
+    cur.execute(TRIGGERS_SQL, params)
+    for schema, name, trigger, definition, enabled in cur.fetchall():
+        table(schema, name)['triggers'][trigger] = {'definition': definition, 'enabled': enabled != 'D'}
+
+    cur.execute(POLICIES_SQL, params)
+    cmds = {'r': 'SELECT', 'a': 'INSERT', 'w': 'UPDATE', 'd': 'DELETE', '*': 'ALL'}
+    for schema, name, policy, permissive, cmd, roles, using, check in cur.fetchall():
+        table(schema, name)['policies'][policy] = {
+            'command': cmds.get(cmd, cmd), 'permissive': permissive, 'roles': roles,
+            'using': using, 'with_check': check,
+        }
+
+    functions = {}
+    cur.execute(FUNCTIONS_SQL, params)
+    for schema, name, args, result, language, volatility, secdef, body_md5, kind in cur.fetchall():
+        functions[f'{qualified(schema, name)}({args})'] = {
+            'kind': 'procedure' if kind == 'p' else 'function',
+            'returns': result,
+            'language': language,
+            'volatility': {'i': 'immutable', 's': 'stable', 'v': 'volatile'}[volatility],
+            'security_definer': secdef,
+            'body_md5': body_md5,
+        }
+
+    enums = {}
+    cur.execute(ENUMS_SQL, params)
+    for schema, name, labels in cur.fetchall():
+        enums[qualified(schema, name)] = labels
+
+    cur.execute('SHOW server_version')
+    server_version = cur.fetchone()[0]
+    cur.close()
+
+    return {
+        'meta': {
+            'label': option('label'),
+            'captured_at': datetime.now(timezone.utc).isoformat(),
+            'server_version': server_version,
+            'schemas': schemas,
+        },
+        'tables': dict(sorted(tables.items())),
+        'functions': dict(sorted(functions.items())),
+        'enums': dict(sorted(enums.items())),
+    }
+
+
+def load_snapshot(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+# ---------------------------------------------------------------------------
+# Diff
+# ---------------------------------------------------------------------------
+
+def diff_values(old, new, path, changes):
+    """Walks both snapshots; dicts recurse, anything else compares by value"""
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in sorted(old.keys() | new.keys()):
+            if key == 'position' or key == 'row_estimate':
+                continue
+            if key not in new:
+                changes.append(('-', path + [key], old[key], None))
+            elif key not in old:
+                changes.append(('+', path + [key], None, new[key]))
+            else:
+                diff_values(old[key], new[key], path + [key], changes)
+    elif old != new:
+        changes.append(('~', path, old, new))
+    return changes
+
+
+def describe(path):
+    """['tables', 'users', 'columns', 'email', 'nullable'] → column users.email nullable"""
+    section = path[0]
+    if section == 'tables':
+        if len(path) == 2:
+            return f'table {path[1]}'
+        if len(path) == 3:
+            return f'table {path[1]} {path[2]}'
+        kind = {'columns': 'column', 'constraints': 'constraint', 'indexes': 'index',
+                'triggers': 'trigger', 'policies': 'policy'}[path[2]]
+        return f"{kind} {path[1]}.{path[3]}" + (f" {' '.join(map(str, path[4:]))}" if len(path) > 4 else '')
+    kind = {'functions': 'function', 'enums': 'enum'}[section]
+    return f"{kind} {path[1]}" + (f" {' '.join(map(str, path[2:]))}" if len(path) > 2 else '')
+
+
+def diff_snapshots(old, new):
+    changes = []
+    for section in ('tables', 'functions', 'enums'):
+        diff_values(old.get(section, {}), new.get(section, {}), [section], changes)
+    return changes
+
+
+def short(value, limit=80):
+    text = json.dumps(value, default=str) if not isinstance(value, str) else value
+    return text if len(text) <= limit else text[:limit - 3] + '...'
+
+
+def print_diff(old, new, changes):
+    print(f"\n🔍 SCHEMA DIFF: {old['meta']['label']} ({old['meta']['captured_at'][:10]}) → "
+          f"{new['meta']['label']} ({new['meta']['captured_at'][:10]})")
+    if not changes:
+        print('\n✅ Schemas are identical')
+        return
+    counts = {'+': 0, '-': 0, '~': 0}
+    for sign, path, before, after in changes:
+        counts[sign] += 1
+        if sign == '+':
+            print(f'   + {describe(path)}')
+        elif sign == '-':
+            print(f'   - {describe(path)}')
+        else:
+            print(f'   ~ {describe(path)}: {short(before)} → {short(after)}')
+    print(f"\n📊 {counts['+']} only in {new['meta']['label']}, {counts['-']} only in "
+          f"{old['meta']['label']}, {counts['~']} changed")
+
+
+# ---------------------------------------------------------------------------
+# Report
+# ---------------------------------------------------------------------------
+
+def render_report(snapshot):
+    """Same layout as the original _DATABASE_INFO/COMPLETE_SCHEMA_REPORT.md"""
+    meta = snapshot['meta']
+    tables = {name: t for name, t in snapshot['tables'].items() if t['kind'] in ('table', 'partitioned_table')}
+    lines = [
+        '# 🗄️ SUPABASE COMPLETE SCHEMA REPORT',
+        '',
+        f"**Generated:** {meta['label']} snapshot, {meta['captured_at'][:19].replace('T', ' ')} UTC "
+        f"(PostgreSQL {meta['server_version']})",
+        '',
+        '---',
+        '',
+        '## 📊 Summary',
+        '',
+        f'- **Total Tables:** {len(tables)}',
+        f"- **Total Records:** {sum(t['row_estimate'] for t in tables.values()):,} rows (estimated)",
+        f"- **Functions:** {len(snapshot['functions'])}",
+        f"- **Enums:** {len(snapshot['enums'])}",
+        '',
+        '---',
+        '',
+        '## 📋 Tables',
+        '',
+    ]
+
+    for name, t in tables.items():
+        lines += [f"### {name} ({t['row_estimate']:,} rows)", '', '**Columns:**', '',
+                  '| Column | Type | Nullable | Default |',
+                  '|--------|------|----------|--------|']
+        for column, c in sorted(t['columns'].items(), key=lambda item: item[1]['position']):
+            lines.append(f"| `{column}` | {c['type']} | {'✓' if c['nullable'] else '✗'} | {c['default'] or '-'} |")
+
+        by_type = {}
+        for con_name, con in sorted(t['constraints'].items()):
+            by_type.setdefault(con['type'], []).append((con_name, con))
+        lines += ['', '**Constraints:**', '']
+        for _, con in by_type.get('primary_key', []):
+            lines.append(f"- **Primary Key:** {', '.join(con['columns'])}")
+        if by_type.get('foreign_key'):
+            lines.append('- **Foreign Keys:**')
+            for _, con in by_type['foreign_key']:
+                ref = con['references']
+                lines.append(f"  - `{', '.join(con['columns'])}` → `{ref['table']}.{', '.join(ref['columns'])}`")
+        for _, con in by_type.get('unique', []):
+            lines.append(f"- **Unique:** {', '.join(con['columns'])}")
+        if by_type.get('check'):
+            lines.append('- **Checks:**')
+            for con_name, con in by_type['check']:
+                lines.append(f"  - `{con_name}`: {con['definition']}")
+
+        lines += ['', f"**Indexes:** {len(t['indexes'])} indexes"]
+        if t['triggers']:
+            lines += ['', f"**Triggers:** {', '.join(sorted(t['triggers']))}"]
+        if t['rls_enabled'] or t['policies']:
+            lines += ['', f"**RLS:** {'enabled' if t['rls_enabled'] else 'disabled'}, "
+                         f"{len(t['policies'])} policies"]
+        lines += ['', '---', '']
+
+    if snapshot['enums']:
+        lines += ['## 🏷️ Enums', '']
+        for name, labels in snapshot['enums'].items():
+            lines.append(f"- **{name}:** {', '.join(labels)}")
+        lines += ['', '---', '']
+
+    if snapshot['functions']:
+        lines += ['## ⚙️ Functions', '', '| Function | Returns | Language | Security |',
+                  '|----------|---------|----------|----------|']
+        for name, f in snapshot['functions'].items():
+            lines.append(f"| `{name}` | {f['returns']} | {f['language']} | "
+                         f"{'definer' if f['security_definer'] else 'invoker'} |")
+        lines += ['', '---', '']
+
+    lines += ['*Generated by catalog_snapshot.py*', '']
+    return '\n'.join(lines)
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    command = args[0] if args else ''
+
+    if command == 'snapshot':
+        conn = psycopg2.connect(option('db') or os.getenv('SUPABASE_DB_TRANSACTION_URL'))
+        started = time.perf_counter()
+        try:
+            snapshot = take_snapshot(conn, option('schemas').split(','))
+        finally:
+            conn.close()
+        out = option('out') or os.path.join(OUT_DIR, f"{option('label')}.json")
+        os.makedirs(os.path.dirname(out) or '.', exist_ok=True)
+        with open(out, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, indent=2, default=str)
+        print(f"📸 {len(snapshot['tables'])} tables, {len(snapshot['functions'])} functions, "
+              f"{len(snapshot['enums'])} enums in {time.perf_counter() - started:.2f}s → {out}")
+
+    elif command == 'diff' and len(args) == 3:
+        started = time.perf_counter()
+        old, new = load_snapshot(args[1]), load_snapshot(args[2])
+        changes = diff_snapshots(old, new)
+        print_diff(old, new, changes)
+        print(f'⏱️  {(time.perf_counter() - started) * 1000:.0f} ms')
+        if changes:
+            sys.exit(1)
+
+    elif command == 'report' and len(args) == 2:
+        out = option('out') or REPORT_PATH
+        with open(out, 'w', encoding='utf-8') as f:
+            f.write(render_report(load_snapshot(args[1])))
+        print(f'📝 Schema report written to {out}')
+
+    else:
+        print(__doc__)
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except Exception as e:
+        print(f'\n❌ ERROR: {e}')
+        import traceback
+        traceback.print_exc()
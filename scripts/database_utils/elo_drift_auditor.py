@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+📈 ELO drift auditor - replay elo_history against users.elo_rating
+ELO is written by RewardExecutionService._executeEloChange,
+TournamentEloService and manual scripts (fix_elo_to_rank_start.dart), each
+reading the current rating and writing users + elo_history separately, so
+the stored rating can drift from what the history says.
+
+- elo_history is streamed with a server-side cursor ordered by user and time
+  into numpy arrays (user index, old_elo, new_elo, elo_change)
+- per user (numpy group reductions): replayed rating = first old_elo + sum of
+  elo_change, last new_elo, chain breaks (old_elo ≠ previous new_elo) and
+  rows where new_elo - old_elo ≠ elo_change
+- users whose stored rating differs from the replay are reported; --fix saves
+  a CSV of the old values and writes all corrections with one
+  UPDATE ... FROM unnest(...) (skipping users whose rating changed meanwhile)
+
+--basis=last compares against the last new_elo instead, which accepts every
+chain break (e.g. a manual reset) as intended.
+
+Usage:
+    python scripts/database_utils/elo_drift_auditor.py
+    python scripts/database_utils/elo_drift_auditor.py --basis=last --top=50
+    python scripts/database_utils/elo_drift_auditor.py --fix
+"""
+
+import csv
+import os
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import psycopg2
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DEFAULTS = {
+    'db': '',
+    'basis': 'history',   # history = first old_elo + sum(elo_change), last = last new_elo
+    'chunk': 200000,      # rows per fetch from the server-side cursor
+    'min-drift': 1,       # ignore smaller differences
+    'top': 20,            # drifted users listed in the report
+}
+
+HISTORY_SQL = """
+    SELECT user_id::text, old_elo, new_elo, elo_change
+    FROM elo_history
+    ORDER BY user_id, created_at NULLS FIRST, id
+"""
+
+
+def option(name):
+    """--name=value from sys.argv, typed like its default"""
+    default = DEFAULTS[name]
+    for arg in sys.argv[1:]:
+        if arg.startswith(f'--{name}='):
+            return type(default)(arg.split('=', 1)[1])
+    return default
+
+
+# ---------------------------------------------------------------------------
+# Load
+# ---------------------------------------------------------------------------
+
+def stream_history(conn):
+    """elo_history as numpy columns; users become consecutive integer codes"""
+    cur = conn.cursor(name='elo_history_stream')
+    cur.itersize = option('chunk')
+    cur.execute(HISTORY_SQL)
+
+    user_ids, codes, olds, news, changes = [], [], [], [], []
+    last_user = None
+    while True:
+        rows = cur.fetchmany(option('chunk'))
+        if not rows:
+            break
+        users, old, new, change = zip(*rows)
+        users = np.array(users)
+        starts = np.empty(len(users), dtype=bool)
+        starts[0] = users[0] != last_user
+        starts[1:] = users[1:] != users[:-1]
+        first_code = len(user_ids)
+        user_ids.extend(users[starts].tolist())
+        # first row continues the previous chunk's user unless it starts a new one
+        codes.append(first_code - 1 + np.cumsum(starts))
+        olds.append(np.array(old, dtype=np.int64))
+        news.append(np.array(new, dtype=np.int64))
+        changes.append(np.array(change, dtype=np.int64))
+        last_user = users[-1]
+    cur.close()
+
+    if not user_ids:
+        return [], *(np.empty(0, dtype=np.int64) for _ in range(4))
+    return (user_ids, np.concatenate(codes), np.concatenate(olds),
+            np.concatenate(news), np.concatenate(changes))
+
+
+def stored_ratings(conn, user_ids):
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT u.id::text, u.elo_rating
+        FROM unnest(%s::uuid[]) AS h(id)
+        JOIN users u ON u.id = h.id
+    """, (user_ids,))
+    by_id = dict(cur.fetchall())
+    cur.close()
+    exists = np.array([uid in by_id for uid in user_ids])
+    missing = np.array([by_id.get(uid) is None for uid in user_ids])
+    stored = np.array([by_id.get(uid) or 0 for uid in user_ids], dtype=np.int64)
+    return stored, exists, exists & missing
+
+
+# ---------------------------------------------------------------------------
+# Replay
+# ---------------------------------------------------------------------------
+
+def replay(codes, old, new, change):
+    """Per-user reductions over rows already sorted by (user, time)"""
+    n = len(codes)
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    ends = np.r_[starts[1:], n] - 1
+
+    replayed = old[starts] + np.add.reduceat(change, starts)
+    last_new = new[ends]
+
+    same_user = np.r_[False, codes[1:] == codes[:-1]]
+    breaks = same_user & np.r_[False, old[1:] != new[:-1]]
+    chain_breaks = np.add.reduceat(breaks.astype(np.int64), starts)
+    inconsistent = np.add.reduceat((new - old != change).astype(np.int64), starts)
+    entries = ends - starts + 1
+    return replayed, last_new, chain_breaks, inconsistent, entries
+
+
+# ---------------------------------------------------------------------------
+# Fix
+# ---------------------------------------------------------------------------
+
+def save_backup(rows):
+    path = f"elo_corrections_{datetime.now():%Y%m%d_%H%M%S}.csv"
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['user_id', 'stored_elo', 'corrected_elo', 'last_new_elo', 'chain_breaks'])
+        writer.writerows(rows)
+    return path
+
+
+def apply_corrections(conn, user_ids, stored, expected):
+    """One UPDATE; a user whose rating moved since it was read is left alone"""
+    cur = conn.cursor()
+    cur.execute("""
+        UPDATE users u
+        SET elo_rating = c.corrected
+        FROM unnest(%s::uuid[], %s::int[], %s::int[]) AS c(id, stored, corrected)
+        WHERE u.id = c.id AND u.elo_rating IS NOT DISTINCT FROM c.stored
+    """, (user_ids, stored, expected))
+    updated = cur.rowcount
+    conn.commit()
+    cur.close()
+    return updated
+
+
+def main():
+    fix = '--fix' in sys.argv
+    basis = option('basis')
+    if basis not in ('history', 'last'):
+        print('❌ --basis must be history or last')
+        return
+
+    conn = psycopg2.connect(option('db') or os.getenv('SUPABASE_DB_TRANSACTION_URL'))
+    # History and ratings from one snapshot, so a match finishing mid-audit is not drift
+    conn.set_session(isolation_level='REPEATABLE READ', readonly=True)
+    try:
+        started = time.perf_counter()
+        user_ids, codes, old, new, change = stream_history(conn)
+        loaded = time.perf_counter()
+        if not user_ids:
+            print('📭 elo_history is empty')
+            return
+        print(f'📥 {len(codes):,} history rows for {len(user_ids):,} users in {loaded - started:.2f}s')
+
+        replayed, last_new, chain_breaks, inconsistent, entries = replay(codes, old, new, change)
+        stored, exists, unset = stored_ratings(conn, user_ids)
+        conn.commit()
+        expected = replayed if basis == 'history' else last_new
+        drift = stored - expected
+        drifted = np.flatnonzero(exists & (unset | (np.abs(drift) >= option('min-drift'))))
+        print(f'⚙️  Replayed in {time.perf_counter() - loaded:.2f}s')
+
+        print(f'\n📊 ELO AUDIT (basis: {basis})')
+        print(f'   Users with history:      {len(user_ids):,} ({int((~exists).sum()):,} no longer in users)')
+        print(f'   In sync:                 {int(exists.sum()) - len(drifted):,}')
+        print(f'   Drifted:                 {len(drifted):,}')
+        print(f'   Users with chain breaks: {int((chain_breaks > 0).sum()):,} '
+              f'({int(chain_breaks.sum()):,} breaks)')
+        print(f'   Rows with new-old≠change: {int(inconsistent.sum()):,}')
+        if len(drifted):
+            print(f'   Drift: mean {np.abs(drift[drifted]).mean():.1f}, max {np.abs(drift[drifted]).max()}, '
+                  f'net {int(drift[drifted].sum()):+,}')
+
+            order = drifted[np.argsort(-np.abs(drift[drifted]), kind='stable')][:option('top')]
+            print(f"\n   {'user_id':36} {'stored':>7} {'replay':>7} {'last':>7} {'drift':>6} {'rows':>5} {'breaks':>6}")
+            for i in order:
+                print(f"   {user_ids[i]:36} {'NULL' if unset[i] else stored[i]:>7} {replayed[i]:>7} {last_new[i]:>7} "
+                      f'{drift[i]:>+6} {entries[i]:>5} {chain_breaks[i]:>6}')
+
+        if not len(drifted):
+            print('\n✅ Every rating matches its history')
+            return
+        if not fix:
+            print('\n💡 Run with --fix to write the corrections')
+            return
+
+        rows = [(user_ids[i], None if unset[i] else int(stored[i]), int(expected[i]), int(last_new[i]),
+                 int(chain_breaks[i])) for i in drifted]
+        conn.set_session(isolation_level='READ COMMITTED', readonly=False)
+        backup = save_backup(rows)
+        print(f'\n💾 Old ratings saved to {backup}')
+        updated = apply_corrections(conn, [r[0] for r in rows], [r[1] for r in rows], [r[2] for r in rows])
+        print(f'✅ Corrected {updated:,} ratings'
+              + (f' ({len(rows) - updated:,} changed during the audit, skipped)' if updated < len(rows) else ''))
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except Exception as e:
+        print(f'\n❌ ERROR: {e}')
+        import traceback
+        traceback.print_exc()
@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+🔥 Hot-query profiler
+Replays the SQL behind the app's hottest endpoints against a seeded database
+and records what it costs, so the claims in
+sql_migrations/migration_3_performance_optimization.sql can be checked and
+plan regressions show up between schema versions:
+
+- tournament list      TournamentService.getTournaments
+- profile by id        UserService.getUserProfileById
+- leaderboard          get_leaderboard_snapshot() RPC (LeaderboardScreen)
+- chat messages        MemberRealtimeService chat history (last 50 by room)
+- notifications        NotificationService list + unread count
+
+Each query runs --iterations times with parameters sampled from the data.
+Cost is read from pg_stat_statements (before/after diff, stats are never
+reset) and one EXPLAIN (ANALYZE, BUFFERS) plan is captured per query. Results
+are ranked by total time and buffer hits and saved as JSON; --compare prints
+time and plan-shape changes against an earlier run.
+
+Usage:
+    python scripts/database_utils/hot_query_profiler.py --db=postgresql://localhost/sabo_arena
+    python scripts/database_utils/hot_query_profiler.py --label=after_migration_3 --compare=query_profiles/before.json
+"""
+
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timezone
+
+import psycopg2
+from psycopg2.extras import RealDictCursor
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DEFAULTS = {
+    'db': '',
+    'iterations': 50,     # executions per query
+    'samples': 20,        # distinct parameter sets per query
+    'label': 'local',
+    'out': '',
+    'compare': '',
+}
+
+OUT_DIR = 'query_profiles'
+
+# name → SQL (tagged so it can be found in pg_stat_statements) and the
+# query that samples realistic parameters from the seeded data
+HOT_QUERIES = [
+    {
+        'name': 'tournament_list',
+        'endpoint': 'TournamentService.getTournaments',
+        'sql': """/* hot:tournament_list */
+            SELECT t.*, json_build_object('name', c.name, 'logo_url', c.logo_url, 'address', c.address) AS clubs
+            FROM tournaments t
+            LEFT JOIN clubs c ON c.id = t.club_id
+            WHERE t.status = %(status)s AND t.is_public = true
+            ORDER BY t.start_date ASC
+            LIMIT 15 OFFSET %(offset)s""",
+        'params': """
+            SELECT s.status::text AS status, o AS "offset"
+            FROM (SELECT DISTINCT status FROM tournaments) s, unnest(ARRAY[0, 0, 0, 15]) o""",
+    },
+    {
+        'name': 'profile_by_id',
+        'endpoint': 'UserService.getUserProfileById',
+        'sql': """/* hot:profile_by_id */
+            SELECT * FROM users WHERE id = %(user_id)s""",
+        'params': """
+            SELECT id AS user_id FROM users ORDER BY random() LIMIT %(samples)s""",
+    },
+    {
+        'name': 'leaderboard',
+        'endpoint': 'get_leaderboard_snapshot RPC',
+        'sql': """/* hot:leaderboard */
+            SELECT * FROM get_leaderboard_snapshot(%(board_type)s, %(rank_filter)s, 100)""",
+        'params': """
+            SELECT b AS board_type, r AS rank_filter
+            FROM unnest(ARRAY['elo', 'wins', 'tournaments', 'spa_points']) b,
+                 unnest(ARRAY[NULL, 'K', 'I', 'H', 'G', 'F', 'E']) r""",
+    },
+    {
+        'name': 'chat_messages_by_room',
+        'endpoint': 'MemberRealtimeService chat history',
+        'sql': """/* hot:chat_messages_by_room */
+            SELECT m.*, to_jsonb(u) AS users
+            FROM chat_messages m
+            LEFT JOIN users u ON u.id = m.sender_id
+            WHERE m.room_id = %(room_id)s AND m.is_deleted = false
+            ORDER BY m.created_at DESC
+            LIMIT 50""",
+        'params': """
+            SELECT room_id FROM chat_messages
+            GROUP BY room_id ORDER BY count(*) DESC LIMIT %(samples)s""",
+    },
+    {
+        'name': 'notifications_by_user',
+        'endpoint': 'NotificationService.getNotifications',
+        'sql': """/* hot:notifications_by_user */
+            SELECT * FROM notifications
+            WHERE user_id = %(user_id)s
+            ORDER BY created_at DESC
+            LIMIT 50""",
+        'params': """
+            SELECT user_id FROM notifications
+            GROUP BY user_id ORDER BY count(*) DESC LIMIT %(samples)s""",
+    },
+    {
+        'name': 'notifications_unread_count',
+        'endpoint': 'NotificationService.getUnreadCount',
+        'sql': """/* hot:notifications_unread_count */
+            SELECT id FROM notifications
+            WHERE user_id = %(user_id)s AND is_read = false AND is_dismissed = false""",
+        'params': """
+            SELECT user_id FROM notifications
+            GROUP BY user_id ORDER BY count(*) DESC LIMIT %(samples)s""",
+    },
+]
+
+
+def option(name):
+    """--name=value from sys.argv, typed like its default"""
+    default = DEFAULTS[name]
+    for arg in sys.argv[1:]:
+        if arg.startswith(f'--{name}='):
+            return type(default)(arg.split('=', 1)[1])
+    return default
+
+
+# ---------------------------------------------------------------------------
+# pg_stat_statements
+# ---------------------------------------------------------------------------
+
+def statement_columns(cur):
+    """Column names differ before/after PostgreSQL 13 (total_time → total_exec_time)"""
+    try:
+        cur.execute('SELECT * FROM pg_stat_statements LIMIT 0')
+    except psycopg2.Error as e:
+        print(f'⚠️  pg_stat_statements not available ({e.pgcode}), using client timings only')
+        return None
+    names = {d[0] for d in cur.description}
+    return 'total_exec_time' if 'total_exec_time' in names else 'total_time'
+
+
+def statement_snapshot(cur, total):
+    if not total:
+        return {}
+    cur.execute(f"""
+        SELECT queryid, query, calls, {total} AS total_ms, rows,
+               shared_blks_hit, shared_blks_read, temp_blks_written
+        FROM pg_stat_statements
+        WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database())
+          AND query LIKE '%/* hot:%'
+    """)
+    snapshot = {}
+    for row in cur.fetchall():
+        name = row['query'].split('/* hot:', 1)[1].split(' */', 1)[0]
+        entry = snapshot.setdefault(name, dict.fromkeys(
+            ('calls', 'total_ms', 'rows', 'shared_blks_hit', 'shared_blks_read', 'temp_blks_written'), 0))
+        for key in entry:
+            entry[key] += float(row[key] or 0)
+    return snapshot
+
+
+def statement_delta(before, after):
+    delta = {}
+    for name, values in after.items():
+        prev = before.get(name, {})
+        delta[name] = {k: v - prev.get(k, 0) for k, v in values.items()}
+    return delta
+
+
+# ---------------------------------------------------------------------------
+# Plans
+# ---------------------------------------------------------------------------
+
+def plan_shape(node, depth=0):
+    """Node types with their relation/index, depth first - what regresses"""
+    label = node['Node Type']
+    if node.get('Index Name'):
+        label += f" using {node['Index Name']}"
+    if node.get('Relation Name'):
+        label += f" on {node['Relation Name']}"
+    if node.get('Function Name'):
+        label += f" on {node['Function Name']}()"
+    shape = ['  ' * depth + label]
+    for child in node.get('Plans', []):
+        shape += plan_shape(child, depth + 1)
+    return shape
+
+
+def explain(cur, query, params):
+    cur.execute('EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) ' + query, params)
+    result = cur.fetchone()
+    plan = list(result.values())[0][0]
+    top = plan['Plan']
+    return {
+        'planning_ms': plan.get('Planning Time'),
+        'execution_ms': plan.get('Execution Time'),
+        'shared_hit': top.get('Shared Hit Blocks', 0),
+        'shared_read': top.get('Shared Read Blocks', 0),
+        'seq_scans': sum(1 for line in plan_shape(top) if 'Seq Scan' in line),
+        'shape': plan_shape(top),
+        'plan': plan,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Run
+# ---------------------------------------------------------------------------
+
+def sample_params(cur, spec):
+    cur.execute(spec['params'], {'samples': option('samples')})
+    return [dict(r) for r in cur.fetchall()]
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+
+def schema_version(cur):
+    try:
+        cur.execute('SELECT max(version) AS version FROM supabase_migrations.schema_migrations')
+        return cur.fetchone()['version']
+    except psycopg2.Error:
+        return None
+
+
+def profile(conn):
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    total_column = statement_columns(cur)
+    cur.execute('SHOW server_version')
+    server_version = cur.fetchone()['server_version']
+
+    results, params_by_query = {}, {}
+    for spec in HOT_QUERIES:
+        try:
+            params_by_query[spec['name']] = sample_params(cur, spec)
+        except psycopg2.Error as e:
+            print(f"⚠️  {spec['name']}: skipped, {e.pgerror or e}".strip())
+            results[spec['name']] = {'endpoint': spec['endpoint'], 'error': str(e).strip()}
+        if spec['name'] in params_by_query and not params_by_query[spec['name']]:
+            print(f"⚠️  {spec['name']}: skipped, no data to sample parameters from")
+            params_by_query.pop(spec['name'])
+            results[spec['name']] = {'endpoint': spec['endpoint'], 'error': 'no parameter data'}
+
+    # Warm the cache once so the timed runs compare steady state
+    for spec in HOT_QUERIES:
+        try:
+            for params in params_by_query.get(spec['name'], []):
+                cur.execute(spec['sql'], params)
+                cur.fetchall()
+        except psycopg2.Error as e:
+            print(f"⚠️  {spec['name']}: skipped, {e.pgerror or e}".strip())
+            results[spec['name']] = {'endpoint': spec['endpoint'], 'error': str(e).strip()}
+            params_by_query.pop(spec['name'])
+
+    before = statement_snapshot(cur, total_column)
+    for spec in HOT_QUERIES:
+        param_sets = params_by_query.get(spec['name'])
+        if not param_sets:
+            continue
+        timings = []
+        for i in range(option('iterations')):
+            params = random.choice(param_sets) if i else param_sets[0]
+            started = time.perf_counter()
+            cur.execute(spec['sql'], params)
+            cur.fetchall()
+            timings.append((time.perf_counter() - started) * 1000)
+        results[spec['name']] = {
+            'endpoint': spec['endpoint'],
+            'client_ms': {
+                'p50': round(percentile(timings, 50), 3),
+                'p95': round(percentile(timings, 95), 3),
+                'max': round(max(timings), 3),
+            },
+        }
+    stats = statement_delta(before, statement_snapshot(cur, total_column))
+
+    # Plans last: EXPLAIN ANALYZE is itself recorded when track_utility is on
+    for spec in HOT_QUERIES:
+        if spec['name'] in params_by_query:
+            results[spec['name']]['explain'] = explain(cur, spec['sql'], params_by_query[spec['name']][0])
+
+    for name, result in results.items():
+        if 'client_ms' not in result:
+            continue
+        if name in stats:
+            result['statements'] = stats[name]
+        else:
+            # No pg_stat_statements - fall back to client side totals
+            result['statements'] = {'calls': option('iterations'),
+                                    'total_ms': result['client_ms']['p50'] * option('iterations')}
+
+    profiled = [n for n, r in results.items() if 'statements' in r]
+    by_time = sorted(profiled, key=lambda n: results[n]['statements']['total_ms'], reverse=True)
+    by_buffers = sorted(profiled, key=lambda n: results[n]['statements'].get('shared_blks_hit',
+                        results[n]['explain']['shared_hit']), reverse=True)
+
+    return {
+        'label': option('label'),
+        'captured_at': datetime.now(timezone.utc).isoformat(),
+        'server_version': server_version,
+        'schema_version': schema_version(cur),
+        'source': 'pg_stat_statements' if total_column else 'client',
+        'iterations': option('iterations'),
+        'ranking': {'total_time': by_time, 'buffer_hits': by_buffers},
+        'queries': results,
+    }
+
+
+def print_report(report):
+    print(f"\n🔥 HOT QUERIES - {report['label']} (schema {report['schema_version'] or 'unknown'}, "
+          f"PostgreSQL {report['server_version']})")
+    print(f"{'query':32} {'calls':>6} {'total ms':>10} {'mean ms':>9} {'hit':>9} {'read':>7} {'seq':>4}")
+    for name in report['ranking']['total_time']:
+        r = report['queries'][name]
+        s = r['statements']
+        print(f"{name:32} {int(s['calls']):>6} {s['total_ms']:>10.1f} {s['total_ms'] / (s['calls'] or 1):>9.3f} "
+              f"{int(s.get('shared_blks_hit', r['explain']['shared_hit'])):>9} "
+              f"{int(s.get('shared_blks_read', r['explain']['shared_read'])):>7} {r['explain']['seq_scans']:>4}")
+    print(f"\n   By buffer hits: {', '.join(report['ranking']['buffer_hits'])}")
+    for name, r in report['queries'].items():
+        if 'error' in r:
+            print(f"   ⚠️  {name}: {r['error']}")
+
+
+def compare(report, previous):
+    """Per query time change and plan shape change against an earlier run"""
+    print(f"\n📊 COMPARED WITH {previous['label']} (schema {previous.get('schema_version') or 'unknown'})")
+    regressions = 0
+    for name, r in report['queries'].items():
+        old = previous['queries'].get(name)
+        if 'statements' not in r or not old or 'statements' not in old:
+            continue
+        new_mean = r['statements']['total_ms'] / (r['statements']['calls'] or 1)
+        old_mean = old['statements']['total_ms'] / (old['statements']['calls'] or 1)
+        change = (new_mean - old_mean) / old_mean * 100 if old_mean else 0.0
+        marker = '🔺' if change > 15 else ('🔻' if change < -15 else '  ')
+        print(f'   {marker} {name:32} {old_mean:8.3f} → {new_mean:8.3f} ms ({change:+.0f}%)')
+        if r['explain']['shape'] != old['explain']['shape']:
+            regressions += change > 15
+            print('      plan changed:')
+            for line in old['explain']['shape']:
+                print(f'        - {line}')
+            for line in r['explain']['shape']:
+                print(f'        + {line}')
+    return regressions
+
+
+def main():
+    conn = psycopg2.connect(option('db') or os.getenv('SUPABASE_DB_TRANSACTION_URL'))
+    conn.autocommit = True
+    try:
+        report = profile(conn)
+    finally:
+        conn.close()
+
+    print_report(report)
+
+    out = option('out') or os.path.join(
+        OUT_DIR, f"{report['label']}_{datetime.now():%Y%m%d_%H%M%S}.json")
+    os.makedirs(os.path.dirname(out) or '.', exist_ok=True)
+    with open(out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, default=str)
+    print(f'\n💾 Saved {out}')
+
+    if option('compare'):
+        with open(option('compare'), encoding='utf-8') as f:
+            regressions = compare(report, json.load(f))
+        if regressions:
+            print(f'\n❌ {regressions} queries slower with a changed plan')
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except Exception as e:
+        print(f'\n❌ ERROR: {e}')
+        import traceback
+        traceback.print_exc()
@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+🧭 Index advisor
+Reads pg_stat_user_tables / pg_stat_user_indexes and the catalog and reports:
+
+- unused indexes (no scans since the last stats reset)
+- invalid indexes left behind by a failed CREATE INDEX CONCURRENTLY
+- duplicate indexes (same table, keys, order and predicate), e.g.
+  idx_users_email next to the unique constraint on users.email
+- prefix-redundant indexes whose keys lead a larger index
+- foreign keys with no index starting with their columns
+- tables read by sequential scans far more often than by index
+
+Every finding comes with the DDL that fixes it and the space it saves (or
+costs, for new FK indexes). The app reads through DatabaseReplicaManager's
+read client, so pass the replicas with --replicas to add their idx_scan
+counts before calling an index unused.
+
+Usage:
+    python scripts/database_utils/index_advisor.py
+    python scripts/database_utils/index_advisor.py --replicas=postgresql://replica1/... --out=index_fixes.sql
+"""
+
+import os
+import re
+import sys
+from datetime import datetime, timezone
+
+import psycopg2
+from psycopg2.extras import RealDictCursor
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DEFAULTS = {
+    'db': '',
+    'replicas': '',          # comma separated DSNs whose idx_scan is added
+    'schemas': 'public',
+    'min-rows': 10000,       # ignore seq scans on tables smaller than this
+    'seq-ratio': 10.0,       # flag when seq_scan > ratio * idx_scan
+    'out': '',               # write all DDL to this file
+}
+
+MIN_STATS_AGE_DAYS = 7
+
+INDEXES_SQL = """
+    SELECT n.nspname AS schema, t.relname AS table, i.relname AS index,
+           s.idx_scan, pg_relation_size(ix.indexrelid) AS size,
+           ix.indisunique AS is_unique, ix.indisprimary AS is_primary, ix.indisvalid AS is_valid,
+           am.amname AS method,
+           string_to_array(ix.indkey::text, ' ')::int[] AS attnums,
+           ARRAY(SELECT pg_get_indexdef(ix.indexrelid, k, true)
+                 FROM generate_series(1, ix.indnkeyatts) k) AS keys,
+           ix.indnkeyatts AS key_count,
+           ix.indclass::text AS opclasses, ix.indoption::text AS options,
+           pg_get_expr(ix.indpred, ix.indrelid) AS predicate,
+           con.conname AS constraint_name,
+           pg_get_indexdef(ix.indexrelid) AS definition
+    FROM pg_index ix
+    JOIN pg_class i ON i.oid = ix.indexrelid
+    JOIN pg_class t ON t.oid = ix.indrelid
+    JOIN pg_namespace n ON n.oid = t.relnamespace
+    JOIN pg_am am ON am.oid = i.relam
+    LEFT JOIN pg_stat_user_indexes s ON s.indexrelid = ix.indexrelid
+    LEFT JOIN pg_constraint con ON con.conindid = ix.indexrelid AND con.contype IN ('p', 'u', 'x')
+    WHERE n.nspname = ANY(%(schemas)s)
+"""
+
+TABLES_SQL = """
+    SELECT schemaname AS schema, relname AS table, seq_scan, seq_tup_read,
+           COALESCE(idx_scan, 0) AS idx_scan, n_live_tup,
+           pg_relation_size(relid) AS size,
+           COALESCE(last_analyze, last_autoanalyze) AS analyzed_at
+    FROM pg_stat_user_tables
+    WHERE schemaname = ANY(%(schemas)s)
+"""
+
+FOREIGN_KEYS_SQL = """
+    SELECT n.nspname AS schema, c.relname AS table, con.conname AS name,
+           con.conkey::int[] AS attnums,
+           ARRAY(SELECT a.attname FROM unnest(con.conkey) WITH ORDINALITY k(num, ord)
+                 JOIN pg_attribute a ON a.attrelid = con.conrelid AND a.attnum = k.num
+                 ORDER BY k.ord)::text[] AS columns,
+           con.confrelid::regclass::text AS referenced,
+           COALESCE(st.n_live_tup, 0) AS n_live_tup,
+           (SELECT COALESCE(sum(ps.avg_width), 0) FROM pg_stats ps
+            WHERE ps.schemaname = n.nspname AND ps.tablename = c.relname
+              AND ps.attname = ANY(ARRAY(SELECT a.attname FROM pg_attribute a
+                                         WHERE a.attrelid = con.conrelid AND a.attnum = ANY(con.conkey)))
+           ) AS key_width
+    FROM pg_constraint con
+    JOIN pg_class c ON c.oid = con.conrelid
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    LEFT JOIN pg_stat_user_tables st ON st.relid = c.oid
+    WHERE con.contype = 'f' AND n.nspname = ANY(%(schemas)s)
+"""
+
+
+def option(name):
+    """--name=value from sys.argv, typed like its default"""
+    default = DEFAULTS[name]
+    for arg in sys.argv[1:]:
+        if arg.startswith(f'--{name}='):
+            return type(default)(arg.split('=', 1)[1])
+    return default
+
+
+def pretty_size(size):
+    for unit in ('B', 'kB', 'MB', 'GB'):
+        if abs(size) < 1024 or unit == 'GB':
+            return f'{size:.0f} {unit}' if unit == 'B' else f'{size:.1f} {unit}'
+        size /= 1024
+
+
+def quoted(schema, name):
+    return f'"{schema}"."{name}"'
+
+
+# ---------------------------------------------------------------------------
+# Analysis
+# ---------------------------------------------------------------------------
+
+def load(conn, schemas):
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    params = {'schemas': schemas}
+    cur.execute(INDEXES_SQL, params)
+    indexes = [dict(r) for r in cur.fetchall()]
+    cur.execute(TABLES_SQL, params)
+    tables = [dict(r) for r in cur.fetchall()]
+    cur.execute(FOREIGN_KEYS_SQL, params)
+    foreign_keys = [dict(r) for r in cur.fetchall()]
+    cur.execute('SELECT stats_reset FROM pg_stat_database WHERE datname = current_database()')
+    stats_reset = cur.fetchone()['stats_reset']
+    cur.close()
+    return indexes, tables, foreign_keys, stats_reset
+
+
+def add_replica_scans(indexes, schemas):
+    """Sum idx_scan from each replica - reads served there never reach the primary's counters"""
+    by_name = {(i['schema'], i['index']): i for i in indexes}
+    for dsn in filter(None, option('replicas').split(',')):
+        conn = psycopg2.connect(dsn)
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT schemaname, indexrelname, idx_scan FROM pg_stat_user_indexes
+            WHERE schemaname = ANY(%s)
+        """, (schemas,))
+        for schema, index, scans in cur.fetchall():
+            if (schema, index) in by_name:
+                by_name[(schema, index)]['idx_scan'] = (by_name[(schema, index)]['idx_scan'] or 0) + scans
+        conn.close()
+
+
+def is_enforcing(index):
+    """Unique, primary key and constraint-backed indexes are never dropped by the advisor"""
+    return index['is_unique'] or index['is_primary'] or index['constraint_name']
+
+
+def signature(index, length=None):
+    """What makes two indexes interchangeable: method, keys, sort options, opclasses, predicate"""
+    n = length or index['key_count']
+    return (index['schema'], index['table'], index['method'], tuple(index['keys'][:n]),
+            tuple(index['options'].split()[:n]), tuple(index['opclasses'].split()[:n]), index['predicate'])
+
+
+def drop_ddl(index):
+    return f"DROP INDEX CONCURRENTLY IF EXISTS {quoted(index['schema'], index['index'])};"
+
+
+def find_unused(indexes):
+    findings = []
+    for index in indexes:
+        if index['is_valid'] and not is_enforcing(index) and not index['idx_scan']:
+            findings.append({
+                'kind': 'unused',
+                'target': f"{index['table']}.{index['index']}",
+                'detail': 'no index scans since stats reset',
+                'ddl': drop_ddl(index),
+                'saving': index['size'],
+            })
+    return findings
+
+
+def find_invalid(indexes):
+    return [{
+        'kind': 'invalid',
+        'target': f"{index['table']}.{index['index']}",
+        'detail': 'left behind by a failed CREATE INDEX CONCURRENTLY, still maintained on every write',
+        # Two statements: drop, then re-create (UNIQUE kept)
+        'ddl': drop_ddl(index) + '\n' + re.sub(
+            r'^CREATE (UNIQUE )?INDEX ', r'CREATE \1INDEX CONCURRENTLY ', index['definition']) + ';',
+        'saving': index['size'],
+    } for index in indexes if not index['is_valid']]
+
+
+def find_redundant(indexes):
+    """Exact duplicates first, then indexes whose keys are a leading prefix of another's"""
+    findings, dropped = [], set()
+    valid = [i for i in indexes if i['is_valid'] and 0 not in i['attnums'][:i['key_count']]]
+
+    groups = {}
+    for index in valid:
+        groups.setdefault(signature(index), []).append(index)
+    for group in groups.values():
+        if len(group) < 2:
+            continue
+        # Keep the one enforcing a constraint, then the most used
+        group.sort(key=lambda i: (bool(is_enforcing(i)), i['idx_scan'] or 0), reverse=True)
+        keeper = group[0]
+        for index in group[1:]:
+            if is_enforcing(index):
+                continue
+            dropped.add(index['index'])
+            findings.append({
+                'kind': 'duplicate',
+                'target': f"{index['table']}.{index['index']}",
+                'detail': f"same keys ({', '.join(index['keys'])}) as {keeper['index']}",
+                'ddl': drop_ddl(index),
+                'saving': index['size'],
+            })
+
+    for index in valid:
+        if index['index'] in dropped or is_enforcing(index) or index['method'] != 'btree':
+            continue
+        for other in valid:
+            if (other is index or other['index'] in dropped or other['method'] != 'btree'
+                    or other['key_count'] <= index['key_count']):
+                continue
+            if signature(other, index['key_count']) == signature(index):
+                dropped.add(index['index'])
+                findings.append({
+                    'kind': 'prefix',
+                    'target': f"{index['table']}.{index['index']}",
+                    'detail': f"({', '.join(index['keys'])}) leads {other['index']} "
+                              f"({', '.join(other['keys'])})",
+                    'ddl': drop_ddl(index),
+                    'saving': index['size'],
+                })
+                break
+    return findings
+
+
+def find_unindexed_foreign_keys(foreign_keys, indexes):
+    """An FK is covered when an index starts with its columns (in any order)"""
+    findings = []
+    for fk in foreign_keys:
+        covered = any(
+            i['schema'] == fk['schema'] and i['table'] == fk['table'] and i['is_valid']
+            and i['predicate'] is None and i['key_count'] >= len(fk['attnums'])
+            and set(i['attnums'][:len(fk['attnums'])]) == set(fk['attnums'])
+            for i in indexes
+        )
+        if covered:
+            continue
+        name = f"idx_{fk['table']}_{'_'.join(fk['columns'])}"[:63]
+        columns = ', '.join(f'"{c}"' for c in fk['columns'])
+        # btree leaf tuple ≈ key + 8 byte header + 6 byte tid, ~90% fill
+        estimate = fk['n_live_tup'] * ((fk['key_width'] or 16) + 14) / 0.9
+        findings.append({
+            'kind': 'fk_unindexed',
+            'target': f"{fk['table']}.{fk['name']}",
+            'detail': f"({', '.join(fk['columns'])}) → {fk['referenced']}: deletes/updates on the parent "
+                      f"scan {fk['n_live_tup']:,} rows",
+            'ddl': f"CREATE INDEX CONCURRENTLY IF NOT EXISTS \"{name}\" ON {quoted(fk['schema'], fk['table'])} ({columns});",
+            'saving': -estimate,
+        })
+    return findings
+
+
+def find_seq_scan_heavy(tables):
+    findings = []
+    for t in tables:
+        if t['n_live_tup'] < option('min-rows') or t['seq_scan'] <= option('seq-ratio') * max(t['idx_scan'], 1):
+            continue
+        avg_rows = t['seq_tup_read'] / t['seq_scan'] if t['seq_scan'] else 0
+        stale = t['analyzed_at'] is None
+        findings.append({
+            'kind': 'seq_scan',
+            'target': t['table'],
+            'detail': f"{t['seq_scan']:,} seq scans vs {t['idx_scan']:,} index scans, "
+                      f"~{avg_rows:,.0f} rows read per scan" + (', never analyzed' if stale else ''),
+            'ddl': (f"ANALYZE {quoted(t['schema'], t['table'])};" if stale else
+                    f"-- find the filtering queries: hot_query_profiler.py / pg_stat_statements on {t['table']}"),
+            'saving': 0,
+        })
+    return findings
+
+
+# ---------------------------------------------------------------------------
+# Report
+# ---------------------------------------------------------------------------
+
+SECTIONS = [
+    ('invalid', '💥 INVALID INDEXES'),
+    ('duplicate', '👯 DUPLICATE INDEXES'),
+    ('prefix', '📐 PREFIX-REDUNDANT INDEXES'),
+    ('unused', '💤 UNUSED INDEXES'),
+    ('fk_unindexed', '🔗 FOREIGN KEYS WITHOUT INDEX'),
+    ('seq_scan', '🐢 SEQ-SCAN HEAVY TABLES'),
+]
+
+
+def print_report(findings, stats_reset):
+    print('\n🧭 INDEX ADVISOR')
+    if stats_reset:
+        age = (datetime.now(timezone.utc) - stats_reset).days
+        print(f'   Stats collected since {stats_reset:%Y-%m-%d} ({age} days)')
+        if age < MIN_STATS_AGE_DAYS:
+            print(f'   ⚠️  Less than {MIN_STATS_AGE_DAYS} days of stats - treat "unused" with care')
+
+    for kind, title in SECTIONS:
+        section = sorted((f for f in findings if f['kind'] == kind), key=lambda f: f['saving'])
+        if not section:
+            continue
+        print(f'\n{title} ({len(section)})')
+        for f in section if kind == 'fk_unindexed' else reversed(section):
+            size = f" [{'+' if f['saving'] < 0 else '-'}{pretty_size(abs(f['saving']))}]" if f['saving'] else ''
+            print(f"   • {f['target']}{size}: {f['detail']}")
+            print('     ' + f['ddl'].replace('\n', '\n     '))
+
+    saved = sum(f['saving'] for f in findings if f['saving'] > 0)
+    added = -sum(f['saving'] for f in findings if f['saving'] < 0)
+    print('\n' + '='*60)
+    print(f'📊 {len(findings)} findings: ~{pretty_size(saved)} freed by drops, '
+          f'~{pretty_size(added)} for missing FK indexes')
+
+
+def write_ddl(findings, path):
+    lines = [
+        f'-- Index advisor, {datetime.now():%Y-%m-%d %H:%M}',
+        '-- CONCURRENTLY statements cannot run inside a transaction block: run this file with psql',
+        '-- directly, not wrapped in BEGIN/COMMIT.',
+        '',
+    ]
+    for kind, title in SECTIONS:
+        section = [f for f in findings if f['kind'] == kind]
+        if section:
+            lines.append(f'-- {title[2:].strip()}')
+            lines += [f"{f['ddl']}  -- {f['target']}" for f in section]
+            lines.append('')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines))
+    print(f'💾 DDL written to {path}')
+
+
+def main():
+    schemas = option('schemas').split(',')
+    conn = psycopg2.connect(option('db') or os.getenv('SUPABASE_DB_TRANSACTION_URL'))
+    try:
+        indexes, tables, foreign_keys, stats_reset = load(conn, schemas)
+    finally:
+        conn.close()
+    add_replica_scans(indexes, schemas)
+
+    findings = (find_invalid(indexes) + find_redundant(indexes) + find_unindexed_foreign_keys(foreign_keys, indexes)
+                + find_seq_scan_heavy(tables))
+    flagged = {f['target'] for f in findings}
+    findings += [f for f in find_unused(indexes) if f['target'] not in flagged]
+
+    print_report(findings, stats_reset)
+    if option('out'):
+        write_ddl(findings, option('out'))
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except Exception as e:
+        print(f'\n❌ ERROR: {e}')
+        import traceback
+        traceback.print_exc()
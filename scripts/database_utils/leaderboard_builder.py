@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+🏆 Leaderboard snapshot builder
+Keeps public.leaderboard_snapshots (migration
+20251210030000_create_leaderboard_snapshots.sql) in sync with users, so the
+leaderboard screen reads an index instead of ranking every player per call:
+
+- refresh:    drains leaderboard_dirty_users (filled by trigger when
+              elo_rating / wins / tournament_wins / spa_points / rank /
+              total_matches change) and rewrites only those players' rows
+- full:       rebuilds every board in one transaction
+- benchmark:  get_leaderboard() vs get_leaderboard_snapshot() for every board
+              and rank filter, latency and whether both return the same order
+
+Sort values are the same as get_leaderboard(); a NULL elo_rating/wins/
+tournament_wins sorts as 0 instead of first.
+
+Usage:
+    python scripts/database_utils/leaderboard_builder.py refresh
+    python scripts/database_utils/leaderboard_builder.py full
+    python scripts/database_utils/leaderboard_builder.py benchmark --iterations=50
+"""
+
+import os
+import sys
+import time
+
+import psycopg2
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DEFAULTS = {
+    'db': '',
+    'batch': 5000,        # dirty users per transaction
+    'iterations': 30,     # benchmark calls per board/filter and function
+    'limit': 100,         # limit_count used by LeaderboardScreen
+}
+
+# Same order keys as get_leaderboard()
+BOARD_VALUES = {
+    'elo': 'COALESCE(u.elo_rating, 0)',
+    'wins': 'COALESCE(u.wins, 0)',
+    'tournaments': 'COALESCE(u.tournament_wins, 0)',
+    'spa_points': 'COALESCE(u.spa_points, 1000)',
+}
+
+# Rank filters offered by the leaderboard screen (NULL = all ranks)
+RANK_FILTERS = [None, 'K', 'I', 'H', 'G', 'F', 'E']
+
+# Advisory lock so two builders never interleave
+LOCK_KEY = 'leaderboard_snapshots'
+
+SNAPSHOT_ROWS_SQL = ' UNION ALL '.join(
+    f"SELECT '{board}', u.id, u.rank, {value} FROM users u WHERE u.total_matches > 0 {{extra}}"
+    for board, value in BOARD_VALUES.items()
+)
+
+
+def option(name):
+    """--name=value from sys.argv, typed like its default"""
+    default = DEFAULTS[name]
+    for arg in sys.argv[1:]:
+        if arg.startswith(f'--{name}='):
+            return type(default)(arg.split('=', 1)[1])
+    return default
+
+
+def connect():
+    return psycopg2.connect(option('db') or os.getenv('SUPABASE_DB_TRANSACTION_URL'))
+
+
+def take_lock(cur):
+    cur.execute('SELECT pg_advisory_xact_lock(hashtext(%s))', (LOCK_KEY,))
+
+
+# ---------------------------------------------------------------------------
+# Build
+# ---------------------------------------------------------------------------
+
+def full_rebuild(conn):
+    """Every board from scratch; readers keep seeing the old rows until commit"""
+    started = time.perf_counter()
+    with conn.cursor() as cur:
+        take_lock(cur)
+        cur.execute('DELETE FROM leaderboard_dirty_users')
+        cur.execute('DELETE FROM leaderboard_snapshots')
+        cur.execute('INSERT INTO leaderboard_snapshots (board_type, player_id, rank, sort_value) '
+                    + SNAPSHOT_ROWS_SQL.format(extra=''))
+        rows = cur.rowcount
+    conn.commit()
+    print(f'🏗️ Rebuilt {rows:,} snapshot rows ({rows // len(BOARD_VALUES):,} players) '
+          f'in {time.perf_counter() - started:.2f}s')
+
+
+def refresh_batch(conn, batch):
+    """Rewrites the rows of up to `batch` dirty users; returns how many were drained"""
+    with conn.cursor() as cur:
+        take_lock(cur)
+        cur.execute("""
+            DELETE FROM leaderboard_dirty_users
+            WHERE user_id IN (
+                SELECT user_id FROM leaderboard_dirty_users
+                ORDER BY changed_at LIMIT %s FOR UPDATE SKIP LOCKED
+            )
+            RETURNING user_id
+        """, (batch,))
+        user_ids = [r[0] for r in cur.fetchall()]
+        if not user_ids:
+            conn.commit()
+            return 0
+
+        cur.execute('DELETE FROM leaderboard_snapshots WHERE player_id = ANY(%s::uuid[])', (user_ids,))
+        removed = cur.rowcount
+        cur.execute('INSERT INTO leaderboard_snapshots (board_type, player_id, rank, sort_value) '
+                    + SNAPSHOT_ROWS_SQL.format(extra='AND u.id = ANY(%(ids)s::uuid[])'),
+                    {'ids': user_ids})
+        written = cur.rowcount
+    conn.commit()
+    print(f'   ♻️  {len(user_ids):,} players: -{removed:,} / +{written:,} rows')
+    return len(user_ids)
+
+
+def refresh(conn):
+    with conn.cursor() as cur:
+        cur.execute('SELECT EXISTS (SELECT 1 FROM leaderboard_snapshots)')
+        built = cur.fetchone()[0]
+    conn.commit()
+    if not built:
+        print('📭 Snapshot is empty - building it from scratch')
+        full_rebuild(conn)
+        return
+
+    started = time.perf_counter()
+    total = 0
+    while True:
+        drained = refresh_batch(conn, option('batch'))
+        total += drained
+        if drained < option('batch'):
+            break
+    if total:
+        print(f'✅ Refreshed {total:,} changed players in {time.perf_counter() - started:.2f}s')
+    else:
+        print('✅ Leaderboards already up to date')
+
+
+# ---------------------------------------------------------------------------
+# Benchmark
+# ---------------------------------------------------------------------------
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+
+# Column of the result each board is ordered by
+BOARD_COLUMN = {'elo': 5, 'wins': 6, 'tournaments': 7, 'spa_points': 8}
+
+
+def timed_call(cur, function, board, rank_filter):
+    started = time.perf_counter()
+    cur.execute(f'SELECT * FROM {function}(%s, %s, %s)', (board, rank_filter, option('limit')))
+    rows = cur.fetchall()
+    return (time.perf_counter() - started) * 1000, rows
+
+
+def benchmark(conn):
+    conn.autocommit = True
+    cur = conn.cursor()
+    cur.execute('SELECT count(*) FROM leaderboard_dirty_users')
+    pending = cur.fetchone()[0]
+    if pending:
+        print(f'⚠️  {pending:,} players changed since the last refresh - results may differ')
+
+    print(f"\n{'board':12} {'filter':6} {'live p50':>9} {'p95':>8} {'snap p50':>9} {'p95':>8} {'speedup':>8}  same order")
+    live_all, snap_all, mismatches = [], [], 0
+    for board in BOARD_VALUES:
+        for rank_filter in RANK_FILTERS:
+            live, snap = [], []
+            for _ in range(option('iterations')):
+                ms, live_rows = timed_call(cur, 'get_leaderboard', board, rank_filter)
+                live.append(ms)
+                ms, snap_rows = timed_call(cur, 'get_leaderboard_snapshot', board, rank_filter)
+                snap.append(ms)
+            # Ties may be ordered differently by the live function, compare the sort values
+            column = BOARD_COLUMN[board]
+            same = [r[column] or 0 for r in live_rows] == [r[column] or 0 for r in snap_rows]
+            mismatches += not same
+            live_all += live
+            snap_all += snap
+            print(f"{board:12} {rank_filter or 'all':6} {percentile(live, 50):>8.2f}ms {percentile(live, 95):>6.2f}ms "
+                  f"{percentile(snap, 50):>8.2f}ms {percentile(snap, 95):>6.2f}ms "
+                  f"{percentile(live, 50) / max(percentile(snap, 50), 0.001):>7.1f}x  {'✅' if same else '❌'}")
+
+    print('\n' + '='*60)
+    print(f'📊 live p50 {percentile(live_all, 50):.2f} ms / p95 {percentile(live_all, 95):.2f} ms, '
+          f'snapshot p50 {percentile(snap_all, 50):.2f} ms / p95 {percentile(snap_all, 95):.2f} ms')
+    print('✅ Snapshot matches the live leaderboard' if not mismatches
+          else f'❌ {mismatches} board/filter combinations differ')
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    command = args[0] if args else 'refresh'
+    commands = {'refresh': refresh, 'full': full_rebuild, 'benchmark': benchmark}
+    if command not in commands:
+        print(__doc__)
+        return
+
+    conn = connect()
+    try:
+        commands[command](conn)
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except Exception as e:
+        print(f'\n❌ ERROR: {e}')
+        import traceback
+        traceback.print_exc()
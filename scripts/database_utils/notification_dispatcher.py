@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+🔔 Notification dispatcher - thousands of notifications per statement
+Writes a batch of notifications with one INSERT ... SELECT FROM
+jsonb_to_recordset(...), or with COPY when the batch is larger than
+--copy-threshold, instead of one INSERT per row like the old
+send_batch_notifications() loop.
+
+- send:       JSON file with an array of {user_id, title, message, type,
+              data, club_id, priority, action_type, action_data}
+              (same shape send_batch_notifications() accepts)
+- announce:   one title/message to every participant of a tournament or
+              every active member of a club
+- benchmark:  old loop function vs send_batch_notifications() vs the
+              recordset INSERT vs COPY for growing batches; every run is
+              rolled back
+
+Missing fields get the column defaults (data/action_data {}, priority
+'normal', action_type 'none').
+
+Usage:
+    python scripts/database_utils/notification_dispatcher.py send notifications.json [--dry-run]
+    python scripts/database_utils/notification_dispatcher.py announce tournament <tournament_id> --title="..." --message="..."
+    python scripts/database_utils/notification_dispatcher.py announce club <club_id> --title="..." --message="..." --type=club
+    python scripts/database_utils/notification_dispatcher.py benchmark --db=postgresql://localhost/sabo_arena --sizes=64,1000,10000
+"""
+
+import io
+import json
+import os
+import statistics
+import sys
+import time
+import uuid
+
+import psycopg2
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DEFAULTS = {
+    'db': '',
+    'copy-threshold': 5000,   # batches above this size go through COPY
+    'title': '',
+    'message': '',
+    'type': 'system',
+    'sizes': '64,1000,10000,100000',
+    'repeat': 5,              # benchmark runs per strategy and size
+}
+
+# Written columns, in COPY / recordset order
+FIELDS = ('user_id', 'club_id', 'type', 'title', 'message', 'data', 'priority', 'action_type', 'action_data')
+COLUMN_DEFAULTS = {'club_id': None, 'data': {}, 'priority': 'normal', 'action_type': 'none', 'action_data': {}}
+REQUIRED = ('user_id', 'type', 'title', 'message')
+
+RECORDSET_SQL = f"""
+    INSERT INTO notifications ({', '.join(FIELDS)}, is_read, is_dismissed, created_at)
+    SELECT {', '.join(f'n.{f}' for f in FIELDS)}, false, false, NOW()
+    FROM jsonb_to_recordset(%s::jsonb) AS n(
+        user_id UUID, club_id UUID, type TEXT, title TEXT, message TEXT,
+        data JSONB, priority TEXT, action_type TEXT, action_data JSONB
+    )
+"""
+
+# send_batch_notifications() as in sql_migrations/create_notification_functions.sql,
+# kept as a temp function so the benchmark has a baseline after the migration
+LEGACY_FUNCTION_SQL = """
+    CREATE FUNCTION pg_temp.send_batch_notifications_loop(p_notifications JSONB)
+    RETURNS INTEGER
+    LANGUAGE plpgsql
+    AS $$
+    DECLARE
+      v_notification JSONB;
+      v_count INTEGER := 0;
+    BEGIN
+      FOR v_notification IN SELECT * FROM jsonb_array_elements(p_notifications)
+      LOOP
+        INSERT INTO notifications (user_id, title, message, type, data, is_read, is_dismissed, created_at)
+        VALUES (
+          (v_notification->>'user_id')::UUID,
+          v_notification->>'title',
+          v_notification->>'message',
+          v_notification->>'type',
+          COALESCE(v_notification->'data', '{}'::jsonb),
+          false,
+          false,
+          NOW()
+        );
+        v_count := v_count + 1;
+      END LOOP;
+      RETURN v_count;
+    END;
+    $$
+"""
+
+
+def option(name):
+    """--name=value from sys.argv, typed like its default"""
+    default = DEFAULTS[name]
+    for arg in sys.argv[1:]:
+        if arg.startswith(f'--{name}='):
+            return type(default)(arg.split('=', 1)[1])
+    return default
+
+
+def connect():
+    return psycopg2.connect(option('db') or os.getenv('SUPABASE_DB_TRANSACTION_URL'))
+
+
+# ---------------------------------------------------------------------------
+# Dispatch
+# ---------------------------------------------------------------------------
+
+def normalize(notifications):
+    """Fills column defaults; raises ValueError naming the first bad entry"""
+    rows = []
+    for i, n in enumerate(notifications):
+        missing = [f for f in REQUIRED if not n.get(f)]
+        if missing:
+            raise ValueError(f"notification {i} is missing {', '.join(missing)}")
+        rows.append({f: n.get(f, COLUMN_DEFAULTS.get(f)) for f in FIELDS})
+    return rows
+
+
+def insert_recordset(cur, rows):
+    cur.execute(RECORDSET_SQL, (json.dumps(rows, ensure_ascii=False, default=str),))
+    return cur.rowcount
+
+
+def _copy_value(value):
+    """COPY text format: \\N for NULL, backslash escapes for the rest"""
+    if value is None:
+        return '\\N'
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value, ensure_ascii=False, default=str)
+    return (str(value).replace('\\', '\\\\').replace('\t', '\\t')
+            .replace('\n', '\\n').replace('\r', '\\r'))
+
+
+def insert_copy(cur, rows):
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write('\t'.join(_copy_value(row[f]) for f in FIELDS))
+        buffer.write('\n')
+    buffer.seek(0)
+    cur.copy_expert(f"COPY notifications ({', '.join(FIELDS)}) FROM STDIN", buffer)
+    return len(rows)
+
+
+def dispatch(cur, notifications):
+    """Writes all notifications in one statement; does not commit.
+    Returns (rows written, 'recordset' | 'copy')."""
+    rows = normalize(notifications)
+    if not rows:
+        return 0, 'recordset'
+    if len(rows) > option('copy-threshold'):
+        return insert_copy(cur, rows), 'copy'
+    return insert_recordset(cur, rows), 'recordset'
+
+
+# ---------------------------------------------------------------------------
+# Audiences
+# ---------------------------------------------------------------------------
+
+def tournament_audience(cur, tournament_id):
+    cur.execute("""
+        SELECT tp.user_id::text, t.title, t.club_id::text
+        FROM tournament_participants tp
+        JOIN tournaments t ON t.id = tp.tournament_id
+        WHERE tp.tournament_id = %s
+    """, (tournament_id,))
+    rows = cur.fetchall()
+    data = {'tournament_id': tournament_id, 'tournament_name': rows[0][1] if rows else None}
+    return [r[0] for r in rows], (rows[0][2] if rows else None), data
+
+
+def club_audience(cur, club_id):
+    cur.execute("""
+        SELECT cm.user_id::text, c.name
+        FROM club_members cm
+        JOIN clubs c ON c.id = cm.club_id
+        WHERE cm.club_id = %s AND cm.status = 'active'
+    """, (club_id,))
+    rows = cur.fetchall()
+    data = {'club_id': club_id, 'club_name': rows[0][1] if rows else None}
+    return [r[0] for r in rows], club_id, data
+
+
+def write(conn, notifications, label):
+    dry_run = '--dry-run' in sys.argv
+    started = time.perf_counter()
+    with conn.cursor() as cur:
+        written, path = dispatch(cur, notifications)
+    elapsed = (time.perf_counter() - started) * 1000
+    if dry_run:
+        conn.rollback()
+        print(f'💡 Dry run - {written:,} {label} notifications rolled back ({path}, {elapsed:.1f} ms)')
+        return
+    conn.commit()
+    print(f'✅ Sent {written:,} {label} notifications via {path} in {elapsed:.1f} ms')
+
+
+def send(conn, path):
+    with open(path, encoding='utf-8') as f:
+        notifications = json.load(f)
+    if not isinstance(notifications, list):
+        print(f'❌ {path} must contain a JSON array')
+        return
+    write(conn, notifications, path)
+
+
+def announce(conn, audience, target_id):
+    if not option('title') or not option('message'):
+        print('❌ announce needs --title and --message')
+        return
+    builders = {'tournament': tournament_audience, 'club': club_audience}
+    if audience not in builders:
+        print(f'❌ Unknown audience {audience} (tournament or club)')
+        return
+    with conn.cursor() as cur:
+        user_ids, club_id, data = builders[audience](cur, target_id)
+    if not user_ids:
+        print(f'📭 No recipients in {audience} {target_id}')
+        return
+    notifications = [{'user_id': uid, 'club_id': club_id, 'type': option('type'),
+                      'title': option('title'), 'message': option('message'), 'data': data}
+                     for uid in user_ids]
+    write(conn, notifications, f'{audience} {target_id}')
+
+
+# ---------------------------------------------------------------------------
+# Benchmark
+# ---------------------------------------------------------------------------
+
+def sample_notifications(n):
+    """Tournament-start sized rows; user_id has no foreign key, club_id stays NULL"""
+    tournament_id = str(uuid.uuid4())
+    return [{
+        'user_id': str(uuid.uuid4()),
+        'type': 'tournament_started',
+        'title': 'Giải đấu đã bắt đầu! 🎱',
+        'message': 'Giải đấu "SABO OPEN 12/2025" tại SABO Arena Vũng Tàu đã bắt đầu! '
+                   'Vào xem lịch thi đấu của bạn.',
+        'data': {'tournament_id': tournament_id, 'tournament_name': 'SABO OPEN 12/2025'},
+    } for _ in range(n)]
+
+
+def run_function(cur, name, rows):
+    cur.execute(f'SELECT {name}(%s::jsonb)', (json.dumps(rows, ensure_ascii=False),))
+    return cur.fetchone()[0]
+
+
+STRATEGIES = {
+    'loop (old)': lambda cur, rows: run_function(cur, 'pg_temp.send_batch_notifications_loop', rows),
+    'function': lambda cur, rows: run_function(cur, 'send_batch_notifications', rows),
+    'recordset': lambda cur, rows: insert_recordset(cur, normalize(rows)),
+    'copy': lambda cur, rows: insert_copy(cur, normalize(rows)),
+}
+
+
+def benchmark(conn):
+    if not option('db'):
+        print('❌ benchmark writes (and rolls back) notifications - pass --db=<local postgres dsn>')
+        return
+    with conn.cursor() as cur:
+        cur.execute(LEGACY_FUNCTION_SQL)
+    conn.commit()
+
+    print(f"{'rows':>8} {'strategy':12} {'median':>10} {'best':>10} {'rows/s':>12} {'vs loop':>8}")
+    for size in sorted(int(s) for s in option('sizes').split(',')):
+        rows = sample_notifications(size)
+        baseline = None
+        for name, run in STRATEGIES.items():
+            timings = []
+            for _ in range(option('repeat')):
+                with conn.cursor() as cur:
+                    started = time.perf_counter()
+                    written = run(cur, rows)
+                    timings.append((time.perf_counter() - started) * 1000)
+                conn.rollback()
+                if written != size:
+                    raise RuntimeError(f'{name} wrote {written} of {size} rows')
+            median = statistics.median(timings)
+            baseline = baseline or median
+            print(f'{size:>8,} {name:12} {median:>8.1f}ms {min(timings):>8.1f}ms '
+                  f'{size / median * 1000:>12,.0f} {baseline / median:>7.1f}x')
+        print()
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    command = args[0] if args else ''
+    if command not in ('send', 'announce', 'benchmark') or \
+            (command == 'send' and len(args) < 2) or (command == 'announce' and len(args) < 3):
+        print(__doc__)
+        return
+
+    conn = connect()
+    try:
+        if command == 'send':
+            send(conn, args[1])
+        elif command == 'announce':
+            announce(conn, args[1], args[2])
+        else:
+            benchmark(conn)
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except Exception as e:
+        print(f'\n❌ ERROR: {e}')
+        import traceback
+        traceback.print_exc()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+🎖️ Rank reclassifier - users.rank from users.elo_rating in one pass
+Loads the bands from rank_system once (K 1000-1099 ... C 2100-2199, mirrored
+in RANK_ELO_RANGES of lib/core/constants/ranking_constants.dart), maps every
+rated user to a rank with numpy searchsorted over the sorted elo_min array
+and writes only the users whose rank changed with one UPDATE ... FROM unnest.
+
+Same rules as RankingConstants.getRankFromElo:
+- below the lowest band → lowest rank (K)
+- above the highest band → highest rank (C); get_rank_from_elo() in the
+  database falls back to K here, users affected are counted in the report
+- users without elo_rating are unrated and left untouched
+
+Prints the population per rank before and after.
+
+Usage:
+    python scripts/database_utils/rank_reclassifier.py [--dry-run]
+"""
+
+import os
+import sys
+
+import numpy as np
+import psycopg2
+from dotenv import load_dotenv
+
+load_dotenv()
+
+BAR_WIDTH = 40
+
+
+def load_bands(cur):
+    cur.execute('SELECT rank_code, elo_min, elo_max FROM rank_system ORDER BY elo_min, rank_value')
+    rows = cur.fetchall()
+    if not rows:
+        raise RuntimeError('rank_system is empty - run scripts/run_rank_system_migration.dart first')
+    codes = [r[0] for r in rows]
+    mins = np.array([r[1] for r in rows], dtype=np.int64)
+    maxs = np.array([r[2] for r in rows], dtype=np.int64)
+
+    # Bands must not overlap; gaps are allowed but reported
+    overlaps = np.flatnonzero(mins[1:] <= maxs[:-1])
+    if len(overlaps):
+        pairs = ', '.join(f'{codes[i]}/{codes[i + 1]}' for i in overlaps)
+        raise RuntimeError(f'rank_system bands overlap: {pairs}')
+    gaps = [(codes[i], int(maxs[i]) + 1, int(mins[i + 1]) - 1)
+            for i in np.flatnonzero(mins[1:] > maxs[:-1] + 1)]
+    return codes, mins, maxs, gaps
+
+
+def load_users(cur):
+    cur.execute('SELECT id::text, elo_rating, rank FROM users WHERE elo_rating IS NOT NULL')
+    rows = cur.fetchall()
+    if not rows:
+        return [], np.empty(0, dtype=np.int64), []
+    ids, elos, ranks = zip(*rows)
+    return list(ids), np.array(elos, dtype=np.int64), list(ranks)
+
+
+def classify(elos, mins):
+    """Index of the band with the largest elo_min <= elo, clamped to the first/last band"""
+    return np.clip(np.searchsorted(mins, elos, side='right') - 1, 0, len(mins) - 1)
+
+
+def histogram(title, codes, counts, extra=None):
+    print(f'\n{title}')
+    top = max(max(counts), 1)
+    for code, count in zip(codes, counts):
+        bar = '█' * int(round(count / top * BAR_WIDTH))
+        print(f'   {code:>3} {count:>7,} {bar}')
+    for label, count in (extra or {}).items():
+        if count:
+            print(f'   {label:>3} {count:>7,}')
+
+
+def main():
+    dry_run = '--dry-run' in sys.argv
+
+    conn = psycopg2.connect(os.getenv('SUPABASE_DB_TRANSACTION_URL'))
+    cur = conn.cursor()
+
+    codes, mins, maxs, gaps = load_bands(cur)
+    print(f"🎖️ {len(codes)} ranks: {', '.join(f'{c} {lo}-{hi}' for c, lo, hi in zip(codes, mins, maxs))}")
+    for code, lo, hi in gaps:
+        print(f'   ⚠️  No band for {lo}-{hi}, classified as {code}')
+
+    ids, elos, current = load_users(cur)
+    if not ids:
+        print('📭 No rated users')
+        return
+    band = classify(elos, mins)
+    new_ranks = np.array(codes, dtype=object)[band]
+    changed = np.flatnonzero(new_ranks != np.array(current, dtype=object))
+
+    code_index = {c: i for i, c in enumerate(codes)}
+    before = np.zeros(len(codes), dtype=np.int64)
+    known = np.array([code_index.get(r, -1) for r in current])
+    np.add.at(before, known[known >= 0], 1)
+    after = np.bincount(band, minlength=len(codes))
+
+    histogram('📊 BEFORE', codes, before, {'?': int((known < 0).sum())})
+    histogram('📊 AFTER', codes, after)
+    print(f'\n   Rated users:       {len(ids):,}')
+    print(f'   Below {mins[0]}:        {int((elos < mins[0]).sum()):,} (→ {codes[0]})')
+    print(f'   Above {maxs[-1]}:        {int((elos > maxs[-1]).sum()):,} (→ {codes[-1]}, '
+          f'get_rank_from_elo() gives K)')
+    print(f'   Rank changes:      {len(changed):,}')
+
+    moves = {}
+    for i in changed:
+        key = (current[i] or 'NULL', new_ranks[i])
+        moves[key] = moves.get(key, 0) + 1
+    for (old, new), count in sorted(moves.items(), key=lambda item: -item[1])[:15]:
+        print(f'      {old:>4} → {new:<3} {count:,}')
+
+    if not len(changed):
+        print('\n✅ Every rank already matches its ELO')
+        return
+    if dry_run:
+        print('\n💡 Dry run - no changes written')
+        return
+
+    # Skip a user whose ELO moved since it was read; the next run picks it up
+    cur.execute("""
+        UPDATE users u
+        SET rank = c.rank, updated_at = NOW()
+        FROM unnest(%s::uuid[], %s::int[], %s::text[]) AS c(id, elo_rating, rank)
+        WHERE u.id = c.id AND u.elo_rating = c.elo_rating
+    """, (
+        [ids[i] for i in changed],
+        [int(elos[i]) for i in changed],
+        [new_ranks[i] for i in changed],
+    ))
+    updated = cur.rowcount
+    conn.commit()
+    cur.close()
+    conn.close()
+    print(f'\n✅ Updated {updated:,} ranks')
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except Exception as e:
+        print(f'\n❌ ERROR: {e}')
+        import traceback
+        traceback.print_exc()
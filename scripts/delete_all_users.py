@@ -1,68 +1,42 @@
 import os
-import requests
+import sys
+import psycopg2
 from dotenv import load_dotenv
 
+from erase_users import ALL_USERS, erase_users
+
 # Load credentials
 load_dotenv()
 
-SUPABASE_URL = os.getenv('SUPABASE_URL')
-SERVICE_ROLE_KEY = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
+dry_run = '--dry-run' in sys.argv
 
 print('🗑️  DELETING ALL USERS...\n')
-print(f'Connected: {SUPABASE_URL}\n')
-
-headers = {
-    'apikey': SERVICE_ROLE_KEY,
-    'Authorization': f'Bearer {SERVICE_ROLE_KEY}',
-    'Content-Type': 'application/json'
-}
 
-# Method 1: Delete from public.users using exec_sql
-print('1. Deleting from public.users...')
-try:
-    response = requests.post(
-        f'{SUPABASE_URL}/rest/v1/rpc/exec_sql',
-        headers=headers,
-        json={'query': 'DELETE FROM public.users;'}
-    )
-    if response.status_code == 200:
-        print('   ✅ Deleted from public.users\n')
-    else:
-        print(f'   ❌ Failed: {response.status_code} - {response.text}\n')
-except Exception as e:
-    print(f'   ❌ Error: {e}\n')
+conn = psycopg2.connect(os.getenv('SUPABASE_DB_TRANSACTION_URL'))
+cur = conn.cursor()
+# auth.users rows without a public.users profile are included
+cur.execute(f'SELECT DISTINCT id::text FROM ({ALL_USERS}) u ORDER BY 1')
+user_ids = [r[0] for r in cur.fetchall()]
+conn.commit()
+print(f'Users to erase: {len(user_ids)}\n')
 
-# Method 2: Delete from auth.users using exec_sql
-print('2. Deleting from auth.users...')
-try:
-    response = requests.post(
-        f'{SUPABASE_URL}/rest/v1/rpc/exec_sql',
-        headers=headers,
-        json={'query': 'DELETE FROM auth.users;'}
-    )
-    if response.status_code == 200:
-        print('   ✅ Deleted from auth.users\n')
-    else:
-        print(f'   ❌ Failed: {response.status_code} - {response.text}\n')
-except Exception as e:
-    print(f'   ❌ Error: {e}\n')
+# Dependent rows (posts, chat_messages, notifications...) go leaf-first in
+# small batches, then public.users and auth.users - see erase_users.py
+stats = erase_users(conn, user_ids, dry_run=dry_run,
+                    detach_references='--detach-references' in sys.argv)
+stats.report()
 
 # Verify
-print('📊 Verifying...')
-try:
-    response = requests.get(
-        f'{SUPABASE_URL}/rest/v1/users?select=id',
-        headers=headers
-    )
-    if response.status_code == 200:
-        users = response.json()
-        print(f'   Remaining users: {len(users)}')
-        
-        if len(users) == 0:
-            print('\n🎉 All users deleted successfully!')
-        else:
-            print(f'\n⚠️  {len(users)} users still remain!')
-    else:
-        print(f'   ❌ Failed to verify: {response.status_code}')
-except Exception as e:
-    print(f'   ❌ Error: {e}')
+print('\n📊 Verifying...')
+cur.execute(f'SELECT count(DISTINCT id) FROM ({ALL_USERS}) u')
+remaining = cur.fetchone()[0]
+cur.close()
+conn.close()
+print(f'   Remaining users: {remaining}')
+
+if dry_run:
+    print('\n🔍 Dry run - nothing deleted')
+elif remaining == 0:
+    print('\n🎉 All users deleted successfully!')
+else:
+    print(f'\n⚠️  {remaining} users still remain (signed up during the run?)')
@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""
+🗑️ Erase users - FK-graph driven, leaf-first, in bounded batches
+Instead of one DELETE FROM users that cascades through chat_messages, posts,
+notifications, post_likes... inside a single huge transaction:
+
+- the foreign key graph below public.users and auth.users is read from
+  pg_catalog (table_reservations, club_follows, club_reviews... reference
+  auth.users directly)
+- ON DELETE SET NULL / SET DEFAULT references are cleared first
+- ON DELETE CASCADE dependents are deleted leaf-first (post_likes before posts
+  before users), at most --batch rows per statement, one transaction each
+- NO ACTION / RESTRICT references (tournament_payments.verified_by,
+  rank_requests.reviewed_by, matches.winner_id...) protect other users' rows:
+  if any point at the erased users nothing is erased and they are reported;
+  --detach-references clears the nullable ones instead
+- auth.users rows go last; --keep-auth leaves them and everything that only
+  depends on them alone
+
+Users are processed --users-per-pass at a time; progress and per-table
+throughput are printed as it goes, so the app keeps working meanwhile.
+
+Usage:
+    python scripts/erase_users.py <user_id> [<user_id> ...] [--dry-run]
+    python scripts/erase_users.py --test-users [--dry-run]
+    python scripts/erase_users.py --all --batch=2000 --sleep=0.1
+    python scripts/erase_users.py <user_id> --detach-references
+"""
+
+import os
+import sys
+import time
+from collections import defaultdict
+
+import psycopg2
+from psycopg2 import sql
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Emails used by the seeding / import scripts for generated accounts
+TEST_USER_EMAILS = [
+    '%@sabo.local',
+    '%@sabo-arena.local',
+    '%@test.com',
+    '%@example.com',
+    '%@demo.billiards.vn',
+]
+
+DEFAULTS = {
+    'batch': 1000,            # rows per DELETE/UPDATE statement
+    'users-per-pass': 500,    # users whose rows are erased together
+    'sleep': 0.05,            # pause between statements (seconds)
+    'lock-timeout': '2s',
+    'statement-timeout': '30s',
+}
+
+ROOTS = (('public', 'users'), ('auth', 'users'))
+
+
+def option(name):
+    """--name=value from sys.argv, typed like its default"""
+    default = DEFAULTS[name]
+    for arg in sys.argv[1:]:
+        if arg.startswith(f'--{name}='):
+            return type(default)(arg.split('=', 1)[1])
+    return default
+
+
+class ForeignKey:
+    """child(columns) → parent(ref_columns), with its ON DELETE action"""
+
+    def __init__(self, child, columns, parent, ref_columns, on_delete, not_null):
+        self.child = child
+        self.columns = columns
+        self.parent = parent
+        self.ref_columns = ref_columns
+        self.on_delete = on_delete        # pg_constraint.confdeltype
+        self.not_null = not_null
+
+    @property
+    def nullifies(self):
+        return self.on_delete in ('n', 'd')
+
+    @property
+    def cascades(self):
+        return self.on_delete == 'c'
+
+    def __repr__(self):
+        return f'{qualified(self.child)}({", ".join(self.columns)}) → {qualified(self.parent)}'
+
+
+def qualified(table):
+    schema, name = table
+    return name if schema == 'public' else f'{schema}.{name}'
+
+
+def load_foreign_keys(cur):
+    cur.execute("""
+        SELECT cn.nspname, cl.relname,
+               array_agg(a.attname ORDER BY k.ord),
+               pn.nspname, pcl.relname,
+               array_agg(pa.attname ORDER BY k.ord),
+               c.confdeltype::text,
+               bool_or(a.attnotnull)
+        FROM pg_constraint c
+        JOIN pg_class cl ON cl.oid = c.conrelid
+        JOIN pg_namespace cn ON cn.oid = cl.relnamespace
+        JOIN pg_class pcl ON pcl.oid = c.confrelid
+        JOIN pg_namespace pn ON pn.oid = pcl.relnamespace
+        CROSS JOIN LATERAL unnest(c.conkey, c.confkey) WITH ORDINALITY AS k(att, ref_att, ord)
+        JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = k.att
+        JOIN pg_attribute pa ON pa.attrelid = c.confrelid AND pa.attnum = k.ref_att
+        WHERE c.contype = 'f'
+          AND cn.nspname NOT IN ('pg_catalog', 'information_schema')
+        GROUP BY c.oid, cn.nspname, cl.relname, pn.nspname, pcl.relname, c.confdeltype
+    """)
+    return [ForeignKey((cs, ct), cols, (ps, pt), refs, action, not_null)
+            for cs, ct, cols, ps, pt, refs, action, not_null in cur.fetchall()]
+
+
+def plan_erasure(foreign_keys, roots=ROOTS, detach=False):
+    """Walk the ON DELETE CASCADE graph below the user tables in roots.
+
+    Returns (delete_order, delete_edges, nullify_edges, blocking_edges):
+    tables to delete from leaf-first (users last), the edges that select their
+    rows, the SET NULL/SET DEFAULT edges to clear beforehand, and the NO
+    ACTION/RESTRICT edges whose rows must not exist. With detach, nullable
+    NO ACTION/RESTRICT references are cleared like SET NULL ones.
+    """
+    children = defaultdict(list)
+    for fk in foreign_keys:
+        children[fk.parent].append(fk)
+
+    delete_edges = defaultdict(list)
+    nullify_edges = []
+    blocking_edges = []
+    reached = set(roots)
+    queue = list(roots)
+    while queue:
+        parent = queue.pop(0)
+        for fk in children[parent]:
+            if fk.nullifies or fk.child == fk.parent:
+                # Self references (referred_by, parent comment...) are cleared
+                # so the delete order within one table does not matter
+                if fk.child == fk.parent and fk.not_null:
+                    raise RuntimeError(f'Cannot erase through NOT NULL self reference {fk}')
+                nullify_edges.append(fk)
+                continue
+            if not fk.cascades:
+                if detach and not fk.not_null:
+                    nullify_edges.append(fk)
+                else:
+                    blocking_edges.append(fk)
+                continue
+            delete_edges[fk.child].append(fk)
+            if fk.child not in reached:
+                reached.add(fk.child)
+                queue.append(fk.child)
+
+    # Leaf-first: a table is deleted once every table depending on it is done
+    # (blocking edges between erased tables constrain the order as well)
+    order, state = [], {}
+    ordering = {fk for edges in delete_edges.values() for fk in edges}
+    ordering.update(fk for fk in blocking_edges if fk.child in reached)
+
+    def visit(table, path):
+        if state.get(table) == 'done':
+            return
+        if state.get(table) == 'active':
+            cycle = ' → '.join(qualified(t) for t in path[path.index(table):] + [table])
+            raise RuntimeError(f'FK cycle between erased tables: {cycle}')
+        state[table] = 'active'
+        for fk in children[table]:
+            if fk.child in reached and fk in ordering:
+                visit(fk.child, path + [table])
+        state[table] = 'done'
+        order.append(table)
+
+    for root in roots:
+        visit(root, [])
+    return order, delete_edges, nullify_edges, blocking_edges
+
+
+def row_filter(table, delete_edges, depth=0):
+    """SQL predicate selecting the rows of table that belong to %(ids)s"""
+    if table in ROOTS:
+        return sql.SQL('id = ANY(%(ids)s::uuid[])')
+    if depth > 10:
+        raise RuntimeError(f'FK path to {qualified(table)} is too deep')
+    parts = []
+    for fk in delete_edges[table]:
+        parts.append(sql.SQL('({cols}) IN (SELECT {refs} FROM {parent} WHERE {pred})').format(
+            cols=sql.SQL(', ').join(map(sql.Identifier, fk.columns)),
+            refs=sql.SQL(', ').join(map(sql.Identifier, fk.ref_columns)),
+            parent=sql.Identifier(*fk.parent),
+            pred=row_filter(fk.parent, delete_edges, depth + 1),
+        ))
+    return sql.SQL(' OR ').join(parts)
+
+
+def references(fk, delete_edges):
+    """SQL predicate selecting the rows of fk.child that point at erased rows"""
+    return sql.SQL('({}) IN (SELECT {} FROM {} WHERE {})').format(
+        sql.SQL(', ').join(map(sql.Identifier, fk.columns)),
+        sql.SQL(', ').join(map(sql.Identifier, fk.ref_columns)),
+        sql.Identifier(*fk.parent),
+        row_filter(fk.parent, delete_edges))
+
+
+def blocking_rows(cur, blocking_edges, delete_edges, order, user_ids):
+    """[(fk, rows)] of rows that would block the erasure (and are not erased themselves)"""
+    found = []
+    for fk in blocking_edges:
+        predicate = references(fk, delete_edges)
+        if fk.child in order:
+            predicate = sql.SQL('{} AND NOT ({})').format(predicate, row_filter(fk.child, delete_edges))
+        cur.execute(sql.SQL('SELECT count(*) FROM {} WHERE {}').format(
+            sql.Identifier(*fk.child), predicate), {'ids': user_ids})
+        rows = cur.fetchone()[0]
+        if rows:
+            found.append((fk, rows))
+    return found
+
+
+class Throughput:
+    def __init__(self):
+        self.rows = defaultdict(int)
+        self.seconds = defaultdict(float)
+
+    def add(self, label, rows, seconds):
+        self.rows[label] += rows
+        self.seconds[label] += seconds
+
+    def report(self):
+        print(f'\n   {"table":<36} {"rows":>10} {"seconds":>9} {"rows/s":>9}')
+        for label in self.rows:
+            rows, seconds = self.rows[label], self.seconds[label]
+            rate = rows / seconds if seconds else 0
+            print(f'   {label:<36} {rows:>10} {seconds:>9.1f} {rate:>9.0f}')
+
+
+def run_batched(conn, cur, label, statement, params, stats):
+    """Repeat statement (which touches at most --batch rows) until nothing is left"""
+    total = 0
+    while True:
+        started = time.perf_counter()
+        cur.execute('SET LOCAL lock_timeout = %s', (option('lock-timeout'),))
+        cur.execute('SET LOCAL statement_timeout = %s', (option('statement-timeout'),))
+        cur.execute(statement, params)
+        count = cur.rowcount
+        conn.commit()
+        stats.add(label, count, time.perf_counter() - started)
+        total += count
+        if count < option('batch'):
+            return total
+        time.sleep(option('sleep'))
+
+
+class Step:
+    """One batched UPDATE/DELETE of the plan, plus the COUNT used by --dry-run"""
+
+    def __init__(self, label, table, predicate, assign=None):
+        self.label = label
+        self.table = sql.Identifier(*table)
+        self.predicate = predicate
+        self.assign = assign
+
+    def statement(self):
+        batch = sql.SQL('ctid = ANY(ARRAY(SELECT ctid FROM {} WHERE {} LIMIT %(batch)s))').format(
+            self.table, self.predicate)
+        if self.assign is None:
+            return sql.SQL('DELETE FROM {} WHERE {}').format(self.table, batch)
+        return sql.SQL('UPDATE {} SET {} WHERE {}').format(self.table, self.assign, batch)
+
+    def count(self):
+        return sql.SQL('SELECT count(*) FROM {} WHERE {}').format(self.table, self.predicate)
+
+
+def build_steps(order, delete_edges, nullify_edges):
+    steps = []
+    for fk in nullify_edges:
+        target = sql.SQL('DEFAULT') if fk.on_delete == 'd' else sql.SQL('NULL')
+        steps.append(Step(
+            f'{qualified(fk.child)}.{",".join(fk.columns)} ∅', fk.child,
+            references(fk, delete_edges),
+            assign=sql.SQL(', ').join(sql.SQL('{} = {}').format(sql.Identifier(c), target)
+                                      for c in fk.columns),
+        ))
+    for table in order:
+        steps.append(Step(qualified(table), table, row_filter(table, delete_edges)))
+    return steps
+
+
+def erase_users(conn, user_ids, keep_auth=False, dry_run=False, detach_references=False):
+    """Erase user_ids and everything that depends on them, returns Throughput.
+
+    Raises RuntimeError (before touching anything) when NO ACTION/RESTRICT
+    references from rows that are not erased point at them.
+    """
+    cur = conn.cursor()
+    roots = ROOTS[:1] if keep_auth else ROOTS
+    order, delete_edges, nullify_edges, blocking_edges = plan_erasure(
+        load_foreign_keys(cur), roots, detach_references)
+
+    print(f'🧭 Plan: clear {len(nullify_edges)} references, delete from {len(order)} tables')
+    for fk in nullify_edges:
+        print(f'   ∅ {fk}')
+    for table in order:
+        print(f'   🗑️ {qualified(table)}')
+    print()
+
+    blocked = blocking_rows(cur, blocking_edges, delete_edges, order, user_ids)
+    conn.commit()
+    if blocked:
+        print('⛔ Rows of other records still reference these users (NO ACTION / RESTRICT):')
+        for fk, rows in blocked:
+            hint = ' (NOT NULL)' if fk.not_null else ''
+            print(f'   {fk}: {rows} rows{hint}')
+        print()
+        if not dry_run:
+            raise RuntimeError(f'Erasure blocked by {sum(r for _, r in blocked)} referencing rows - '
+                               'reassign them, or pass --detach-references to clear the nullable ones')
+
+    steps = build_steps(order, delete_edges, nullify_edges)
+    stats = Throughput()
+
+    if dry_run:
+        # Counts only: nothing is modified, so every predicate still sees all rows
+        for step in steps:
+            started = time.perf_counter()
+            cur.execute(step.count(), {'ids': user_ids})
+            stats.add(step.label, cur.fetchone()[0], time.perf_counter() - started)
+        conn.rollback()
+        cur.close()
+        return stats
+
+    per_pass = option('users-per-pass')
+    for start in range(0, len(user_ids), per_pass):
+        params = {'ids': user_ids[start:start + per_pass], 'batch': option('batch')}
+        touched = 0
+        for step in steps:
+            touched += run_batched(conn, cur, step.label, step.statement(), params, stats)
+        done = min(start + per_pass, len(user_ids))
+        print(f'   ⏳ {done}/{len(user_ids)} users - {touched} rows')
+
+    cur.close()
+    return stats
+
+
+# auth.users rows without a public.users profile are erased too
+ALL_USERS = 'SELECT id, email FROM users UNION SELECT id, email FROM auth.users'
+
+
+def select_users(cur, args):
+    if '--all' in sys.argv:
+        cur.execute(f'SELECT DISTINCT id::text FROM ({ALL_USERS}) u ORDER BY 1')
+    elif '--test-users' in sys.argv:
+        cur.execute(f'SELECT DISTINCT id::text FROM ({ALL_USERS}) u WHERE email ILIKE ANY(%s) ORDER BY 1',
+                    (TEST_USER_EMAILS,))
+    else:
+        cur.execute(f'SELECT DISTINCT id::text FROM ({ALL_USERS}) u WHERE id::text = ANY(%s) ORDER BY 1',
+                    (args,))
+    return [r[0] for r in cur.fetchall()]
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    if not args and '--all' not in sys.argv and '--test-users' not in sys.argv:
+        print('Usage: python scripts/erase_users.py <user_id>... | --test-users | --all '
+              '[--dry-run] [--keep-auth] [--detach-references] [--batch=N] [--users-per-pass=N] [--sleep=S]')
+        return
+    dry_run = '--dry-run' in sys.argv
+
+    conn = psycopg2.connect(os.getenv('SUPABASE_DB_TRANSACTION_URL'))
+    cur = conn.cursor()
+    user_ids = select_users(cur, args)
+    conn.commit()
+    cur.close()
+
+    print(f'🗑️ ERASING {len(user_ids)} USERS{" (dry run, counting rows only)" if dry_run else ""}\n')
+    if not user_ids:
+        conn.close()
+        return
+
+    started = time.perf_counter()
+    stats = erase_users(conn, user_ids, keep_auth='--keep-auth' in sys.argv, dry_run=dry_run,
+                        detach_references='--detach-references' in sys.argv)
+    conn.close()
+
+    stats.report()
+    print('\n' + '='*60)
+    print(f'✅ Done in {time.perf_counter() - started:.1f}s')
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except Exception as e:
+        print(f'\n❌ ERROR: {e}')
+        import traceback
+        traceback.print_exc()
@@ -8,7 +8,8 @@ import os
 import psycopg2
 from dotenv import load_dotenv
 import uuid
-import unicodedata
+from player_name_index import best_match, generate_username, resolve_player_names
+from reconcile_participant_counts import reconcile_participant_counts
 
 load_dotenv()
 
@@ -32,17 +33,6 @@ PLAYERS = [
     {"name": "Triều Đình", "rank": "I+"},
 ]
 
-def generate_username(name):
-    """Generate a username from display name"""
-    # Remove Vietnamese accents and convert to lowercase
-    normalized = unicodedata.normalize('NFD', name)
-    ascii_name = ''.join(c for c in normalized if unicodedata.category(c) != 'Mn')
-    # Replace spaces with underscores and make lowercase
-    username = ascii_name.lower().replace(' ', '_')
-    # Remove special characters
-    username = ''.join(c for c in username if c.isalnum() or c == '_')
-    return username
-
 def import_players():
     db_url = os.getenv('SUPABASE_DB_TRANSACTION_URL')
     if not db_url:
@@ -95,7 +85,10 @@ def import_players():
     print('🧹 Clearing existing participants for this tournament...')
     cur.execute("DELETE FROM tournament_participants WHERE tournament_id = %s", (tournament_id,))
     
-    # 3. Process each player
+    # 3. Resolve every name in one accent-insensitive lookup
+    resolved = resolve_player_names(cur, [p["name"] for p in PLAYERS])
+
+    # 4. Process each player
     for i, player in enumerate(PLAYERS, 1):
         name = player["name"]
         rank = player["rank"]
@@ -103,18 +96,13 @@ def import_players():
         
         print(f'{i:2}. Processing: {name} ({rank})')
         
-        # Check if user exists (by username or display_name)
-        cur.execute("""
-            SELECT id, display_name, username, rank FROM users 
-            WHERE username = %s OR display_name ILIKE %s
-            LIMIT 1
-        """, (username, name))
-        existing_user = cur.fetchone()
+        # Check if user exists (by username or accent-insensitive name)
+        existing_user = best_match(resolved[name])
         
         if existing_user:
-            user_id = existing_user[0]
-            current_rank = existing_user[3]
-            print(f'    ✓ User exists: {existing_user[1]} (@{existing_user[2]}) - Rank: {current_rank}')
+            user_id = existing_user.user_id
+            current_rank = existing_user.rank
+            print(f'    ✓ User exists: {existing_user.matched_name} (@{existing_user.username}) - Rank: {current_rank} [{existing_user.score:.2f}]')
             
             # Update rank if different
             if current_rank != rank:
@@ -172,12 +160,8 @@ def import_players():
         except Exception as e:
             print(f'    ❌ Failed to add to tournament: {e}')
 
-    # Update tournament participant count
-    cur.execute("""
-        UPDATE tournaments 
-        SET current_participants = (SELECT COUNT(*) FROM tournament_participants WHERE tournament_id = %s)
-        WHERE id = %s
-    """, (tournament_id, tournament_id))
+    # Triggers were off, so bring the participant counter back in line
+    reconcile_participant_counts(cur, [tournament_id])
     
     # Re-enable triggers
     try:
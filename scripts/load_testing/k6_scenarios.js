@@ -33,8 +33,25 @@ export const options = {
 // Base URL (replace with your Supabase URL)
 const BASE_URL = __ENV.SUPABASE_URL || 'https://your-project.supabase.co';
 const ANON_KEY = __ENV.SUPABASE_ANON_KEY || 'your-anon-key';
+// Storage is not served by the offline PostgREST stand-in (run_load_tests.sh sets this)
+const STORAGE_UPLOADS = __ENV.K6_STORAGE_UPLOADS !== 'off';
 
-export default function () {
+// One existing user to read profiles for (or LOAD_TEST_USER_ID)
+export function setup() {
+  if (__ENV.LOAD_TEST_USER_ID) {
+    return { userId: __ENV.LOAD_TEST_USER_ID };
+  }
+  const res = http.get(`${BASE_URL}/rest/v1/users?select=id&limit=1`, {
+    headers: {
+      'apikey': ANON_KEY,
+      'Authorization': `Bearer ${ANON_KEY}`,
+    },
+  });
+  const rows = res.status === 200 ? res.json() : [];
+  return { userId: rows.length ? rows[0].id : '00000000-0000-0000-0000-000000000000' };
+}
+
+export default function (data) {
   // Scenario 1: Tournament List Query
   const tournamentListStart = Date.now();
   const tournamentRes = http.get(`${BASE_URL}/rest/v1/tournaments?select=*&limit=20`, {
@@ -54,9 +71,8 @@ export default function () {
   sleep(1);
 
   // Scenario 2: User Profile Query
-  const userId = 'test-user-id'; // Replace with actual user ID
   const userProfileStart = Date.now();
-  const userRes = http.get(`${BASE_URL}/rest/v1/profiles?id=eq.${userId}`, {
+  const userRes = http.get(`${BASE_URL}/rest/v1/users?id=eq.${data.userId}`, {
     headers: {
       'apikey': ANON_KEY,
       'Authorization': `Bearer ${ANON_KEY}`,
@@ -74,10 +90,13 @@ export default function () {
 
   // Scenario 3: Tournament Creation (Write Operation)
   const tournamentCreateStart = Date.now();
+  const startDate = new Date(Date.now() + 7 * 24 * 3600 * 1000);
   const createRes = http.post(`${BASE_URL}/rest/v1/tournaments`, JSON.stringify({
-    name: `Load Test Tournament ${Date.now()}`,
-    status: 'draft',
-    start_time: new Date().toISOString(),
+    title: `Load Test Tournament ${Date.now()}`,
+    status: 'upcoming',
+    start_date: startDate.toISOString(),
+    registration_deadline: new Date(startDate.getTime() - 24 * 3600 * 1000).toISOString(),
+    max_participants: 16,
   }), {
     headers: {
       'apikey': ANON_KEY,
@@ -99,6 +118,9 @@ export default function () {
   // Note: k6 doesn't support WebSocket natively, use separate tool or k6 extension
   
   // Scenario 5: Image Upload
+  if (!STORAGE_UPLOADS) {
+    return;
+  }
   const imageUploadStart = Date.now();
   const imageRes = http.post(`${BASE_URL}/storage/v1/object/tournament-images/test-image.jpg`, 
     'test-image-data', // Replace with actual image data
@@ -1,102 +1,288 @@
 # Locust Load Testing Scenarios for SABO Arena
 # Run with: locust -f locustfile.py --host=https://your-project.supabase.co
+#
+# Every simulated user logs in with a pre-seeded account and then runs the
+# same journeys as the app (tournament detail + bracket, score entry, chat,
+# get_leaderboard_snapshot RPC, notifications). Journey weights come from
+# traffic_weights.json so the mix follows production traffic.
+#
+# Environment:
+#   SUPABASE_URL / SUPABASE_ANON_KEY
+#   LOAD_TEST_USERS  CSV with email,password (or access_token,user_id) per
+#                    seeded account, default load_test_users.csv
+#   TRAFFIC_WEIGHTS  weights file, default traffic_weights.json
 
-from locust import HttpUser, task, between
+from locust import HttpUser, SequentialTaskSet, task, between
+from datetime import datetime, timedelta, timezone
+import csv
+import itertools
 import os
 import json
 import random
 
-class SABOArenaUser(HttpUser):
-    wait_time = between(1, 3)  # Wait 1-3 seconds between tasks
-    
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+SUPABASE_URL = os.getenv('SUPABASE_URL', 'https://your-project.supabase.co')
+ANON_KEY = os.getenv('SUPABASE_ANON_KEY', 'your-anon-key')
+
+LEADERBOARD_TYPES = ['elo', 'wins', 'tournaments', 'spa_points']
+RANK_FILTERS = [None, None, None, 'K', 'I', 'H', 'G', 'F', 'E']  # mostly "all", like the app
+CHAT_PAGE_SIZE = 50
+
+
+def load_weights():
+    path = os.getenv('TRAFFIC_WEIGHTS', os.path.join(HERE, 'traffic_weights.json'))
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_user_pool():
+    path = os.getenv('LOAD_TEST_USERS', os.path.join(HERE, 'load_test_users.csv'))
+    if not os.path.exists(path):
+        raise RuntimeError(f'User pool {path} not found - seed test accounts and list them as email,password')
+    with open(path, encoding='utf-8', newline='') as f:
+        users = list(csv.DictReader(f))
+    if not users:
+        raise RuntimeError(f'User pool {path} is empty')
+    random.shuffle(users)
+    return users
+
+
+WEIGHTS = load_weights()
+USER_POOL = load_user_pool()
+_next_account = itertools.cycle(USER_POOL).__next__
+
+
+def check(response, *expected):
+    if response.status_code in (expected or (200,)):
+        response.success()
+        return True
+    response.failure(f"Status code: {response.status_code}")
+    return False
+
+
+class Journey(SequentialTaskSet):
+    """Steps run in order; the last step interrupts, so the user picks the next journey"""
+
     def on_start(self):
-        """Called when a simulated user starts"""
-        self.supabase_url = os.getenv('SUPABASE_URL', 'https://your-project.supabase.co')
-        self.anon_key = os.getenv('SUPABASE_ANON_KEY', 'your-anon-key')
-        self.headers = {
-            'apikey': self.anon_key,
-            'Authorization': f'Bearer {self.anon_key}',
-            'Content-Type': 'application/json',
+        self.user.refresh_session()
+
+    def get(self, path, name, params=None, headers=None):
+        with self.client.get(path, params=params, headers={**self.user.headers, **(headers or {})},
+                             name=name, catch_response=True) as response:
+            return response.json() if check(response, 200, 206) else None
+
+
+class BrowseTournament(Journey):
+    """Tournament list → detail → bracket matches → participants"""
+
+    @task
+    def list_tournaments(self):
+        self.tournaments = self.get(
+            "/rest/v1/tournaments", "Tournament List",
+            params={'select': 'id,title,status,start_date,current_participants,max_participants,club_id',
+                    'status': 'in.(upcoming,ongoing)', 'order': 'start_date.asc', 'limit': 20},
+        ) or []
+
+    @task
+    def tournament_detail(self):
+        if not self.tournaments:
+            return self.interrupt()
+        self.tournament = random.choice(self.tournaments)
+        self.get("/rest/v1/tournaments", "Tournament Detail",
+                 params={'select': '*,clubs(id,name,address)', 'id': f"eq.{self.tournament['id']}"})
+
+    @task
+    def bracket(self):
+        self.get("/rest/v1/matches", "Tournament Matches",
+                 params={'select': '*', 'tournament_id': f"eq.{self.tournament['id']}",
+                         'order': 'display_order.asc,match_number.asc'})
+
+    @task
+    def participants(self):
+        self.get("/rest/v1/tournament_participants", "Tournament Participants",
+                 params={'select': 'id,seed_number,users(id,display_name,avatar_url,rank)',
+                         'tournament_id': f"eq.{self.tournament['id']}", 'order': 'seed_number.asc'})
+        self.interrupt()
+
+
+class SubmitScore(Journey):
+    """Referee/player updates the live score of one of their open matches"""
+
+    @task
+    def my_open_matches(self):
+        user_id = self.user.user_id
+        self.matches = self.get(
+            "/rest/v1/matches", "My Open Matches",
+            params={'select': 'id,player1_id,player2_id,player1_score,player2_score,status',
+                    'or': f'(player1_id.eq.{user_id},player2_id.eq.{user_id})',
+                    'status': 'in.(pending,in_progress)', 'limit': 5},
+        ) or []
+
+    @task
+    def update_score(self):
+        ready = [m for m in self.matches if m['player1_id'] and m['player2_id']]
+        if not ready:
+            return self.interrupt()
+        match = random.choice(ready)
+        # Only the live score: completing a match (winner) would advance the bracket
+        score = {
+            'player1_score': (match['player1_score'] or 0) + random.randint(0, 1),
+            'player2_score': (match['player2_score'] or 0) + random.randint(0, 1),
+            'status': 'in_progress',
         }
-    
-    @task(3)
-    def get_tournament_list(self):
-        """Get tournament list - most common operation"""
-        with self.client.get(
-            f"{self.supabase_url}/rest/v1/tournaments?select=*&limit=20",
-            headers=self.headers,
-            name="Tournament List",
-            catch_response=True
-        ) as response:
-            if response.status_code == 200:
-                response.success()
-            else:
-                response.failure(f"Status code: {response.status_code}")
-    
-    @task(2)
-    def get_user_profile(self):
-        """Get user profile"""
-        # Use a test user ID or random ID
-        user_id = os.getenv('TEST_USER_ID', 'test-user-id')
-        with self.client.get(
-            f"{self.supabase_url}/rest/v1/profiles?id=eq.{user_id}",
-            headers=self.headers,
-            name="User Profile",
-            catch_response=True
-        ) as response:
-            if response.status_code == 200:
-                response.success()
-            else:
-                response.failure(f"Status code: {response.status_code}")
-    
-    @task(1)
-    def create_tournament(self):
-        """Create tournament - write operation"""
-        tournament_data = {
-            "name": f"Load Test Tournament {random.randint(1000, 9999)}",
-            "status": "draft",
-            "start_time": "2025-12-31T00:00:00Z"
+        with self.client.patch("/rest/v1/matches", params={'id': f"eq.{match['id']}"}, json=score,
+                               headers={**self.user.headers, 'Prefer': 'return=minimal'},
+                               name="Submit Match Score", catch_response=True) as response:
+            check(response, 200, 204)
+        self.interrupt()
+
+
+class Chat(Journey):
+    """Direct message list → open a room → page back through messages"""
+
+    @task
+    def room_list(self):
+        self.rooms = self.get(
+            "/rest/v1/chat_rooms", "Chat Rooms",
+            params={'select': 'id,created_at,updated_at,chat_room_members!inner(user_id)',
+                    'type': 'eq.direct', 'chat_room_members.user_id': f'eq.{self.user.user_id}',
+                    'order': 'updated_at.desc'},
+        ) or []
+
+    @task
+    def first_page(self):
+        if not self.rooms:
+            return self.interrupt()
+        self.room_id = random.choice(self.rooms)['id']
+        self.messages = self.get(
+            "/rest/v1/chat_messages", "Chat Messages Page",
+            params={'select': 'id,message,sender_id,created_at', 'room_id': f'eq.{self.room_id}',
+                    'is_deleted': 'eq.false', 'order': 'created_at.desc', 'limit': CHAT_PAGE_SIZE},
+        ) or []
+
+    @task
+    def older_page(self):
+        if len(self.messages) < CHAT_PAGE_SIZE:
+            return
+        self.get("/rest/v1/chat_messages", "Chat Messages Page",
+                 params={'select': 'id,message,sender_id,created_at', 'room_id': f'eq.{self.room_id}',
+                         'is_deleted': 'eq.false', 'created_at': f"lt.{self.messages[-1]['created_at']}",
+                         'order': 'created_at.desc', 'limit': CHAT_PAGE_SIZE})
+
+    @task
+    def send(self):
+        if random.random() >= WEIGHTS.get('chat_send_ratio', 0):
+            return self.interrupt()
+        with self.client.post("/rest/v1/chat_messages",
+                              json={'room_id': self.room_id, 'sender_id': self.user.user_id,
+                                    'message': f'load test {random.randint(1000, 9999)}'},
+                              headers={**self.user.headers, 'Prefer': 'return=minimal'},
+                              name="Send Chat Message", catch_response=True) as response:
+            check(response, 201)
+        self.interrupt()
+
+
+class Leaderboard(Journey):
+    """get_leaderboard_snapshot RPC with the same parameters as LeaderboardScreen"""
+
+    @task
+    def leaderboard(self):
+        params = {
+            'board_type': random.choice(LEADERBOARD_TYPES),
+            'rank_filter': random.choice(RANK_FILTERS),
+            'limit_count': 100,
         }
-        with self.client.post(
-            f"{self.supabase_url}/rest/v1/tournaments",
-            json=tournament_data,
-            headers=self.headers,
-            name="Create Tournament",
-            catch_response=True
-        ) as response:
-            if response.status_code in [200, 201]:
-                response.success()
-            else:
-                response.failure(f"Status code: {response.status_code}")
-    
-    @task(1)
-    def get_club_list(self):
-        """Get club list"""
-        with self.client.get(
-            f"{self.supabase_url}/rest/v1/clubs?select=*&limit=20",
-            headers=self.headers,
-            name="Club List",
-            catch_response=True
-        ) as response:
-            if response.status_code == 200:
-                response.success()
-            else:
-                response.failure(f"Status code: {response.status_code}")
-    
-    @task(1)
-    def get_leaderboard(self):
-        """Get leaderboard"""
-        with self.client.get(
-            f"{self.supabase_url}/rest/v1/profiles?select=*&order=elo_rating.desc&limit=50",
-            headers=self.headers,
-            name="Leaderboard",
-            catch_response=True
-        ) as response:
-            if response.status_code == 200:
-                response.success()
-            else:
-                response.failure(f"Status code: {response.status_code}")
+        with self.client.post("/rest/v1/rpc/get_leaderboard_snapshot", json=params, headers=self.user.headers,
+                              name="RPC get_leaderboard_snapshot", catch_response=True) as response:
+            check(response)
+        self.interrupt()
+
+
+class Notifications(Journey):
+    """Badge count → notification list → mark one read"""
+
+    @task
+    def unread_count(self):
+        with self.client.head("/rest/v1/notifications",
+                              params={'select': 'id', 'user_id': f'eq.{self.user.user_id}',
+                                      'is_read': 'eq.false', 'is_dismissed': 'eq.false'},
+                              headers={**self.user.headers, 'Prefer': 'count=exact'},
+                              name="Unread Notification Count", catch_response=True) as response:
+            check(response, 200, 206)
+
+    @task
+    def recent(self):
+        self.notifications = self.get(
+            "/rest/v1/notifications", "Notification List",
+            params={'select': '*', 'user_id': f'eq.{self.user.user_id}',
+                    'order': 'created_at.desc', 'limit': 20},
+        ) or []
+
+    @task
+    def mark_read(self):
+        unread = [n for n in self.notifications if not n.get('is_read')]
+        if not unread:
+            return self.interrupt()
+        with self.client.patch("/rest/v1/notifications", params={'id': f"eq.{unread[0]['id']}"},
+                               json={'is_read': True, 'read_at': datetime.now(timezone.utc).isoformat()},
+                               headers={**self.user.headers, 'Prefer': 'return=minimal'},
+                               name="Mark Notification Read", catch_response=True) as response:
+            check(response, 200, 204)
+        self.interrupt()
+
+
+class BrowseClubs(Journey):
+    @task
+    def club_list(self):
+        self.get("/rest/v1/clubs", "Club List",
+                 params={'select': 'id,name,address,logo_url', 'is_active': 'eq.true', 'limit': 20})
+        self.interrupt()
+
+
+JOURNEYS = {
+    'browse_tournament': BrowseTournament,
+    'submit_score': SubmitScore,
+    'chat': Chat,
+    'leaderboard': Leaderboard,
+    'notifications': Notifications,
+    'browse_clubs': BrowseClubs,
+}
+
+
+class SABOArenaUser(HttpUser):
+    host = SUPABASE_URL
+    wait_time = between(1, 3)  # Wait 1-3 seconds between tasks
+    tasks = {JOURNEYS[name]: weight for name, weight in WEIGHTS['journeys'].items() if weight}
+
+    def on_start(self):
+        """Log in with the next seeded account"""
+        self.account = _next_account()
+        self.headers = {'apikey': ANON_KEY, 'Content-Type': 'application/json'}
+        if self.account.get('access_token'):
+            # Pre-minted JWT, valid for the whole run
+            self.user_id = self.account['user_id']
+            self.expires_at = None
+            self.headers['Authorization'] = f"Bearer {self.account['access_token']}"
+        else:
+            self.login()
+
+    def refresh_session(self):
+        if self.expires_at and datetime.now(timezone.utc) >= self.expires_at:
+            self.login()
+
+    def login(self):
+        account = self.account
+        with self.client.post("/auth/v1/token", params={'grant_type': 'password'},
+                              json={'email': account['email'], 'password': account['password']},
+                              headers={'apikey': ANON_KEY, 'Content-Type': 'application/json'},
+                              name="Auth Login", catch_response=True) as response:
+            if not check(response):
+                raise RuntimeError(f"Login failed for {account['email']}")
+            session = response.json()
+        self.user_id = session['user']['id']
+        self.expires_at = datetime.now(timezone.utc) + timedelta(seconds=session.get('expires_in', 3600) - 60)
+        self.headers['Authorization'] = f"Bearer {session['access_token']}"
 
 # Run with:
 # locust -f locustfile.py --host=https://your-project.supabase.co --users 1000 --spawn-rate 10
-
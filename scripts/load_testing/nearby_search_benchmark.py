@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+📍 Nearby Search Benchmark - find_nearby_users at 10k / 100k / 1M users
+Builds a scratch user table on a local PostgreSQL with our migrations
+applied, grows it to each size and times the query shapes of:
+
+- legacy:   find_nearby_users() before 20251210040000 - earth_distance() for
+            every user, twice, all columns, no limit
+- box:      find_nearby_users() now - earth_box() prefilter on the GiST
+            ll_to_earth index, distance computed once, all columns
+- ids:      find_nearby_user_ids() - same prefilter, id + distance, LIMIT
+- buckets:  find_nearby_users_bucketed() - geohash cover cells on
+            user_geo_buckets (20251210050000), id + distance, LIMIT
+
+Users are clustered around the cities we have clubs in, plus a uniform
+spread over Vietnam and some without coordinates; searches start from random
+users' own positions. Every strategy is checked against the legacy result.
+Scratch tables are TEMP and disappear with the connection.
+
+Usage:
+    python scripts/load_testing/nearby_search_benchmark.py --db=postgresql://localhost/sabo_arena
+    python scripts/load_testing/nearby_search_benchmark.py --db=... --sizes=10000,100000 --radius=25 --queries=300
+"""
+
+import sys
+import time
+
+import psycopg2
+
+DEFAULTS = {
+    'db': '',
+    'sizes': '10000,100000,1000000',
+    'radius': 10.0,       # km, the app's default search radius
+    'limit': 50,          # page size of the lean strategies
+    'queries': 200,       # searches per size and strategy
+    'row-bytes': 600,     # filler per user row, users rows are wide
+}
+
+# (lat, lon, share) - remaining users are spread over the country
+CITIES = [
+    (10.7769, 106.7009, 0.40),   # TP.HCM
+    (21.0285, 105.8542, 0.25),   # Hà Nội
+    (16.0544, 108.2022, 0.10),   # Đà Nẵng
+    (10.3460, 107.0843, 0.10),   # Vũng Tàu
+]
+VN_BOX = (8.5, 23.4, 102.1, 109.5)
+CITY_SPREAD_DEG = 0.08           # ~9 km standard deviation
+NO_COORDINATES = 0.10
+
+USERS = 'nearby_bench_users'
+BUCKETS = 'nearby_bench_buckets'
+
+# Same shapes as the functions in the migrations, on the scratch tables
+STRATEGIES = {
+    'legacy': f"""
+        SELECT * FROM {USERS}
+        WHERE id != %(me)s AND latitude IS NOT NULL AND longitude IS NOT NULL
+          AND earth_distance(ll_to_earth(%(lat)s, %(lon)s), ll_to_earth(latitude, longitude)) <= %(meters)s
+        ORDER BY earth_distance(ll_to_earth(%(lat)s, %(lon)s), ll_to_earth(latitude, longitude))
+    """,
+    'box': f"""
+        SELECT u.* FROM {USERS} u
+        CROSS JOIN LATERAL (
+            SELECT earth_distance(ll_to_earth(%(lat)s, %(lon)s),
+                                  ll_to_earth(u.latitude::float8, u.longitude::float8)) AS meters
+        ) d
+        WHERE u.latitude IS NOT NULL AND u.longitude IS NOT NULL
+          AND earth_box(ll_to_earth(%(lat)s, %(lon)s), %(meters)s)
+              @> ll_to_earth(u.latitude::float8, u.longitude::float8)
+          AND u.id != %(me)s AND d.meters <= %(meters)s
+        ORDER BY d.meters
+    """,
+    'ids': f"""
+        SELECT u.id, d.meters / 1000 FROM {USERS} u
+        CROSS JOIN LATERAL (
+            SELECT earth_distance(ll_to_earth(%(lat)s, %(lon)s),
+                                  ll_to_earth(u.latitude::float8, u.longitude::float8)) AS meters
+        ) d
+        WHERE u.latitude IS NOT NULL AND u.longitude IS NOT NULL
+          AND earth_box(ll_to_earth(%(lat)s, %(lon)s), %(meters)s)
+              @> ll_to_earth(u.latitude::float8, u.longitude::float8)
+          AND u.id != %(me)s AND d.meters <= %(meters)s
+        ORDER BY d.meters
+        LIMIT %(limit)s
+    """,
+    'buckets': f"""
+        SELECT b.user_id, d.meters / 1000
+        FROM geohash_cover(%(lat)s, %(lon)s, %(radius)s) c
+        JOIN {BUCKETS} b
+          ON b.geohash >= c.cell COLLATE "C" AND b.geohash < (c.cell || '~') COLLATE "C"
+        CROSS JOIN LATERAL (
+            SELECT earth_distance(ll_to_earth(%(lat)s, %(lon)s), ll_to_earth(b.latitude, b.longitude)) AS meters
+        ) d
+        WHERE b.user_id != %(me)s AND d.meters <= %(meters)s
+        ORDER BY d.meters
+        LIMIT %(limit)s
+    """,
+}
+
+# Strategies returning the full list vs the first `limit` rows
+LIMITED = ('ids', 'buckets')
+
+
+def option(name):
+    """--name=value from sys.argv, typed like its default"""
+    default = DEFAULTS[name]
+    for arg in sys.argv[1:]:
+        if arg.startswith(f'--{name}='):
+            return type(default)(arg.split('=', 1)[1])
+    return default
+
+
+# ---------------------------------------------------------------------------
+# Fixture
+# ---------------------------------------------------------------------------
+
+def create_tables(cur, with_buckets):
+    cur.execute(f"""
+        CREATE TEMP TABLE {USERS} (
+            id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+            latitude DECIMAL(10, 8),
+            longitude DECIMAL(11, 8),
+            profile TEXT
+        )
+    """)
+    if with_buckets:
+        cur.execute(f"""
+            CREATE TEMP TABLE {BUCKETS} (
+                user_id UUID PRIMARY KEY,
+                geohash TEXT COLLATE "C" NOT NULL,
+                latitude DOUBLE PRECISION NOT NULL,
+                longitude DOUBLE PRECISION NOT NULL
+            )
+        """)
+
+
+def grow(cur, count, with_buckets):
+    """Adds `count` users server-side; indexes are rebuilt afterwards"""
+    cur.execute(f'DROP INDEX IF EXISTS {USERS}_ll_to_earth')
+    cities = ', '.join(f'({lat}, {lon}, {share})' for lat, lon, share in CITIES)
+    lat_min, lat_max, lon_min, lon_max = VN_BOX
+    cur.execute(f"""
+        WITH cities(lat, lon, share) AS (VALUES {cities}),
+        bands AS (
+            SELECT lat, lon, SUM(share) OVER (ORDER BY share DESC, lat) AS upto FROM cities
+        ),
+        draws AS (
+            SELECT random() AS pick, random() AS place,
+                   sqrt(-2 * ln(1 - random())) AS r, 2 * pi() * random() AS theta,
+                   random() AS ux, random() AS uy
+            FROM generate_series(1, %(count)s)
+        )
+        INSERT INTO {USERS} (latitude, longitude, profile)
+        SELECT
+            CASE WHEN d.place < %(none)s THEN NULL
+                 WHEN c.lat IS NULL THEN %(lat_min)s + d.uy * (%(lat_max)s - %(lat_min)s)
+                 ELSE c.lat + %(spread)s * d.r * sin(d.theta) END,
+            CASE WHEN d.place < %(none)s THEN NULL
+                 WHEN c.lat IS NULL THEN %(lon_min)s + d.ux * (%(lon_max)s - %(lon_min)s)
+                 ELSE c.lon + %(spread)s * d.r * cos(d.theta) END,
+            repeat(md5(d.pick::text), %(filler)s)
+        FROM draws d
+        LEFT JOIN LATERAL (
+            SELECT lat, lon FROM bands WHERE d.pick < bands.upto ORDER BY upto LIMIT 1
+        ) c ON true
+    """, {
+        'count': count, 'none': NO_COORDINATES, 'spread': CITY_SPREAD_DEG,
+        'lat_min': lat_min, 'lat_max': lat_max, 'lon_min': lon_min, 'lon_max': lon_max,
+        'filler': max(option('row-bytes') // 32, 1),
+    })
+    cur.execute(f"""
+        CREATE INDEX {USERS}_ll_to_earth ON {USERS}
+        USING gist (ll_to_earth(latitude::float8, longitude::float8))
+        WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+    """)
+    if with_buckets:
+        cur.execute(f'DROP INDEX IF EXISTS {BUCKETS}_geohash')
+        cur.execute(f"""
+            INSERT INTO {BUCKETS} (user_id, geohash, latitude, longitude)
+            SELECT id, geohash_encode(latitude, longitude), latitude, longitude
+            FROM {USERS}
+            WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+            ON CONFLICT (user_id) DO NOTHING
+        """)
+        cur.execute(f'CREATE INDEX {BUCKETS}_geohash ON {BUCKETS} (geohash) INCLUDE (user_id, latitude, longitude)')
+    cur.execute(f'ANALYZE {USERS}')
+    if with_buckets:
+        cur.execute(f'ANALYZE {BUCKETS}')
+
+
+def sample_searches(cur, n):
+    cur.execute(f"""
+        SELECT id, latitude::float8, longitude::float8 FROM {USERS}
+        WHERE latitude IS NOT NULL ORDER BY random() LIMIT %s
+    """, (n,))
+    return cur.fetchall()
+
+
+# ---------------------------------------------------------------------------
+# Run
+# ---------------------------------------------------------------------------
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+
+def uses_index(cur, sql, params):
+    """Whether the plan touches any index (the GiST one for box/ids)"""
+    cur.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+    plan = cur.fetchone()[0]
+    nodes = [plan[0]['Plan']]
+    while nodes:
+        node = nodes.pop()
+        if 'Index Name' in node:
+            return True
+        nodes.extend(node.get('Plans', []))
+    return False
+
+
+def run_size(cur, size, strategies):
+    searches = sample_searches(cur, option('queries'))
+    radius = option('radius')
+    params = [{'me': me, 'lat': lat, 'lon': lon, 'radius': radius, 'meters': radius * 1000,
+               'limit': option('limit')} for me, lat, lon in searches]
+
+    results = {}
+    for name in strategies:
+        sql = STRATEGIES[name]
+        for p in params[:5]:
+            cur.execute(sql, p)
+            cur.fetchall()
+        latencies, ids = [], []
+        for p in params:
+            started = time.perf_counter()
+            cur.execute(sql, p)
+            rows = cur.fetchall()
+            latencies.append((time.perf_counter() - started) * 1000)
+            ids.append([r[0] for r in rows])
+        results[name] = (latencies, ids, uses_index(cur, sql, params[0]))
+
+    legacy = results['legacy'][1]
+    base = percentile(results['legacy'][0], 50)
+    print(f"\n👥 {size:,} users - {len(params)} searches, radius {radius:g} km")
+    print(f"   {'strategy':9} {'p50':>9} {'p95':>9} {'p99':>9} {'rows':>7} {'speedup':>8} {'index':>6}  same result")
+    mismatches = 0
+    for name, (latencies, ids, indexed) in results.items():
+        expected = [rows[:option('limit')] if name in LIMITED else rows for rows in legacy]
+        same = sum(1 for got, want in zip(ids, expected) if got == want)
+        mismatches += len(ids) - same
+        print(f"   {name:9} {percentile(latencies, 50):>7.2f}ms {percentile(latencies, 95):>7.2f}ms "
+              f"{percentile(latencies, 99):>7.2f}ms {sum(map(len, ids)) / len(ids):>7.1f} "
+              f"{base / max(percentile(latencies, 50), 0.001):>7.1f}x {'✅' if indexed else '—':>6}  "
+              f"{same}/{len(ids)}")
+    return mismatches
+
+
+def main():
+    if not option('db'):
+        print('Usage: python scripts/load_testing/nearby_search_benchmark.py --db=<local postgres dsn> '
+              '[--sizes=10000,100000,1000000] [--radius=10] [--queries=200]')
+        return
+    sizes = sorted(int(s) for s in option('sizes').split(','))
+
+    conn = psycopg2.connect(option('db'), application_name='nearby_bench')
+    conn.autocommit = True
+    cur = conn.cursor()
+    cur.execute("SELECT to_regproc('public.geohash_cover') IS NOT NULL")
+    with_buckets = cur.fetchone()[0]
+    strategies = [s for s in STRATEGIES if with_buckets or s != 'buckets']
+    if not with_buckets:
+        print('⚠️  geohash_cover() not found (migration 20251210050000) - skipping buckets')
+
+    create_tables(cur, with_buckets)
+    mismatches = 0
+    current = 0
+    for size in sizes:
+        started = time.perf_counter()
+        grow(cur, size - current, with_buckets)
+        current = size
+        print(f'\n🏗️ Grew to {size:,} users in {time.perf_counter() - started:.1f}s')
+        mismatches += run_size(cur, size, strategies)
+
+    cur.close()
+    conn.close()
+    print('\n' + '='*60)
+    print('✅ Every strategy returns the legacy result' if not mismatches
+          else f'❌ {mismatches} searches differ from the legacy result')
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except Exception as e:
+        print(f'\n❌ ERROR: {e}')
+        import traceback
+        traceback.print_exc()
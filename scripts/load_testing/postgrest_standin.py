@@ -0,0 +1,673 @@
+#!/usr/bin/env python3
+"""
+🧪 PostgREST Stand-in - run the load tests without a Supabase project
+Serves the /rest/v1/<table>, /rest/v1/rpc/<fn> and /auth/v1/token routes the
+Locust and k6 scenarios hit, on a local asyncio HTTP server:
+
+- postgres backend: PostgREST query strings (select with embedded resources
+  and !inner, eq/neq/gt/gte/lt/lte/like/ilike/is/in/not, or=(...), order,
+  limit/offset, Prefer: count=exact / return=minimal) are translated to SQL
+  against a local PostgreSQL (e.g. a restored dump)
+- replay backend: answers from a recording, captured once with --record
+- --latency/--jitter add network-like delay to every response
+
+Not emulated: RLS and JWT verification (every token is accepted), realtime,
+storage. Logins return a token for the users row with that email.
+
+Usage:
+    python scripts/load_testing/postgrest_standin.py --db=postgresql://localhost/sabo_arena
+    python scripts/load_testing/postgrest_standin.py --replay=recording.jsonl --latency=25
+    python scripts/load_testing/postgrest_standin.py --record=https://xyz.supabase.co --replay=recording.jsonl
+
+Then point the tests at it:
+    SUPABASE_URL=http://127.0.0.1:54329 locust -f locustfile.py --headless -u 200 -r 20 -t 2m
+"""
+
+import asyncio
+import json
+import os
+import random
+import re
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+DEFAULTS = {
+    'port': 54329,
+    'host': '127.0.0.1',
+    'db': '',
+    'db-pool': 20,
+    'replay': '',
+    'record': '',
+    'latency': 0.0,    # ms added to every response
+    'jitter': 0.0,     # ms, uniform +/-
+}
+
+OPERATORS = {
+    'eq': '=', 'neq': '<>', 'gt': '>', 'gte': '>=', 'lt': '<', 'lte': '<=',
+    'like': 'LIKE', 'ilike': 'ILIKE',
+}
+
+RESERVED_PARAMS = {'select', 'order', 'limit', 'offset', 'or', 'and', 'on_conflict', 'columns'}
+
+UUID_RE = re.compile(r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}', re.I)
+TIMESTAMP_RE = re.compile(r'\d{4}-\d{2}-\d{2}T[\d:.]+(?:Z|[+-]\d{2}:?\d{2})?')
+NUMBER_RE = re.compile(r'(?<=[.=(,])-?\d+(?:\.\d+)?(?=[,)&]|$)')
+
+
+def option(name):
+    """--name=value from sys.argv, typed like its default"""
+    default = DEFAULTS[name]
+    for arg in sys.argv[1:]:
+        if arg.startswith(f'--{name}='):
+            return type(default)(arg.split('=', 1)[1])
+    return default
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# ---------------------------------------------------------------------------
+# PostgREST query string → SQL
+# ---------------------------------------------------------------------------
+
+def split_top_level(text, sep=','):
+    """Split on sep outside parentheses and double quotes"""
+    parts, depth, quoted, current = [], 0, False, ''
+    for ch in text:
+        if ch == '"':
+            quoted = not quoted
+        elif not quoted and ch == '(':
+            depth += 1
+        elif not quoted and ch == ')':
+            depth -= 1
+        if ch == sep and depth == 0 and not quoted:
+            parts.append(current)
+            current = ''
+        else:
+            current += ch
+    if current:
+        parts.append(current)
+    return [p.strip() for p in parts if p.strip()]
+
+
+def parse_select(text):
+    """'id,t:title,clubs(id,name),members!inner(user_id)' → item list"""
+    items = []
+    for part in split_top_level(text or '*'):
+        alias = None
+        if ':' in part.split('(')[0] and '::' not in part.split('(')[0]:
+            alias, part = part.split(':', 1)
+        if '(' in part:
+            head, inner = part.split('(', 1)
+            name, _, hint = head.partition('!')
+            items.append({'embed': name.strip(), 'hint': hint.strip(), 'alias': alias or name.strip(),
+                          'children': parse_select(inner[:-1])})
+        else:
+            column = part.split('::')[0].strip()
+            items.append({'column': column, 'alias': alias})
+    return items
+
+
+class Catalog:
+    """Tables, columns and foreign keys of the public schema"""
+
+    def __init__(self, cur):
+        cur.execute("""
+            SELECT c.relname, array_agg(a.attname ORDER BY a.attnum)
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            JOIN pg_attribute a ON a.attrelid = c.oid AND a.attnum > 0 AND NOT a.attisdropped
+            WHERE n.nspname = 'public' AND c.relkind IN ('r', 'v', 'm', 'p')
+            GROUP BY c.relname
+        """)
+        self.columns = {table: set(cols) for table, cols in cur.fetchall()}
+        cur.execute("""
+            SELECT c.conname, cl.relname, pcl.relname,
+                   array_agg(a.attname ORDER BY k.ord), array_agg(pa.attname ORDER BY k.ord)
+            FROM pg_constraint c
+            JOIN pg_class cl ON cl.oid = c.conrelid
+            JOIN pg_class pcl ON pcl.oid = c.confrelid
+            JOIN pg_namespace n ON n.oid = cl.relnamespace
+            CROSS JOIN LATERAL unnest(c.conkey, c.confkey) WITH ORDINALITY AS k(att, ref_att, ord)
+            JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = k.att
+            JOIN pg_attribute pa ON pa.attrelid = c.confrelid AND pa.attnum = k.ref_att
+            WHERE c.contype = 'f' AND n.nspname = 'public'
+            GROUP BY c.oid, c.conname, cl.relname, pcl.relname
+        """)
+        self.foreign_keys = cur.fetchall()
+        cur.execute("""
+            SELECT p.proname, p.proretset, t.typtype = 'c' OR t.typname = 'record'
+            FROM pg_proc p
+            JOIN pg_namespace n ON n.oid = p.pronamespace
+            JOIN pg_type t ON t.oid = p.prorettype
+            WHERE n.nspname = 'public'
+        """)
+        self.functions = {name: (returns_set, composite) for name, returns_set, composite in cur.fetchall()}
+
+    def table(self, name):
+        if name not in self.columns:
+            raise ApiError(404, f'relation "public.{name}" does not exist')
+        return name
+
+    def column(self, table, name):
+        if name not in self.columns[table]:
+            raise ApiError(400, f'column {table}.{name} does not exist')
+        return name
+
+    def relationship(self, table, target, hint):
+        """(to_many, [(target_col, table_col)]) for embedding target into table"""
+        candidates = []
+        for name, child, parent, cols, refs in self.foreign_keys:
+            if child == table and parent == target:
+                candidates.append((name, cols, False, list(zip(refs, cols))))
+            elif child == target and parent == table:
+                candidates.append((name, cols, True, list(zip(cols, refs))))
+        if hint and hint != 'inner':
+            candidates = [c for c in candidates if hint == c[0] or hint in c[1]]
+        if not candidates:
+            raise ApiError(400, f'Could not find a relationship between {table} and {target}')
+        _, _, to_many, pairs = candidates[0]
+        return to_many, pairs
+
+
+def quote_ident(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+class QueryBuilder:
+    """Builds one SQL statement plus its parameter list"""
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self.params = []
+        self.aliases = 0
+
+    def next_alias(self):
+        self.aliases += 1
+        return f't{self.aliases}'
+
+    def value(self, raw):
+        self.params.append(raw)
+        return '%s'
+
+    def condition(self, table, alias, column, expression):
+        """One 'col=op.value' filter"""
+        column = f'{alias}.{quote_ident(self.catalog.column(table, column))}'
+        negate = expression.startswith('not.')
+        if negate:
+            expression = expression[4:]
+        op, _, raw = expression.partition('.')
+        if op in OPERATORS:
+            if op in ('like', 'ilike'):
+                raw = raw.replace('*', '%')
+            sql = f'{column} {OPERATORS[op]} {self.value(raw)}'
+        elif op == 'in':
+            values = [v.strip('"') for v in split_top_level(raw.strip('()'))]
+            sql = f'{column} IN ({", ".join(self.value(v) for v in values)})' if values else 'false'
+        elif op == 'is':
+            keyword = {'null': 'NULL', 'true': 'TRUE', 'false': 'FALSE', 'unknown': 'UNKNOWN'}.get(raw.lower())
+            if not keyword:
+                raise ApiError(400, f'invalid is. value {raw}')
+            sql = f'{column} IS {keyword}'
+        else:
+            raise ApiError(400, f'unsupported operator {op}')
+        return f'NOT ({sql})' if negate else sql
+
+    def logic(self, table, alias, joiner, body):
+        """or=(a.eq.1,and(b.gt.2,c.is.null))"""
+        parts = []
+        for item in split_top_level(body.strip()[1:-1]):
+            if item.startswith(('or(', 'and(', 'not.or(', 'not.and(')):
+                negate = item.startswith('not.')
+                name, _, rest = item.removeprefix('not.').partition('(')
+                sql = self.logic(table, alias, name.upper(), '(' + rest)
+                parts.append(f'NOT {sql}' if negate else sql)
+            else:
+                column, _, expression = item.partition('.')
+                parts.append(self.condition(table, alias, column, expression))
+        return '(' + f' {joiner} '.join(parts) + ')' if parts else 'true'
+
+    def where(self, table, alias, filters):
+        clauses = []
+        for key, value in filters:
+            if key in ('or', 'and'):
+                clauses.append(self.logic(table, alias, key.upper(), value))
+            elif key in ('not.or', 'not.and'):
+                clauses.append('NOT ' + self.logic(table, alias, key[4:].upper(), value))
+            else:
+                clauses.append(self.condition(table, alias, key, value))
+        return clauses
+
+    def order(self, table, alias, text):
+        terms = []
+        for term in split_top_level(text or ''):
+            column, *modifiers = term.split('.')
+            sql = f'{alias}.{quote_ident(self.catalog.column(table, column))}'
+            for modifier in modifiers:
+                sql += {'asc': ' ASC', 'desc': ' DESC', 'nullsfirst': ' NULLS FIRST',
+                        'nullslast': ' NULLS LAST'}.get(modifier, '')
+            terms.append(sql)
+        return terms
+
+    def projection(self, table, alias, items, embedded_filters):
+        """Select list for table plus the EXISTS clauses of !inner embeds"""
+        columns, inner = [], []
+        for item in items:
+            if 'column' in item:
+                if item['column'] == '*':
+                    columns.append(f'{alias}.*')
+                else:
+                    name = quote_ident(self.catalog.column(table, item['column']))
+                    columns.append(f'{alias}.{name}' + (f' AS {quote_ident(item["alias"])}' if item['alias'] else ''))
+                continue
+
+            target = self.catalog.table(item['embed'])
+            to_many, pairs = self.catalog.relationship(table, target, item['hint'])
+            child = self.next_alias()
+            join = ' AND '.join(f'{child}.{quote_ident(t)} = {alias}.{quote_ident(s)}' for t, s in pairs)
+            own_filters = embedded_filters.get(item['alias'], [])
+            nested = {key.split('.', 1)[1]: f for key, f in embedded_filters.items()
+                      if key.startswith(item['alias'] + '.')}
+            child_columns, child_inner = self.projection(target, child, item['children'], nested)
+            where = [join] + self.where(target, child, own_filters)
+            for clause, params in child_inner:
+                where.append(clause)
+                self.params += params
+            body = (f'SELECT {", ".join(child_columns)} FROM public.{quote_ident(target)} {child} '
+                    f'WHERE {" AND ".join(where)}')
+            if to_many:
+                columns.append(f"(SELECT coalesce(json_agg(e), '[]'::json) FROM ({body}) e) AS {quote_ident(item['alias'])}")
+            else:
+                columns.append(f'(SELECT row_to_json(e) FROM ({body} LIMIT 1) e) AS {quote_ident(item["alias"])}')
+            if item['hint'] == 'inner':
+                # Second pass over the same filters for the EXISTS: restore the params order
+                exists = QueryBuilder(self.catalog)
+                exists.aliases = self.aliases + 100
+                e_alias = exists.next_alias()
+                e_join = ' AND '.join(f'{e_alias}.{quote_ident(t)} = {alias}.{quote_ident(s)}' for t, s in pairs)
+                e_where = [e_join] + exists.where(target, e_alias, own_filters)
+                inner.append((f'EXISTS (SELECT 1 FROM public.{quote_ident(target)} {e_alias} '
+                               f'WHERE {" AND ".join(e_where)})', exists.params))
+                self.aliases = exists.aliases
+        return columns, inner
+
+    def select(self, table, query, count=False):
+        """→ (data_sql, count_sql, params, count_params)"""
+        table = self.catalog.table(table)
+        items = parse_select(query.get('select'))
+        base_filters, embedded = [], {}
+        for key, value in query.items_list:
+            if key in RESERVED_PARAMS - {'or', 'and'}:
+                continue
+            if '.' in key and not key.startswith('not.'):
+                relation, column = key.rsplit('.', 1)
+                if relation not in ('or', 'and'):
+                    embedded.setdefault(relation, []).append((column, value))
+                    continue
+            base_filters.append((key, value))
+
+        alias = 't0'
+        columns, inner = self.projection(table, alias, items, embedded)
+        select_params = self.params
+        self.params = []
+        where = self.where(table, alias, base_filters)
+        where_params = self.params
+        for clause, params in inner:
+            where.append(clause)
+            where_params += params
+
+        where_sql = f' WHERE {" AND ".join(where)}' if where else ''
+        order = self.order(table, alias, query.get('order'))
+        tail = (f' ORDER BY {", ".join(order)}' if order else '')
+        if query.get('limit'):
+            tail += f' LIMIT {int(query["limit"])}'
+        if query.get('offset'):
+            tail += f' OFFSET {int(query["offset"])}'
+
+        data_sql = (f"SELECT coalesce(json_agg(r), '[]'::json) FROM ("
+                    f'SELECT {", ".join(columns)} FROM public.{quote_ident(table)} {alias}{where_sql}{tail}) r')
+        count_sql = f'SELECT count(*) FROM public.{quote_ident(table)} {alias}{where_sql}' if count else None
+        return data_sql, count_sql, select_params + where_params, where_params
+
+
+class Query:
+    """Ordered query parameters with dict-like access to the first value"""
+
+    def __init__(self, raw):
+        self.items_list = parse_qsl(raw, keep_blank_values=True)
+        self.first = {}
+        for key, value in self.items_list:
+            self.first.setdefault(key, value)
+
+    def get(self, key, default=None):
+        return self.first.get(key, default)
+
+    def __getitem__(self, key):
+        return self.first[key]
+
+
+# ---------------------------------------------------------------------------
+# Backends
+# ---------------------------------------------------------------------------
+
+def adapt(value):
+    from psycopg2.extras import Json
+    return Json(value) if isinstance(value, (dict, list)) else value
+
+
+class PostgresBackend:
+    """Runs translated queries on a local database through a thread pool"""
+
+    def __init__(self, dsn, pool_size):
+        import psycopg2.pool
+        self.pool = psycopg2.pool.ThreadedConnectionPool(1, pool_size, dsn)
+        self.executor = ThreadPoolExecutor(max_workers=pool_size)
+        conn = self.pool.getconn()
+        with conn.cursor() as cur:
+            self.catalog = Catalog(cur)
+        conn.rollback()
+        self.pool.putconn(conn)
+        print(f'   🗄️ {len(self.catalog.columns)} tables, {len(self.catalog.foreign_keys)} foreign keys, '
+              f'{len(self.catalog.functions)} functions')
+
+    async def handle(self, method, path, query, headers, body):
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor, self._handle, method, path, query, headers, body)
+
+    def _run(self, statements):
+        """Run [(sql, params)] in one transaction, returns the first column of each first row"""
+        conn = self.pool.getconn()
+        try:
+            results = []
+            with conn.cursor() as cur:
+                for sql, params in statements:
+                    cur.execute(sql, params)
+                    row = cur.fetchone() if cur.description else None
+                    results.append(row[0] if row else None)
+            conn.commit()
+            return results
+        except Exception as e:
+            conn.rollback()
+            status = 400 if getattr(e, 'pgcode', None) else 500
+            raise ApiError(status, str(e).strip())
+        finally:
+            self.pool.putconn(conn)
+
+    def _handle(self, method, path, query, headers, body):
+        prefer = headers.get('prefer', '')
+        if path == '/auth/v1/token':
+            return self.login(json.loads(body or '{}'))
+        if path.startswith('/rest/v1/rpc/'):
+            return self.rpc(path.rsplit('/', 1)[1], json.loads(body or '{}') if body else dict(query.items_list))
+
+        table = path.removeprefix('/rest/v1/').strip('/')
+        builder = QueryBuilder(self.catalog)
+        count = 'count=exact' in prefer or 'count=planned' in prefer or 'count=estimated' in prefer
+
+        if method in ('GET', 'HEAD'):
+            data_sql, count_sql, params, count_params = builder.select(table, query, count)
+            statements = [(data_sql, params)] + ([(count_sql, count_params)] if count_sql else [])
+            results = self._run(statements)
+            rows = results[0]
+            extra = {}
+            if count_sql:
+                offset = int(query.get('offset', 0))
+                end = offset + len(rows) - 1
+                extra['Content-Range'] = f'{offset}-{end}/{results[1]}' if rows else f'*/{results[1]}'
+            if 'vnd.pgrst.object' in headers.get('accept', ''):
+                if len(rows) != 1:
+                    raise ApiError(406, f'JSON object requested, multiple (or no) rows returned ({len(rows)})')
+                rows = rows[0]
+            return 200, ('' if method == 'HEAD' else rows), extra
+
+        table = self.catalog.table(table)
+        payload = json.loads(body or 'null')
+        minimal = 'return=minimal' in prefer
+        if method == 'POST':
+            records = payload if isinstance(payload, list) else [payload]
+            columns = sorted({k for r in records for k in r})
+            for column in columns:
+                self.catalog.column(table, column)
+            values = ', '.join('(' + ', '.join(['%s'] * len(columns)) + ')' for _ in records)
+            params = [adapt(r.get(c)) for r in records for c in columns]
+            conflict = ' ON CONFLICT DO NOTHING' if 'resolution=ignore-duplicates' in prefer else ''
+            sql = (f'WITH w AS (INSERT INTO public.{quote_ident(table)} ({", ".join(map(quote_ident, columns))}) '
+                   f"VALUES {values}{conflict} RETURNING *) SELECT coalesce(json_agg(w), '[]'::json) FROM w")
+            rows = self._run([(sql, params)])[0]
+            return 201, ('' if minimal else rows), {}
+
+        alias = 't0'
+        filters = [(k, v) for k, v in query.items_list if k not in RESERVED_PARAMS or k in ('or', 'and')]
+        where = builder.where(table, alias, filters)
+        where_params = builder.params
+        if method == 'PATCH':
+            assignments = ', '.join(f'{quote_ident(self.catalog.column(table, c))} = %s' for c in payload)
+            sql = (f'WITH w AS (UPDATE public.{quote_ident(table)} {alias} SET {assignments} '
+                   f'WHERE {" AND ".join(where) or "true"} RETURNING {alias}.*) '
+                   f"SELECT coalesce(json_agg(w), '[]'::json) FROM w")
+            params = [adapt(v) for v in payload.values()] + where_params
+        elif method == 'DELETE':
+            sql = (f'WITH w AS (DELETE FROM public.{quote_ident(table)} {alias} '
+                   f'WHERE {" AND ".join(where) or "true"} RETURNING {alias}.*) '
+                   f"SELECT coalesce(json_agg(w), '[]'::json) FROM w")
+            params = where_params
+        else:
+            raise ApiError(405, f'{method} not supported')
+        rows = self._run([(sql, params)])[0]
+        return (204, '', {}) if minimal else (200, rows, {})
+
+    def rpc(self, name, args):
+        if name not in self.catalog.functions:
+            raise ApiError(404, f'Could not find the function public.{name}')
+        returns_set, composite = self.catalog.functions[name]
+        named = ', '.join(f'{quote_ident(k)} => %s' for k in args)
+        params = [adapt(v) for v in args.values()]
+        call = f'public.{quote_ident(name)}({named})'
+        if returns_set or composite:
+            sql = f"SELECT coalesce(json_agg(r), '[]'::json) FROM {call} r"
+        else:
+            sql = f'SELECT to_json({call})'
+        result = self._run([(sql, params)])[0]
+        if composite and not returns_set:
+            result = result[0] if result else None
+        return 200, result, {}
+
+    def login(self, credentials):
+        user_id = self._run([('SELECT id::text FROM public.users WHERE email = %s', [credentials.get('email')])])[0]
+        if not user_id:
+            raise ApiError(400, 'Invalid login credentials')
+        return 200, {
+            'access_token': f'standin.{user_id}',
+            'token_type': 'bearer',
+            'expires_in': 3600,
+            'refresh_token': f'standin-refresh.{user_id}',
+            'user': {'id': user_id, 'email': credentials.get('email'), 'role': 'authenticated'},
+        }, {}
+
+
+def normalize(method, path, query_string):
+    """Replay key with ids, timestamps and numbers replaced by placeholders"""
+    query = '&'.join(sorted(unquote(query_string).split('&'))) if query_string else ''
+    key = f'{method} {path}?{query}'
+    key = UUID_RE.sub(':id', key)
+    key = TIMESTAMP_RE.sub(':ts', key)
+    return NUMBER_RE.sub(':n', key)
+
+
+class ReplayBackend:
+    """Serves recorded responses: exact request first, then the same request shape"""
+
+    def __init__(self, path, upstream=''):
+        self.path = path
+        self.upstream = upstream.rstrip('/')
+        self.exact, self.shapes = {}, {}
+        self.executor = ThreadPoolExecutor(max_workers=16)
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    self.remember(json.loads(line))
+        print(f'   📼 {len(self.exact)} recorded responses, {len(self.shapes)} request shapes'
+              + (f' - recording from {self.upstream}' if self.upstream else ''))
+
+    def remember(self, entry):
+        exact = f"{entry['method']} {entry['path']}?{entry['query']}"
+        self.exact[exact] = entry
+        self.shapes.setdefault(normalize(entry['method'], entry['path'], entry['query']), []).append(entry)
+
+    async def handle(self, method, path, query, headers, body):
+        raw_query = query.raw
+        entry = self.exact.get(f'{method} {path}?{raw_query}')
+        if entry is None:
+            shapes = self.shapes.get(normalize(method, path, raw_query))
+            entry = random.choice(shapes) if shapes else None
+        if entry is None:
+            if not self.upstream:
+                raise ApiError(404, f'No recording for {method} {path}')
+            entry = await asyncio.get_running_loop().run_in_executor(
+                self.executor, self.fetch, method, path, raw_query, headers, body)
+        return entry['status'], entry['body'], entry.get('headers', {})
+
+    def fetch(self, method, path, raw_query, headers, body):
+        forward = {k: v for k, v in headers.items()
+                   if k in ('apikey', 'authorization', 'content-type', 'prefer', 'accept', 'range')}
+        request = urllib.request.Request(f'{self.upstream}{path}' + (f'?{raw_query}' if raw_query else ''),
+                                         data=body or None, method=method, headers=forward)
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                status, text, response_headers = response.status, response.read().decode(), response.headers
+        except urllib.error.HTTPError as e:
+            status, text, response_headers = e.code, e.read().decode(), e.headers
+        entry = {
+            'method': method, 'path': path, 'query': raw_query, 'status': status,
+            'body': json.loads(text) if text else '',
+            'headers': {k: v for k, v in response_headers.items() if k.lower() == 'content-range'},
+        }
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self.remember(entry)
+        return entry
+
+
+# ---------------------------------------------------------------------------
+# HTTP server
+# ---------------------------------------------------------------------------
+
+class Stats:
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.started = time.perf_counter()
+
+    def line(self):
+        elapsed = time.perf_counter() - self.started
+        return f'{self.requests} requests, {self.errors} errors, {self.requests / elapsed:.0f} req/s'
+
+
+async def delay():
+    latency, jitter = option('latency'), option('jitter')
+    if latency or jitter:
+        await asyncio.sleep(max(0.0, latency + random.uniform(-jitter, jitter)) / 1000)
+
+
+def encode_response(status, body, extra_headers, keep_alive):
+    payload = b'' if body == '' or body is None and status == 204 else json.dumps(body, ensure_ascii=False).encode()
+    lines = [f'HTTP/1.1 {status} {HTTPStatus(status).phrase}',
+             'Content-Type: application/json; charset=utf-8',
+             f'Content-Length: {len(payload)}',
+             'Connection: ' + ('keep-alive' if keep_alive else 'close')]
+    lines += [f'{k}: {v}' for k, v in extra_headers.items()]
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode() + payload
+
+
+def make_handler(backend, stats):
+    async def handle_connection(reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, version = request_line.decode().split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    key, _, value = line.decode().partition(':')
+                    headers[key.strip().lower()] = value.strip()
+                length = int(headers.get('content-length', 0))
+                body = (await reader.readexactly(length)).decode() if length else ''
+                keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+
+                url = urlsplit(target)
+                query = Query(url.query)
+                query.raw = url.query
+                stats.requests += 1
+                try:
+                    if method == 'OPTIONS':
+                        status, payload, extra = 204, '', {'Access-Control-Allow-Origin': '*'}
+                    else:
+                        status, payload, extra = await backend.handle(method, url.path, query, headers, body)
+                except ApiError as e:
+                    status, payload, extra = e.status, {'message': str(e), 'code': str(e.status)}, {}
+                except (ValueError, KeyError) as e:
+                    status, payload, extra = 400, {'message': f'bad request: {e}'}, {}
+                if status >= 400:
+                    stats.errors += 1
+                await delay()
+                writer.write(encode_response(status, payload, extra, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionResetError, asyncio.IncompleteReadError, BrokenPipeError):
+            pass
+        finally:
+            writer.close()
+    return handle_connection
+
+
+async def report(stats):
+    while True:
+        await asyncio.sleep(10)
+        print(f'   📈 {stats.line()}')
+
+
+async def serve():
+    if option('db'):
+        backend = PostgresBackend(option('db'), option('db-pool'))
+    elif option('replay'):
+        backend = ReplayBackend(option('replay'), option('record'))
+    else:
+        raise ValueError('Pass --db=<dsn> or --replay=<recording.jsonl>')
+
+    stats = Stats()
+    server = await asyncio.start_server(make_handler(backend, stats), option('host'), option('port'))
+    print(f"\n✅ Listening on http://{option('host')}:{option('port')} "
+          f"(latency {option('latency'):g}±{option('jitter'):g} ms)")
+    asyncio.create_task(report(stats))
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    print('🧪 PostgREST stand-in')
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        print('\n👋 Stopped')
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except Exception as e:
+        print(f'\n❌ ERROR: {e}')
+        import traceback
+        traceback.print_exc()
@@ -0,0 +1,525 @@
+#!/usr/bin/env python3
+"""
+📡 Realtime Fan-out Load Test - bracket and chat channels
+Opens tens of thousands of Realtime (Phoenix v1 JSON protocol) subscriptions
+with the same channels as the app:
+
+- spectators join matches_<tid>, tournament_<tid> and participants_<tid>
+  (RealtimeBracketService), tournaments picked with a skew so a few finals
+  draw most of the crowd
+- chatters join chat_messages_<room> (ChatService.subscribeToMessages)
+
+then fires match updates and chat inserts at a fixed rate and measures the
+end-to-end fan-out latency (fire → delivered on each socket) percentiles and
+the dropped messages (expected deliveries that never arrived).
+
+By default a stand-in broker runs in-process; run it as a separate process
+(`broker`) so it does not share a CPU with the clients. The broker drops a
+message for a socket whose send buffer is over --max-buffer, like Realtime
+does for slow consumers. Pure asyncio + a minimal RFC 6455 implementation,
+no extra packages.
+
+Usage:
+    python scripts/load_testing/realtime_fanout.py broker --port=4100
+    python scripts/load_testing/realtime_fanout.py run --url=ws://127.0.0.1:4100 \\
+        --spectators=10000 --chatters=2000 --rate=50 --chat-rate=20 --duration=60
+    python scripts/load_testing/realtime_fanout.py run     # in-process broker, small defaults
+"""
+
+import asyncio
+import base64
+import hashlib
+import itertools
+import json
+import os
+import random
+import struct
+import sys
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+DEFAULTS = {
+    'host': '127.0.0.1',
+    'port': 4100,
+    'url': '',
+    'spectators': 2000,
+    'chatters': 500,
+    'tournaments': 20,
+    'rooms': 100,
+    'rate': 20.0,         # match updates per second
+    'chat-rate': 10.0,    # chat messages per second
+    'duration': 30.0,     # seconds of firing
+    'grace': 5.0,         # seconds to wait for late deliveries
+    'connect-rate': 500.0,
+    'max-buffer': 1 << 20,
+}
+
+WS_GUID = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+PUBLISH_TOPIC = 'standin:publish'
+
+
+def option(name):
+    """--name=value from sys.argv, typed like its default"""
+    default = DEFAULTS[name]
+    for arg in sys.argv[1:]:
+        if arg.startswith(f'--{name}='):
+            return type(default)(arg.split('=', 1)[1])
+    return default
+
+
+def raise_fd_limit():
+    try:
+        import resource
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+        return hard
+    except (ImportError, ValueError, OSError):
+        return None
+
+
+# ---------------------------------------------------------------------------
+# Minimal WebSocket (RFC 6455): text frames, ping/pong, close
+# ---------------------------------------------------------------------------
+
+def encode_frame(text, mask, opcode=0x1):
+    payload = text.encode() if isinstance(text, str) else text
+    header = bytearray([0x80 | opcode])
+    length = len(payload)
+    mask_bit = 0x80 if mask else 0
+    if length < 126:
+        header.append(mask_bit | length)
+    elif length < 1 << 16:
+        header.append(mask_bit | 126)
+        header += struct.pack('!H', length)
+    else:
+        header.append(mask_bit | 127)
+        header += struct.pack('!Q', length)
+    if not mask:
+        return bytes(header) + payload
+    key = os.urandom(4)
+    return bytes(header) + key + bytes(b ^ key[i % 4] for i, b in enumerate(payload))
+
+
+async def read_frame(reader):
+    """→ (opcode, payload bytes)"""
+    first, second = await reader.readexactly(2)
+    opcode = first & 0x0F
+    length = second & 0x7F
+    if length == 126:
+        length = struct.unpack('!H', await reader.readexactly(2))[0]
+    elif length == 127:
+        length = struct.unpack('!Q', await reader.readexactly(8))[0]
+    key = await reader.readexactly(4) if second & 0x80 else None
+    payload = await reader.readexactly(length)
+    if key:
+        payload = bytes(b ^ key[i % 4] for i, b in enumerate(payload))
+    return opcode, payload
+
+
+async def read_http_head(reader):
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode().split('\r\n')
+    headers = {}
+    for line in lines[1:]:
+        key, _, value = line.partition(':')
+        if key:
+            headers[key.strip().lower()] = value.strip()
+    return lines[0], headers
+
+
+def accept_key(key):
+    return base64.b64encode(hashlib.sha1((key + WS_GUID).encode()).digest()).decode()
+
+
+class WebSocketClient:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, url):
+        parts = urlsplit(url)
+        reader, writer = await asyncio.open_connection(parts.hostname, parts.port or 80)
+        key = base64.b64encode(os.urandom(16)).decode()
+        path = (parts.path or '/') + (f'?{parts.query}' if parts.query else '')
+        writer.write((f'GET {path} HTTP/1.1\r\nHost: {parts.netloc}\r\nUpgrade: websocket\r\n'
+                      f'Connection: Upgrade\r\nSec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n').encode())
+        status, headers = await read_http_head(reader)
+        if ' 101 ' not in status + ' ' or headers.get('sec-websocket-accept') != accept_key(key):
+            writer.close()
+            raise ConnectionError(f'WebSocket upgrade failed: {status}')
+        return cls(reader, writer)
+
+    def send(self, message):
+        self.writer.write(encode_frame(json.dumps(message), mask=True))
+
+    async def receive(self):
+        """Next text message as a dict, None when the socket closes"""
+        while True:
+            opcode, payload = await read_frame(self.reader)
+            if opcode == 0x1:
+                return json.loads(payload)
+            if opcode == 0x8:
+                return None
+            if opcode == 0x9:
+                self.writer.write(encode_frame(payload, mask=True, opcode=0xA))
+
+    def close(self):
+        self.writer.close()
+
+
+# ---------------------------------------------------------------------------
+# Stand-in broker
+# ---------------------------------------------------------------------------
+
+class Broker:
+    """Phoenix channels with postgres_changes filters (eq only), fan-out by filter value"""
+
+    def __init__(self, max_buffer):
+        self.max_buffer = max_buffer
+        # (table, column, value) → {topic: {writer: [subscription ids]}}
+        self.routes = defaultdict(lambda: defaultdict(dict))
+        self.sub_ids = itertools.count(1)
+        self.connections = 0
+        self.subscriptions = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    async def handle(self, reader, writer):
+        joined = []
+        connected = False
+        try:
+            request_line, headers = await read_http_head(reader)
+            if 'sec-websocket-key' not in headers:
+                writer.write(b'HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\n\r\n')
+                return
+            writer.write((f"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                          f"Sec-WebSocket-Accept: {accept_key(headers['sec-websocket-key'])}\r\n\r\n").encode())
+            self.connections += 1
+            connected = True
+            while True:
+                opcode, payload = await read_frame(reader)
+                if opcode == 0x8:
+                    break
+                if opcode == 0x9:
+                    writer.write(encode_frame(payload, mask=False, opcode=0xA))
+                    continue
+                if opcode != 0x1:
+                    continue
+                message = json.loads(payload)
+                reply = self.dispatch(writer, message, joined)
+                if reply is not None:
+                    writer.write(encode_frame(json.dumps(reply), mask=False))
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionResetError, BrokenPipeError):
+            pass
+        finally:
+            for route, topic in joined:
+                self.routes[route][topic].pop(writer, None)
+                self.subscriptions -= 1
+            if connected:
+                self.connections -= 1
+            writer.close()
+
+    def dispatch(self, writer, message, joined):
+        topic, event, ref = message.get('topic'), message.get('event'), message.get('ref')
+        payload = message.get('payload') or {}
+        response = {}
+        if event == 'phx_join':
+            changes = []
+            for change in payload.get('config', {}).get('postgres_changes', []):
+                column, _, value = (change.get('filter') or '').partition('=eq.')
+                sub_id = next(self.sub_ids)
+                route = (change['table'], column, value)
+                self.routes[route][topic].setdefault(writer, []).append(sub_id)
+                joined.append((route, topic))
+                self.subscriptions += 1
+                changes.append({**change, 'id': sub_id})
+            response = {'postgres_changes': changes}
+        elif event == 'phx_leave':
+            for route, joined_topic in [j for j in joined if j[1] == topic]:
+                self.routes[route][joined_topic].pop(writer, None)
+                joined.remove((route, joined_topic))
+                self.subscriptions -= 1
+        elif topic == PUBLISH_TOPIC:
+            self.publish(payload)
+        return {'topic': topic, 'event': 'phx_reply', 'ref': ref,
+                'payload': {'status': 'ok', 'response': response}}
+
+    def publish(self, change):
+        """Fan a {table, type, record} change out to every matching channel"""
+        record = change['record']
+        table = change['table']
+        for column, value in record.items():
+            topics = self.routes.get((table, column, str(value)))
+            if not topics:
+                continue
+            for topic, writers in topics.items():
+                for writer, sub_ids in writers.items():
+                    if writer.transport.get_write_buffer_size() > self.max_buffer:
+                        self.dropped += 1
+                        continue
+                    message = {
+                        'topic': topic, 'event': 'postgres_changes', 'ref': None,
+                        'payload': {'ids': sub_ids, 'data': {
+                            'schema': 'public', 'table': table, 'type': change['type'],
+                            'eventType': change['type'],
+                            'commit_timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+                            'record': record, 'new': record, 'old': {}, 'errors': None,
+                        }},
+                    }
+                    writer.write(encode_frame(json.dumps(message), mask=False))
+                    self.delivered += 1
+
+
+async def start_broker(host, port):
+    broker = Broker(option('max-buffer'))
+    server = await asyncio.start_server(broker.handle, host, port, backlog=4096)
+    return broker, server
+
+
+async def run_broker():
+    limit = raise_fd_limit()
+    broker, server = await start_broker(option('host'), option('port'))
+    print(f"📡 Stand-in Realtime broker on ws://{option('host')}:{option('port')}/realtime/v1/websocket"
+          + (f' (fd limit {limit})' if limit else ''))
+    async with server:
+        while True:
+            await asyncio.sleep(10)
+            print(f'   🔌 {broker.connections} sockets, {broker.subscriptions} subscriptions, '
+                  f'{broker.delivered} delivered, {broker.dropped} dropped')
+
+
+# ---------------------------------------------------------------------------
+# Load generator
+# ---------------------------------------------------------------------------
+
+class FanoutStats:
+    def __init__(self):
+        self.sent_at = {}             # seq → perf_counter at fire time
+        self.expected = defaultdict(int)
+        self.received = defaultdict(int)
+        self.latencies_ms = []
+        self.connect_failures = 0
+        self.join_failures = 0
+        self.subscribed = defaultdict(int)   # channel → joined sockets
+
+    def deliver(self, record):
+        tag = record.get('notes') or record.get('message') or ''
+        if not tag.startswith('fanout:'):
+            return
+        seq = int(tag.split(':')[1])
+        sent = self.sent_at.get(seq)
+        if sent is not None:
+            self.received[seq] += 1
+            self.latencies_ms.append((time.perf_counter() - sent) * 1000)
+
+
+def channel_join(topic, table, column, value, ref, event='*'):
+    return {
+        'topic': f'realtime:{topic}', 'event': 'phx_join', 'ref': str(ref), 'join_ref': str(ref),
+        'payload': {'config': {
+            'broadcast': {'ack': False, 'self': False}, 'presence': {'key': ''},
+            'postgres_changes': [{'event': event, 'schema': 'public', 'table': table,
+                                  'filter': f'{column}=eq.{value}'}],
+        }, 'access_token': os.getenv('SUPABASE_ANON_KEY', 'standin')},
+    }
+
+
+def spectator_channels(tournament_id):
+    return [
+        (f'matches_{tournament_id}', 'matches', 'tournament_id', tournament_id),
+        (f'tournament_{tournament_id}', 'tournaments', 'id', tournament_id),
+        (f'participants_{tournament_id}', 'tournament_participants', 'tournament_id', tournament_id),
+    ]
+
+
+async def subscriber(url, channels, stats, ready, stop):
+    try:
+        ws = await WebSocketClient.connect(url)
+    except (OSError, ConnectionError):
+        stats.connect_failures += 1
+        ready.release()
+        return
+    refs = {}
+    for ref, (topic, table, column, value) in enumerate(channels, 1):
+        refs[str(ref)] = topic
+        ws.send(channel_join(topic, table, column, value, ref))
+    pending = set(refs)
+    released = False
+    try:
+        while not stop.is_set():
+            try:
+                message = await asyncio.wait_for(ws.receive(), timeout=25)
+            except asyncio.TimeoutError:
+                ws.send({'topic': 'phoenix', 'event': 'heartbeat', 'payload': {}, 'ref': 'hb'})
+                continue
+            if message is None:
+                break
+            if message['event'] == 'phx_reply' and message.get('ref') in pending:
+                pending.discard(message['ref'])
+                if message['payload'].get('status') == 'ok':
+                    stats.subscribed[refs[message['ref']]] += 1
+                else:
+                    stats.join_failures += 1
+                if not pending and not released:
+                    ready.release()
+                    released = True
+            elif message['event'] == 'postgres_changes':
+                stats.deliver(message['payload']['data'].get('record') or message['payload']['data'].get('new', {}))
+    except (asyncio.IncompleteReadError, ConnectionResetError):
+        pass
+    finally:
+        if not released:
+            ready.release()
+        ws.close()
+
+
+def skewed_choice(items, weights):
+    return random.choices(items, weights=weights, k=1)[0]
+
+
+async def publisher(url, tournaments, rooms, stats, stop):
+    """Fire match updates and chat inserts at the configured rates"""
+    ws = await WebSocketClient.connect(url)
+    seq = itertools.count(1)
+    match_interval = 1 / option('rate') if option('rate') else None
+    chat_interval = 1 / option('chat-rate') if option('chat-rate') and rooms else None
+    if not match_interval and not chat_interval:
+        raise ValueError('Nothing to fire: set --rate and/or --chat-rate')
+    started = time.perf_counter()
+    next_match, next_chat = started, started
+    reader = asyncio.ensure_future(drain(ws, stop))
+
+    while time.perf_counter() - started < option('duration'):
+        now = time.perf_counter()
+        if match_interval and now >= next_match:
+            n = next(seq)
+            tournament_id = random.choice(tournaments)
+            channel = f'matches_{tournament_id}'
+            stats.expected[n] = stats.subscribed[channel]
+            stats.sent_at[n] = time.perf_counter()
+            ws.send({'topic': PUBLISH_TOPIC, 'event': 'publish', 'ref': None, 'payload': {
+                'table': 'matches', 'type': 'UPDATE',
+                'record': {'id': f'm-{n}', 'tournament_id': tournament_id, 'status': 'in_progress',
+                           'player1_score': random.randint(0, 9), 'player2_score': random.randint(0, 9),
+                           'notes': f'fanout:{n}'},
+            }})
+            next_match += match_interval
+        if chat_interval and now >= next_chat:
+            n = next(seq)
+            room_id = random.choice(rooms)
+            stats.expected[n] = stats.subscribed[f'chat_messages_{room_id}']
+            stats.sent_at[n] = time.perf_counter()
+            ws.send({'topic': PUBLISH_TOPIC, 'event': 'publish', 'ref': None, 'payload': {
+                'table': 'chat_messages', 'type': 'INSERT',
+                'record': {'id': f'c-{n}', 'room_id': room_id, 'message': f'fanout:{n}'},
+            }})
+            next_chat += chat_interval
+        await ws.writer.drain()
+        wake = min(t for t, i in ((next_match, match_interval), (next_chat, chat_interval)) if i)
+        await asyncio.sleep(max(0.0, wake - time.perf_counter()))
+
+    reader.cancel()
+    ws.close()
+
+
+async def drain(ws, stop):
+    """Read (and ignore) publish acks so the publisher socket never backs up"""
+    try:
+        while not stop.is_set() and await ws.receive() is not None:
+            pass
+    except (asyncio.IncompleteReadError, ConnectionResetError, asyncio.CancelledError):
+        pass
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, int(round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+
+async def run_load():
+    limit = raise_fd_limit()
+    url = option('url')
+    server = broker = None
+    if not url:
+        broker, server = await start_broker(option('host'), option('port'))
+        url = f"ws://{option('host')}:{option('port')}"
+        print(f'📡 In-process stand-in broker on {url} (use `broker` + --url for real numbers)')
+    url = url.rstrip('/') + '/realtime/v1/websocket?vsn=1.0.0&apikey=' + os.getenv('SUPABASE_ANON_KEY', 'standin')
+
+    tournaments = [f'00000000-0000-4000-8000-{i:012d}' for i in range(option('tournaments'))]
+    rooms = [f'00000000-0000-4000-9000-{i:012d}' for i in range(option('rooms'))]
+    # Zipf-like: the first tournaments (finals on stream) draw most spectators
+    weights = [1 / (i + 1) for i in range(len(tournaments))]
+
+    plan = [spectator_channels(skewed_choice(tournaments, weights)) for _ in range(option('spectators'))]
+    plan += [[(f'chat_messages_{r}', 'chat_messages', 'room_id', r)]
+             for r in (random.choice(rooms) for _ in range(option('chatters')))]
+    subscriptions = sum(len(p) for p in plan)
+    print(f'👥 {len(plan):,} sockets, {subscriptions:,} subscriptions'
+          + (f' (fd limit {limit})' if limit else ''))
+
+    stats = FanoutStats()
+    stop = asyncio.Event()
+    ready = asyncio.Semaphore(0)
+    connect_started = time.perf_counter()
+    tasks = []
+    for i, channels in enumerate(plan):
+        tasks.append(asyncio.create_task(subscriber(url, channels, stats, ready, stop)))
+        if option('connect-rate') and i % 50 == 49:
+            await asyncio.sleep(50 / option('connect-rate'))
+    for _ in plan:
+        await ready.acquire()
+    print(f'   ✅ Subscribed in {time.perf_counter() - connect_started:.1f}s - '
+          f'{sum(stats.subscribed.values()):,} joined, {stats.join_failures} join failures, '
+          f'{stats.connect_failures} connect failures')
+
+    print(f"🔥 Firing {option('rate'):g} match updates/s + {option('chat-rate'):g} chat messages/s "
+          f"for {option('duration'):g}s")
+    await publisher(url, tournaments, rooms, stats, stop)
+    await asyncio.sleep(option('grace'))
+    stop.set()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    if server:
+        server.close()
+
+    latencies = sorted(stats.latencies_ms)
+    expected = sum(stats.expected.values())
+    received = sum(min(stats.received[s], e) for s, e in stats.expected.items())
+    dropped = expected - received
+    print('\n' + '='*60)
+    print('📊 FAN-OUT RESULTS')
+    print('='*60)
+    print(f'   Events fired:        {len(stats.sent_at):,}')
+    print(f'   Deliveries expected: {expected:,}')
+    print(f'   Deliveries received: {received:,}')
+    print(f'   Dropped:             {dropped:,} ({dropped * 100 / expected if expected else 0:.3f}%)')
+    if broker:
+        print(f'   Dropped by broker (slow consumers): {broker.dropped:,}')
+    print(f'   Fan-out latency ms:  p50 {percentile(latencies, 50):.1f}  p95 {percentile(latencies, 95):.1f}  '
+          f'p99 {percentile(latencies, 99):.1f}  max {latencies[-1] if latencies else 0:.1f}')
+
+
+def main():
+    command = next((a for a in sys.argv[1:] if not a.startswith('--')), 'run')
+    if command not in ('run', 'broker'):
+        print('Usage: python scripts/load_testing/realtime_fanout.py run|broker [--option=value ...]')
+        return
+    try:
+        asyncio.run(run_broker() if command == 'broker' else run_load())
+    except KeyboardInterrupt:
+        print('\n👋 Stopped')
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except Exception as e:
+        print(f'\n❌ ERROR: {e}')
+        import traceback
+        traceback.print_exc()
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+📊 Load Test Results Pipeline - baseline capture and regression gate
+Reads Locust CSV stats (--csv prefix) or a k6 --summary-export JSON and turns
+it into the scenario structure of baseline_metrics.json (p50/p95/p99, RPS,
+error rate, per-endpoint numbers for Locust).
+
+- capture: store the run as the baseline of a scenario
+- compare: diff the run against the stored baseline with the tolerances in
+  baseline_metrics.json ("regression_tolerances"), exit 1 on a regression.
+  A scenario without a baseline yet is captured instead.
+
+Usage:
+    python scripts/load_testing/results_pipeline.py capture load_test_results --scenario=1k_users
+    python scripts/load_testing/results_pipeline.py compare load_test_summary.json --scenario=1k_users
+    python scripts/load_testing/results_pipeline.py compare load_test_results --report=load_test_results.md
+"""
+
+import csv
+import json
+import os
+import sys
+from datetime import datetime, timezone
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BASELINE_FILE = os.path.join(HERE, 'baseline_metrics.json')
+
+DEFAULTS = {
+    'scenario': '1k_users',
+    'env': 'staging',
+    'baseline': BASELINE_FILE,
+    'report': '',
+}
+
+# Allowed change vs the baseline before a run counts as a regression
+DEFAULT_TOLERANCES = {
+    'p50_percent': 15,             # latency may grow by this much
+    'p95_percent': 15,
+    'p99_percent': 25,
+    'error_rate_points': 0.5,      # error rate may grow by this many percentage points
+    'throughput_percent': 10,      # RPS may drop by this much
+    'endpoint_p95_percent': 25,
+    'min_requests': 100,           # endpoints with fewer requests are not gated
+}
+
+
+def option(name):
+    """--name=value from sys.argv"""
+    for arg in sys.argv[1:]:
+        if arg.startswith(f'--{name}='):
+            return arg.split('=', 1)[1]
+    return DEFAULTS[name]
+
+
+def empty_times(*keys):
+    return {k: 0 for k in keys}
+
+
+# ---------------------------------------------------------------------------
+# Parsers
+# ---------------------------------------------------------------------------
+
+def _num(value):
+    if value in (None, '', 'N/A'):
+        return None
+    return round(float(value), 2)
+
+
+def parse_locust(prefix):
+    """<prefix>_stats.csv (+ _stats_history.csv for the duration)"""
+    stats_file = prefix if prefix.endswith('_stats.csv') else f'{prefix}_stats.csv'
+    with open(stats_file, encoding='utf-8', newline='') as f:
+        rows = list(csv.DictReader(f))
+    aggregated = next((r for r in rows if r['Name'] == 'Aggregated'), None)
+    if not aggregated:
+        raise ValueError(f'{stats_file} has no Aggregated row')
+
+    def times(row):
+        return {
+            'p50': _num(row['50%']),
+            'p95': _num(row['95%']),
+            'p99': _num(row['99%']),
+            'average': _num(row['Average Response Time']),
+            'min': _num(row['Min Response Time']),
+            'max': _num(row['Max Response Time']),
+        }
+
+    duration = None
+    history_file = stats_file.replace('_stats.csv', '_stats_history.csv')
+    if os.path.exists(history_file):
+        with open(history_file, encoding='utf-8', newline='') as f:
+            stamps = [int(r['Timestamp']) for r in csv.DictReader(f) if r.get('Timestamp')]
+        if len(stamps) > 1:
+            duration = round((max(stamps) - min(stamps)) / 60, 1)
+
+    total = int(aggregated['Request Count'])
+    failed = int(aggregated['Failure Count'])
+    result = {
+        'duration_minutes': duration,
+        'total_requests': total,
+        'successful_requests': total - failed,
+        'failed_requests': failed,
+        'error_rate_percent': round(failed * 100 / total, 3) if total else 0.0,
+        'response_times_ms': times(aggregated),
+        'throughput_rps': _num(aggregated['Requests/s']),
+        'endpoints': {},
+    }
+    for row in rows:
+        if row['Name'] == 'Aggregated':
+            continue
+        count = int(row['Request Count'])
+        result['endpoints'][f"{row['Type']} {row['Name']}"] = {
+            'requests': count,
+            'error_rate_percent': round(int(row['Failure Count']) * 100 / count, 3) if count else 0.0,
+            'throughput_rps': _num(row['Requests/s']),
+            'response_times_ms': times(row),
+        }
+    return result
+
+
+def parse_k6(path):
+    """k6 --summary-export JSON (add p(99) to --summary-trend-stats for p99)"""
+    with open(path, encoding='utf-8') as f:
+        metrics = json.load(f)['metrics']
+
+    def trend(name):
+        m = metrics.get(name)
+        if not m:
+            return None
+        m = m.get('values', m)
+        return {
+            'p50': _num(m.get('med', m.get('p(50)'))),
+            'p95': _num(m.get('p(95)')),
+            'p99': _num(m.get('p(99)')),
+            'average': _num(m.get('avg')),
+            'min': _num(m.get('min')),
+            'max': _num(m.get('max')),
+        }
+
+    reqs = metrics.get('http_reqs', {})
+    reqs = reqs.get('values', reqs)
+    failed_metric = metrics.get('http_req_failed', {})
+    failed_metric = failed_metric.get('values', failed_metric)
+    total = int(reqs.get('count', 0))
+    error_rate = failed_metric.get('value', failed_metric.get('rate', 0)) or 0
+    failed = int(failed_metric.get('passes', round(error_rate * total)))
+    rate = reqs.get('rate') or 0
+
+    result = {
+        'duration_minutes': round(total / rate / 60, 1) if rate else None,
+        'total_requests': total,
+        'successful_requests': total - failed,
+        'failed_requests': failed,
+        'error_rate_percent': round(error_rate * 100, 3),
+        'response_times_ms': trend('http_req_duration'),
+        'throughput_rps': _num(rate),
+    }
+    for key, metric in (('database_query_times_ms', 'db_query_time'), ('api_response_times_ms', 'api_response_time')):
+        values = trend(metric)
+        if values:
+            result[key] = {k: values[k] for k in ('p50', 'p95', 'p99', 'average')}
+    return result
+
+
+def parse_results(path):
+    if path.endswith('.json'):
+        return 'k6', parse_k6(path)
+    return 'locust', parse_locust(path)
+
+
+# ---------------------------------------------------------------------------
+# Baseline
+# ---------------------------------------------------------------------------
+
+def load_baseline(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def has_baseline(scenario):
+    return bool(scenario and scenario.get('total_requests'))
+
+
+def capture(document, scenario_name, tool, run):
+    """Merge run into the baseline document (keeps the template's keys)"""
+    baseline = document['baseline_metrics']
+    scenario = baseline['test_scenarios'].setdefault(scenario_name, {})
+    for key, value in run.items():
+        if isinstance(value, dict) and isinstance(scenario.get(key), dict) and key != 'endpoints':
+            scenario[key].update({k: v for k, v in value.items() if v is not None})
+        elif value is not None:
+            scenario[key] = value
+    scenario['tool'] = tool
+    scenario['captured_at'] = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+    baseline['timestamp'] = scenario['captured_at']
+    baseline['test_environment'] = option('env')
+    if run.get('endpoints'):
+        baseline['endpoints_tested'] = sorted(set(baseline.get('endpoints_tested', [])) | set(run['endpoints']))
+    baseline.setdefault('regression_tolerances', DEFAULT_TOLERANCES)
+    baseline['notes'] = 'Captured by results_pipeline.py - rerun capture after an accepted change.'
+
+
+def save_baseline(document, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(document, f, indent=2, ensure_ascii=False)
+        f.write('\n')
+
+
+def _change(old, new):
+    return (new - old) * 100 / old if old else 0.0
+
+
+def compare(baseline, run, tolerances):
+    """→ list of (metric, baseline, current, change, limit, regressed)"""
+    checks = []
+    old_times, new_times = baseline.get('response_times_ms', {}), run.get('response_times_ms') or {}
+    for key in ('p50', 'p95', 'p99'):
+        old, new = old_times.get(key), new_times.get(key)
+        if old and new is not None:
+            change = _change(old, new)
+            limit = tolerances[f'{key}_percent']
+            checks.append((f'{key} ms', old, new, f'{change:+.1f}%', f'+{limit}%', change > limit))
+
+    old, new = baseline.get('error_rate_percent', 0), run['error_rate_percent']
+    points = new - old
+    limit = tolerances['error_rate_points']
+    checks.append(('error rate %', old, new, f'{points:+.2f} pts', f'+{limit} pts', points > limit))
+
+    old, new = baseline.get('throughput_rps'), run.get('throughput_rps')
+    if old and new is not None:
+        change = _change(old, new)
+        limit = tolerances['throughput_percent']
+        checks.append(('throughput rps', old, new, f'{change:+.1f}%', f'-{limit}%', change < -limit))
+
+    for name, current in (run.get('endpoints') or {}).items():
+        stored = (baseline.get('endpoints') or {}).get(name)
+        if not stored or current['requests'] < tolerances['min_requests']:
+            continue
+        old, new = stored['response_times_ms'].get('p95'), current['response_times_ms'].get('p95')
+        if old and new is not None:
+            change = _change(old, new)
+            limit = tolerances['endpoint_p95_percent']
+            checks.append((f'{name} p95', old, new, f'{change:+.1f}%', f'+{limit}%', change > limit))
+    return checks
+
+
+def print_checks(checks):
+    print(f"   {'metric':<44} {'baseline':>10} {'current':>10} {'change':>11} {'limit':>9}")
+    for metric, old, new, change, limit, regressed in checks:
+        mark = '❌' if regressed else '✅'
+        print(f'{mark} {metric:<44} {old:>10} {new:>10} {change:>11} {limit:>9}')
+
+
+def write_report(path, scenario_name, tool, run, checks):
+    lines = [
+        f'# Load Test Results - {scenario_name}',
+        '',
+        f"**Date:** {datetime.now():%Y-%m-%d %H:%M}  ",
+        f'**Tool:** {tool}  ',
+        f"**Duration:** {run.get('duration_minutes') or '-'} min",
+        '',
+        f"- **Total Requests:** {run['total_requests']:,}",
+        f"- **Error Rate:** {run['error_rate_percent']}%",
+        f"- **Throughput:** {run.get('throughput_rps')} req/s",
+        f"- **Response Times:** p50 {run['response_times_ms']['p50']} ms, "
+        f"p95 {run['response_times_ms']['p95']} ms, p99 {run['response_times_ms']['p99']} ms",
+        '',
+    ]
+    if run.get('endpoints'):
+        lines += ['| Endpoint | Requests | P50 (ms) | P95 (ms) | P99 (ms) | Error Rate (%) |',
+                  '|---|---|---|---|---|---|']
+        for name, e in sorted(run['endpoints'].items()):
+            t = e['response_times_ms']
+            lines.append(f"| {name} | {e['requests']} | {t['p50']} | {t['p95']} | {t['p99']} | {e['error_rate_percent']} |")
+        lines.append('')
+    if checks:
+        lines += ['## Baseline Comparison', '', '| Metric | Baseline | Current | Change | Limit | Status |',
+                  '|---|---|---|---|---|---|']
+        for metric, old, new, change, limit, regressed in checks:
+            lines.append(f"| {metric} | {old} | {new} | {change} | {limit} | {'❌' if regressed else '✅'} |")
+        lines.append('')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines))
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    if len(args) < 2 or args[0] not in ('capture', 'compare'):
+        print('Usage: python scripts/load_testing/results_pipeline.py capture|compare <locust csv prefix | k6 summary.json> '
+              '[--scenario=1k_users] [--env=staging] [--baseline=baseline_metrics.json] [--report=results.md]')
+        sys.exit(2)
+    command, results = args
+    scenario_name = option('scenario')
+    baseline_path = option('baseline')
+
+    tool, run = parse_results(results)
+    document = load_baseline(baseline_path)
+    stored = document['baseline_metrics']['test_scenarios'].get(scenario_name)
+    tolerances = {**DEFAULT_TOLERANCES, **document['baseline_metrics'].get('regression_tolerances', {})}
+
+    print(f'📊 {tool} results: {results} → scenario {scenario_name}')
+    print(f"   {run['total_requests']:,} requests, {run['error_rate_percent']}% errors, "
+          f"{run.get('throughput_rps')} req/s, p95 {run['response_times_ms']['p95']} ms\n")
+
+    checks = []
+    if command == 'compare' and has_baseline(stored):
+        checks = compare(stored, run, tolerances)
+        print_checks(checks)
+    if option('report'):
+        write_report(option('report'), scenario_name, tool, run, checks)
+        print(f"\n📝 Report written to {option('report')}")
+
+    if command == 'capture' or not has_baseline(stored):
+        if command == 'compare':
+            print(f'ℹ️ No baseline for {scenario_name} yet - capturing this run')
+        capture(document, scenario_name, tool, run)
+        save_baseline(document, baseline_path)
+        print(f'💾 Baseline for {scenario_name} saved to {baseline_path}')
+        return
+
+    regressions = [c for c in checks if c[-1]]
+    print('\n' + '='*60)
+    if regressions:
+        print(f'❌ PERFORMANCE REGRESSION: {len(regressions)} metric(s) outside tolerance')
+        sys.exit(1)
+    print('✅ Within baseline tolerances')
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except Exception as e:
+        print(f'\n❌ ERROR: {e}')
+        import traceback
+        traceback.print_exc()
+        sys.exit(2)
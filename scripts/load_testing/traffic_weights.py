@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+⚖️ Traffic weights - derive the Locust journey mix from production API logs
+Counts how often each journey of locustfile.py starts in an API log export and
+writes the shares to traffic_weights.json.
+
+- input: CSV or JSON / JSON lines export of Supabase Logs > API (edge_logs),
+  with either method + path columns (e.g. a Logs Explorer query selecting
+  request.method and request.path) or the default event_message column
+  ("GET | 200 | ... | https://<project>.supabase.co/rest/v1/... | ...")
+- one request per journey marks its start (the table below); the shares are
+  percentages of all journey starts
+- chat_send_ratio: chat messages sent per chat room list opened
+
+Usage:
+    python scripts/load_testing/traffic_weights.py api_logs.csv --dry-run
+    python scripts/load_testing/traffic_weights.py api_logs_last7d.json --out=traffic_weights.json
+"""
+
+import csv
+import json
+import os
+import re
+import sys
+from collections import Counter
+from datetime import datetime, timezone
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULTS = {
+    'out': os.path.join(HERE, 'traffic_weights.json'),
+}
+
+# (method, path) that starts each journey - once per journey in locustfile.py
+JOURNEY_MARKERS = {
+    'browse_tournament': [('GET', '/rest/v1/tournament_participants')],
+    'leaderboard': [('POST', '/rest/v1/rpc/get_leaderboard'),
+                    ('POST', '/rest/v1/rpc/get_leaderboard_snapshot')],
+    'notifications': [('HEAD', '/rest/v1/notifications')],
+    'chat': [('GET', '/rest/v1/chat_rooms')],
+    'browse_clubs': [('GET', '/rest/v1/clubs')],
+    'submit_score': [('PATCH', '/rest/v1/matches')],
+}
+CHAT_SEND = ('POST', '/rest/v1/chat_messages')
+
+METHODS = ('GET', 'HEAD', 'POST', 'PATCH', 'PUT', 'DELETE', 'OPTIONS')
+URL_PATH = re.compile(r'(/(?:rest|auth|storage|realtime|functions)/v1/[^\s?|"]*)')
+
+
+def option(name):
+    """--name=value from sys.argv, typed like its default"""
+    default = DEFAULTS[name]
+    for arg in sys.argv[1:]:
+        if arg.startswith(f'--{name}='):
+            return type(default)(arg.split('=', 1)[1])
+    return default
+
+
+def read_rows(path):
+    with open(path, encoding='utf-8', newline='') as f:
+        if not path.endswith(('.json', '.jsonl', '.ndjson')):
+            yield from csv.DictReader(f)
+            return
+        text = f.read().strip()
+    if text.startswith('['):
+        yield from json.loads(text)
+    else:
+        yield from (json.loads(line) for line in text.splitlines() if line.strip())
+
+
+def request_of(row):
+    """(METHOD, path) of one log row, or None"""
+    row = {k.lower().split('.')[-1]: v for k, v in row.items() if isinstance(k, str)}
+    method, path = row.get('method'), row.get('path')
+    if not (method and path):
+        message = str(row.get('event_message') or '')
+        words = message.split('|', 1)[0].split()
+        found = URL_PATH.search(message)
+        method, path = (words[0] if words else None), (found.group(1) if found else None)
+    if not method or not path or method.upper() not in METHODS:
+        return None
+    match = URL_PATH.search(path)
+    return method.upper(), (match.group(1) if match else path.split('?', 1)[0]).rstrip('/')
+
+
+def derive(path):
+    requests = Counter()
+    total = 0
+    for row in read_rows(path):
+        request = request_of(row)
+        total += 1
+        if request:
+            requests[request] += 1
+
+    starts = {journey: sum(requests[m] for m in markers) for journey, markers in JOURNEY_MARKERS.items()}
+    all_starts = sum(starts.values())
+    if not all_starts:
+        raise ValueError(f'No journey requests found in {path} - is it an API (edge_logs) export?')
+
+    # Percent of journey starts, at least 1 for anything seen at all
+    journeys = {journey: max(1, round(100 * count / all_starts)) if count else 0
+                for journey, count in sorted(starts.items(), key=lambda kv: -kv[1])}
+    chat_rooms = starts['chat']
+    return {
+        'journeys': journeys,
+        'chat_send_ratio': round(requests[CHAT_SEND] / chat_rooms, 2) if chat_rooms else 0,
+        'source': f'Derived by traffic_weights.py from {os.path.basename(path)} '
+                  f'({total} log rows, {all_starts} journey starts) on '
+                  f'{datetime.now(timezone.utc):%Y-%m-%d}',
+        'notes': 'Weights are relative, they do not need to sum to 100. Re-export after a release '
+                 'that changes navigation.',
+    }, starts
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    if not args:
+        print(__doc__)
+        return
+
+    weights, starts = derive(args[0])
+    print(f"⚖️ Journey starts in {args[0]}:")
+    for journey, count in starts.items():
+        print(f"   {journey:<18} {count:>9}  → weight {weights['journeys'][journey]}")
+    print(f"   chat_send_ratio    {weights['chat_send_ratio']}")
+
+    if '--dry-run' in sys.argv:
+        print('\n💡 Dry run - weights not written')
+        return
+    with open(option('out'), 'w', encoding='utf-8') as f:
+        json.dump(weights, f, indent=2)
+        f.write('\n')
+    print(f"\n💾 Weights written to {option('out')}")
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except Exception as e:
+        print(f'\n❌ ERROR: {e}')
+        import traceback
+        traceback.print_exc()
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+⚔️ Write-Contention Benchmark - concurrent match result submission
+Sibling matches (two matches whose winners, and losers, go to the same next
+match) finishing at the same moment is the Saturday-bracket worst case. This
+benchmark builds a scratch tournament on a local PostgreSQL with our schema,
+releases all sibling submissions at once and compares:
+
+- app:    the UniversalMatchProgressionService flow, one autocommit statement
+          per REST call (complete match, read target, fill empty slot,
+          re-read, mark ready) for the winner and the loser
+- atomic: complete match + advance_player_atomic() for winner and loser in
+          one transaction (migration 20250103100000)
+
+Reported per mode: submissions/s, submit latency percentiles, lock waits
+sampled from pg_locks/pg_stat_activity, deadlocks (client side and
+pg_stat_database) and target slots that ended up wrong (lost or duplicated
+players).
+
+Usage:
+    python scripts/load_testing/write_contention_benchmark.py --db=postgresql://localhost/sabo_arena
+    python scripts/load_testing/write_contention_benchmark.py --db=... --slots=32 --rounds=20 --mode=app
+"""
+
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+import psycopg2
+from psycopg2 import errors
+from psycopg2.extras import execute_values
+
+DEFAULTS = {
+    'db': '',
+    'slots': 16,          # next-round matches, each fed by 2 sibling matches
+    'rounds': 10,
+    'mode': 'both',
+    'sample-ms': 10,
+    'keep': 0,
+}
+
+APP_NAME = 'contention_bench'
+
+# display_order blocks of the scratch bracket (feeders → winner / loser targets)
+FEEDER_BASE = 100000
+WINNER_BASE = 200000
+LOSER_BASE = 300000
+
+
+def option(name):
+    """--name=value from sys.argv, typed like its default"""
+    default = DEFAULTS[name]
+    for arg in sys.argv[1:]:
+        if arg.startswith(f'--{name}='):
+            return type(default)(arg.split('=', 1)[1])
+    return default
+
+
+def connect(autocommit=False):
+    conn = psycopg2.connect(option('db'), application_name=APP_NAME)
+    conn.autocommit = autocommit
+    return conn
+
+
+# ---------------------------------------------------------------------------
+# Fixture
+# ---------------------------------------------------------------------------
+
+def create_fixture(cur, slots):
+    """Scratch tournament: 2 * slots feeder matches, slots winner and loser targets"""
+    cur.execute('SELECT id FROM users ORDER BY id LIMIT %s', (4 * slots,))
+    players = [r[0] for r in cur.fetchall()]
+    if len(players) < 4 * slots:
+        raise RuntimeError(f'Need {4 * slots} users in the local database, found {len(players)}')
+
+    tournament_id = str(uuid.uuid4())
+    start = datetime.now(timezone.utc) + timedelta(days=1)
+    cur.execute("""
+        INSERT INTO tournaments (id, title, start_date, registration_deadline, max_participants, status)
+        VALUES (%s, %s, %s, %s, %s, 'ongoing')
+    """, (tournament_id, f'[bench] write contention {start:%H%M%S}', start, start, 4 * slots))
+
+    rows = []
+    for i in range(2 * slots):
+        rows.append((tournament_id, 1, i + 1, FEEDER_BASE + i, WINNER_BASE + i // 2, LOSER_BASE + i // 2,
+                     players[2 * i], players[2 * i + 1]))
+    for i in range(slots):
+        rows.append((tournament_id, 2, 2 * slots + i + 1, WINNER_BASE + i, None, None, None, None))
+        rows.append((tournament_id, 2, 3 * slots + i + 1, LOSER_BASE + i, None, None, None, None))
+    execute_values(cur, """
+        INSERT INTO matches (tournament_id, round_number, match_number, display_order,
+                             winner_advances_to, loser_advances_to, player1_id, player2_id)
+        VALUES %s
+    """, rows)
+
+    cur.execute("""
+        SELECT id, display_order, player1_id, player2_id
+        FROM matches WHERE tournament_id = %s AND display_order < %s ORDER BY display_order
+    """, (tournament_id, WINNER_BASE))
+    feeders = cur.fetchall()
+    return tournament_id, feeders
+
+
+def reset_fixture(cur, tournament_id):
+    cur.execute("""
+        UPDATE matches
+        SET winner_id = NULL, player1_score = 0, player2_score = 0, status = 'pending',
+            player1_id = CASE WHEN display_order < %(w)s THEN player1_id END,
+            player2_id = CASE WHEN display_order < %(w)s THEN player2_id END
+        WHERE tournament_id = %(tid)s
+    """, {'tid': tournament_id, 'w': WINNER_BASE})
+
+
+# ---------------------------------------------------------------------------
+# Submission strategies
+# ---------------------------------------------------------------------------
+
+def advance_like_app(cur, tournament_id, target, player_id):
+    """_advancePlayerToMatch: read target, fill the first empty slot, re-read, mark ready"""
+    cur.execute("""
+        SELECT id, player1_id, player2_id FROM matches
+        WHERE tournament_id = %s AND display_order = %s
+    """, (tournament_id, target))
+    match_id, player1, player2 = cur.fetchone()
+    if player1 is None:
+        cur.execute('UPDATE matches SET player1_id = %s WHERE id = %s', (player_id, match_id))
+    elif player2 is None:
+        cur.execute('UPDATE matches SET player2_id = %s WHERE id = %s', (player_id, match_id))
+    else:
+        return False
+    cur.execute('SELECT player1_id, player2_id FROM matches WHERE id = %s', (match_id,))
+    if all(cur.fetchone()):
+        cur.execute("UPDATE matches SET status = 'pending' WHERE id = %s", (match_id,))
+    return True
+
+
+def submit_app(conn, tournament_id, feeder, winner, loser, score):
+    match_id, display_order = feeder[0], feeder[1]
+    with conn.cursor() as cur:
+        cur.execute("""
+            UPDATE matches SET winner_id = %s, player1_score = %s, player2_score = %s, status = 'completed'
+            WHERE id = %s
+        """, (winner, score[0], score[1], match_id))
+        advance_like_app(cur, tournament_id, WINNER_BASE + (display_order - FEEDER_BASE) // 2, winner)
+        advance_like_app(cur, tournament_id, LOSER_BASE + (display_order - FEEDER_BASE) // 2, loser)
+
+
+def submit_atomic(conn, tournament_id, feeder, winner, loser, score):
+    match_id, display_order = feeder[0], feeder[1]
+    slot = (display_order - FEEDER_BASE) // 2
+    with conn.cursor() as cur:
+        cur.execute("""
+            UPDATE matches SET winner_id = %s, player1_score = %s, player2_score = %s, status = 'completed'
+            WHERE id = %s
+        """, (winner, score[0], score[1], match_id))
+        cur.execute('SELECT advance_player_atomic(%s, %s, %s)', (WINNER_BASE + slot, winner, tournament_id))
+        cur.execute('SELECT advance_player_atomic(%s, %s, %s)', (LOSER_BASE + slot, loser, tournament_id))
+    conn.commit()
+
+
+STRATEGIES = {'app': (submit_app, True), 'atomic': (submit_atomic, False)}
+
+
+# ---------------------------------------------------------------------------
+# Lock sampling
+# ---------------------------------------------------------------------------
+
+class LockSampler(threading.Thread):
+    """Polls pg_locks/pg_stat_activity for backends of this benchmark waiting on a lock"""
+
+    def __init__(self, interval):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.stop_event = threading.Event()
+        self.samples = 0
+        self.waiting_samples = 0
+        self.wait_seconds = 0.0
+        self.max_waiting = 0
+        self.max_wait_ms = 0.0
+        self.lock_types = Counter()
+
+    def run(self):
+        conn = psycopg2.connect(option('db'), application_name=APP_NAME + '_sampler')
+        conn.autocommit = True
+        cur = conn.cursor()
+        while not self.stop_event.is_set():
+            cur.execute("""
+                SELECT l.locktype, extract(epoch FROM now() - a.state_change) * 1000
+                FROM pg_locks l
+                JOIN pg_stat_activity a ON a.pid = l.pid
+                WHERE NOT l.granted AND a.application_name = %s
+            """, (APP_NAME,))
+            rows = cur.fetchall()
+            self.samples += 1
+            if rows:
+                self.waiting_samples += 1
+                self.wait_seconds += len(rows) * self.interval
+                self.max_waiting = max(self.max_waiting, len(rows))
+                self.max_wait_ms = max(self.max_wait_ms, max(float(r[1] or 0) for r in rows))
+                self.lock_types.update(r[0] for r in rows)
+            time.sleep(self.interval)
+        conn.close()
+
+    def stop(self):
+        self.stop_event.set()
+        self.join()
+
+
+# ---------------------------------------------------------------------------
+# Benchmark
+# ---------------------------------------------------------------------------
+
+def verify(cur, tournament_id, results):
+    """Compare each target slot with the winners/losers of its two feeders"""
+    expected = {}
+    for display_order, winner, loser in results:
+        slot = (display_order - FEEDER_BASE) // 2
+        expected.setdefault(WINNER_BASE + slot, []).append(winner)
+        expected.setdefault(LOSER_BASE + slot, []).append(loser)
+    cur.execute("""
+        SELECT display_order, player1_id, player2_id FROM matches
+        WHERE tournament_id = %s AND display_order >= %s
+    """, (tournament_id, WINNER_BASE))
+    wrong = []
+    for display_order, player1, player2 in cur.fetchall():
+        want = sorted(str(p) for p in expected.get(display_order, []))
+        got = sorted(str(p) for p in (player1, player2) if p)
+        if want != got:
+            wrong.append((display_order, want, got))
+    return wrong
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+
+def deadlock_count(cur):
+    cur.execute('SELECT deadlocks FROM pg_stat_database WHERE datname = current_database()')
+    return cur.fetchone()[0]
+
+
+def run_mode(mode, admin, tournament_id, feeders):
+    submit, autocommit = STRATEGIES[mode]
+    workers = [connect(autocommit) for _ in feeders]
+    sampler = LockSampler(option('sample-ms') / 1000)
+    sampler.start()
+    deadlocks_before = deadlock_count(admin)
+
+    latencies, errors_seen = [], Counter()
+    wrong_slots, elapsed_total, submissions = [], 0.0, 0
+    for round_number in range(option('rounds')):
+        reset_fixture(admin, tournament_id)
+        barrier = threading.Barrier(len(feeders) + 1)
+        results = [None] * len(feeders)
+
+        def work(i, feeder, conn):
+            _, display_order, player1, player2 = feeder
+            winner, loser = (player1, player2) if (i + round_number) % 2 == 0 else (player2, player1)
+            score = (7, 5) if winner == player1 else (5, 7)
+            barrier.wait()
+            started = time.perf_counter()
+            for attempt in range(5):
+                try:
+                    submit(conn, tournament_id, feeder, winner, loser, score)
+                    break
+                except (errors.DeadlockDetected, errors.SerializationFailure) as e:
+                    conn.rollback()
+                    errors_seen[type(e).__name__] += 1
+                except psycopg2.Error as e:
+                    if not conn.autocommit:
+                        conn.rollback()
+                    errors_seen[type(e).__name__] += 1
+                    break
+            latencies.append((time.perf_counter() - started) * 1000)
+            results[i] = (display_order, winner, loser)
+
+        threads = [threading.Thread(target=work, args=(i, f, c)) for i, (f, c) in enumerate(zip(feeders, workers))]
+        for t in threads:
+            t.start()
+        barrier.wait()
+        started = time.perf_counter()
+        for t in threads:
+            t.join()
+        elapsed_total += time.perf_counter() - started
+        submissions += len(feeders)
+        wrong_slots += verify(admin, tournament_id, results)
+
+    sampler.stop()
+    server_deadlocks = deadlock_count(admin) - deadlocks_before
+    for conn in workers:
+        conn.close()
+
+    targets = len(feeders) * option('rounds')
+    print(f'\n⚔️ MODE: {mode}')
+    print(f'   Submissions:     {submissions} in {elapsed_total:.2f}s → {submissions / elapsed_total:.0f}/s')
+    print(f'   Submit latency:  p50 {percentile(latencies, 50):.1f} ms  p95 {percentile(latencies, 95):.1f} ms  '
+          f'p99 {percentile(latencies, 99):.1f} ms')
+    print(f'   Lock waits:      {sampler.waiting_samples}/{sampler.samples} samples with waiters, '
+          f'~{sampler.wait_seconds * 1000:.0f} ms total wait, max {sampler.max_waiting} waiting, '
+          f'longest {sampler.max_wait_ms:.0f} ms '
+          f'({", ".join(f"{k}: {v}" for k, v in sampler.lock_types.most_common()) or "-"})')
+    print(f'   Deadlocks:       {errors_seen.get("DeadlockDetected", 0)} client / {server_deadlocks} server')
+    other = {k: v for k, v in errors_seen.items() if k != 'DeadlockDetected'}
+    if other:
+        print(f'   Errors:          {", ".join(f"{k}: {v}" for k, v in other.items())}')
+    print(f'   Wrong slots:     {len(wrong_slots)} of {targets} target matches')
+    for display_order, want, got in wrong_slots[:5]:
+        print(f'      ❌ {display_order}: expected {[p[:8] for p in want]}, got {[p[:8] for p in got]}')
+    return len(wrong_slots)
+
+
+def main():
+    if not option('db'):
+        print('Usage: python scripts/load_testing/write_contention_benchmark.py --db=<local postgres dsn> '
+              '[--slots=16] [--rounds=10] [--mode=app|atomic|both]')
+        return
+    modes = list(STRATEGIES) if option('mode') == 'both' else [option('mode')]
+
+    admin_conn = connect(autocommit=True)
+    admin = admin_conn.cursor()
+    tournament_id, feeders = create_fixture(admin, option('slots'))
+    print(f'🏟️ Scratch tournament {tournament_id}: {len(feeders)} sibling submissions per round, '
+          f"{option('slots')} winner + {option('slots')} loser target matches, {option('rounds')} rounds")
+
+    wrong = 0
+    try:
+        for mode in modes:
+            wrong += run_mode(mode, admin, tournament_id, feeders)
+    finally:
+        if not option('keep'):
+            admin.execute('DELETE FROM matches WHERE tournament_id = %s', (tournament_id,))
+            admin.execute('DELETE FROM tournaments WHERE id = %s', (tournament_id,))
+        admin_conn.close()
+
+    print('\n' + '='*60)
+    print('✅ No incorrectly filled slots' if not wrong else f'❌ {wrong} incorrectly filled slots')
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except Exception as e:
+        print(f'\n❌ ERROR: {e}')
+        import traceback
+        traceback.print_exc()
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+🔎 Player Name Index - accent-insensitive player lookup
+Shared by the import, compare and update scripts so that "Xin Con 1" and
+"Xìn Con 1" resolve to the same user instead of creating a duplicate.
+
+- normalize_name() mirrors public.normalize_player_name() in
+  supabase/migrations/20251210000000_add_player_name_search_index.sql
+- resolve_player_names() resolves a whole roster in one query through the
+  resolve_player_names() RPC (unaccent + pg_trgm index)
+- PlayerNameIndex is the in-memory equivalent, used when the migration has not
+  been applied yet or when matching against rows that are already loaded
+
+Usage:
+    python scripts/player_name_index.py "Xin Con 1" "Đạt King"
+"""
+
+import os
+import re
+import sys
+import unicodedata
+from collections import defaultdict, namedtuple
+
+DEFAULT_MIN_SIMILARITY = 0.45
+# Reusing an existing account needs a much closer match than listing candidates:
+# "Huy Gạo" vs "Huy Cao" already scores 0.45
+AUTO_MATCH_SIMILARITY = 0.8
+
+NameMatch = namedtuple('NameMatch', 'user_id matched_name username rank score')
+
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+
+
+def normalize_name(name):
+    """Lowercase, strip Vietnamese accents and collapse punctuation to spaces"""
+    if not name:
+        return ''
+    # NFD does not decompose đ/Đ, unaccent() in the database does
+    name = name.replace('đ', 'd').replace('Đ', 'D')
+    decomposed = unicodedata.normalize('NFD', name)
+    ascii_name = ''.join(c for c in decomposed if unicodedata.category(c) != 'Mn')
+    return _NON_ALNUM.sub(' ', ascii_name.lower()).strip()
+
+
+def generate_username(name):
+    """Generate a username from display name"""
+    return normalize_name(name).replace(' ', '_')
+
+
+def trigrams(normalized):
+    """Trigram set with the same word padding pg_trgm uses"""
+    grams = set()
+    for word in normalized.split():
+        padded = f'  {word} '
+        for i in range(len(padded) - 2):
+            grams.add(padded[i:i + 3])
+    return grams
+
+
+def similarity(a, b):
+    """pg_trgm similarity() of two already-normalized names"""
+    ta, tb = trigrams(a), trigrams(b)
+    if not ta or not tb:
+        return 0.0
+    shared = len(ta & tb)
+    return shared / (len(ta) + len(tb) - shared)
+
+
+class PlayerNameIndex:
+    """In-memory normalized name index over users rows"""
+
+    def __init__(self, rows=()):
+        self._users = {}
+        self._exact = defaultdict(set)
+        self._usernames = {}
+        self._grams = defaultdict(set)
+        for row in rows:
+            self.add(*row)
+
+    def __len__(self):
+        return len(self._users)
+
+    def add(self, user_id, display_name, full_name=None, username=None, rank=None):
+        names = {normalize_name(n) for n in (display_name, full_name) if n}
+        names.discard('')
+        self._users[user_id] = (display_name or full_name, username, rank, names)
+        if username:
+            self._usernames[username] = user_id
+        for normalized in names:
+            self._exact[normalized].add(user_id)
+            for gram in trigrams(normalized):
+                self._grams[gram].add(user_id)
+
+    def lookup(self, name, min_similarity=DEFAULT_MIN_SIMILARITY, limit=3):
+        """Best candidates for one name, exact name or username matches score 1.0"""
+        normalized = normalize_name(name)
+        if not normalized:
+            return []
+
+        username_match = self._usernames.get(normalized.replace(' ', '_'))
+        candidates = set(self._exact.get(normalized, ()))
+        if username_match:
+            candidates.add(username_match)
+        for gram in trigrams(normalized):
+            candidates |= self._grams.get(gram, set())
+
+        matches = []
+        for user_id in candidates:
+            matched_name, username, rank, names = self._users[user_id]
+            if normalized in names or user_id == username_match:
+                score = 1.0
+            else:
+                score = max((similarity(normalized, n) for n in names), default=0.0)
+            if score >= min_similarity:
+                matches.append(NameMatch(user_id, matched_name, username, rank, score))
+
+        matches.sort(key=lambda m: m.score, reverse=True)
+        return matches[:limit]
+
+    def resolve(self, names, min_similarity=DEFAULT_MIN_SIMILARITY, limit=3):
+        return {name: self.lookup(name, min_similarity, limit) for name in names}
+
+
+def load_player_name_index(cur):
+    """Build a PlayerNameIndex from every user with a name"""
+    cur.execute("""
+        SELECT id, display_name, full_name, username, rank
+        FROM users
+        WHERE display_name IS NOT NULL OR full_name IS NOT NULL
+    """)
+    return PlayerNameIndex(cur.fetchall())
+
+
+def resolve_player_names(cur, names, min_similarity=DEFAULT_MIN_SIMILARITY, limit=3):
+    """Resolve many names in one query.
+
+    Returns {name: [NameMatch, ...]} ordered best first. Falls back to the
+    in-memory index when the resolve_player_names() RPC is not deployed.
+    """
+    names = list(names)
+    if not names:
+        return {}
+
+    cur.execute('SAVEPOINT resolve_player_names')
+    try:
+        cur.execute("""
+            SELECT ordinal, user_id, matched_name, username, rank, score
+            FROM resolve_player_names(%s::text[], %s, %s)
+        """, (names, min_similarity, limit))
+        rows = cur.fetchall()
+    except Exception as e:
+        cur.execute('ROLLBACK TO SAVEPOINT resolve_player_names')
+        print(f'⚠️ resolve_player_names() unavailable, using in-memory index ({e.__class__.__name__})')
+        return load_player_name_index(cur).resolve(names, min_similarity, limit)
+    cur.execute('RELEASE SAVEPOINT resolve_player_names')
+
+    resolved = {name: [] for name in names}
+    for ordinal, user_id, matched_name, username, rank, score in rows:
+        resolved[names[ordinal - 1]].append(
+            NameMatch(user_id, matched_name, username, rank, float(score))
+        )
+    return resolved
+
+
+def best_match(matches, min_similarity=AUTO_MATCH_SIMILARITY):
+    """Top candidate if it is close enough to reuse, otherwise None"""
+    if matches and matches[0].score >= min_similarity:
+        return matches[0]
+    return None
+
+
+def main():
+    import psycopg2
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
+    names = sys.argv[1:]
+    if not names:
+        print('Usage: python scripts/player_name_index.py "Name 1" "Name 2" ...')
+        return
+
+    conn = psycopg2.connect(os.getenv('SUPABASE_DB_TRANSACTION_URL'))
+    cur = conn.cursor()
+
+    resolved = resolve_player_names(cur, names)
+    for name in names:
+        matches = resolved[name]
+        print(f'🔎 {name}  →  "{normalize_name(name)}"')
+        if not matches:
+            print('    (no match)')
+        for m in matches:
+            print(f'    {m.score:.2f}  {m.matched_name} (@{m.username}) - Rank: {m.rank}  [{m.user_id}]')
+
+    cur.close()
+    conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+🔢 Reconcile tournaments.current_participants
+Bulk loads that run with session_replication_role = 'replica' skip the
+participant triggers, so the counter drifts. This recomputes every counter in
+one set-based UPDATE from a grouped COUNT and only writes rows that changed,
+which makes it cheap enough to run every minute from cron.
+
+Usage:
+    python scripts/reconcile_participant_counts.py              # all tournaments
+    python scripts/reconcile_participant_counts.py <tournament_id> ...
+    python scripts/reconcile_participant_counts.py --dry-run
+"""
+
+import os
+import sys
+import psycopg2
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Withdrawals delete the participant row, so every remaining row counts
+RECONCILE_SQL = """
+    WITH counts AS (
+        SELECT tournament_id, COUNT(*) AS participants
+        FROM tournament_participants
+        WHERE %(ids)s::uuid[] IS NULL OR tournament_id = ANY(%(ids)s::uuid[])
+        GROUP BY tournament_id
+    ),
+    drift AS (
+        SELECT t.id, t.current_participants AS old_count,
+               COALESCE(c.participants, 0) AS new_count
+        FROM tournaments t
+        LEFT JOIN counts c ON c.tournament_id = t.id
+        WHERE (%(ids)s::uuid[] IS NULL OR t.id = ANY(%(ids)s::uuid[]))
+          AND t.current_participants IS DISTINCT FROM COALESCE(c.participants, 0)
+    )
+    UPDATE tournaments t
+    SET current_participants = d.new_count, updated_at = NOW()
+    FROM drift d
+    WHERE t.id = d.id
+    RETURNING t.id, t.title, d.old_count, d.new_count
+"""
+
+
+def reconcile_participant_counts(cur, tournament_ids=None):
+    """Fix drifted counters, returns [(id, title, old_count, new_count), ...]
+
+    tournament_ids limits the job to those tournaments, None means all.
+    Runs in the caller's transaction.
+    """
+    ids = list(tournament_ids) if tournament_ids else None
+    cur.execute(RECONCILE_SQL, {'ids': ids})
+    return cur.fetchall()
+
+
+def main():
+    dry_run = '--dry-run' in sys.argv
+    tournament_ids = [a for a in sys.argv[1:] if not a.startswith('--')]
+
+    conn = psycopg2.connect(os.getenv('SUPABASE_DB_TRANSACTION_URL'))
+    cur = conn.cursor()
+
+    fixed = reconcile_participant_counts(cur, tournament_ids)
+
+    if dry_run:
+        conn.rollback()
+    else:
+        conn.commit()
+
+    if not fixed:
+        print('✅ All participant counters are in sync')
+    else:
+        verb = 'would fix' if dry_run else 'fixed'
+        print(f'🔢 {verb} {len(fixed)} drifted counter(s):')
+        for tournament_id, title, old_count, new_count in fixed:
+            print(f'   {title or tournament_id}: {old_count} → {new_count} ({new_count - (old_count or 0):+d})')
+
+    cur.close()
+    conn.close()
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except Exception as e:
+        print(f'\n❌ ERROR: {e}')
+        import traceback
+        traceback.print_exc()
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+🔄 Roster Sync - minimal-diff tournament participant sync
+Compares the desired roster (name, rank, seed) against tournament_participants
+and applies only the changes it has to, in one transaction:
+
+- INSERT participants that are missing (creating users that do not exist yet)
+- DELETE participants that are no longer on the roster
+- UPDATE seed_number where a seed moved, users.rank where a rank changed
+- Remap player slots in matches only for seeds whose occupant changed
+
+Nothing is deleted and re-inserted, so triggers and cascades only fire for
+rows that really change and bracket state survives a rerun.
+
+Usage:
+    from roster_sync import sync_roster
+    sync_roster(conn, TOURNAMENT_ID, [("Lý Bảo", "I"), ("Bảo Lâm", "I"), ...])
+"""
+
+import uuid
+from collections import namedtuple
+
+from add_avatars_to_players import generate_avatar_url
+from player_name_index import best_match, generate_username, resolve_player_names
+
+Participant = namedtuple('Participant', 'participant_id user_id seed rank name')
+NewUser = namedtuple('NewUser', 'user_id name username rank avatar_url')
+
+
+class RosterDiff:
+    """Changes needed to turn the current roster into the desired one"""
+
+    def __init__(self):
+        self.new_users = []      # NewUser
+        self.inserts = []        # (user_id, seed)
+        self.deletes = []        # Participant
+        self.seed_updates = []   # (participant_id, old_seed, new_seed)
+        self.rank_updates = []   # (user_id, old_rank, new_rank)
+        self.moves = []          # (old_user_id, new_user_id) per seed whose occupant changed
+        self.final_count = 0
+
+    @property
+    def is_empty(self):
+        return not (self.new_users or self.inserts or self.deletes
+                    or self.seed_updates or self.rank_updates or self.moves)
+
+
+def load_participants(cur, tournament_id):
+    """Current participants keyed by user_id"""
+    cur.execute("""
+        SELECT tp.id, tp.user_id, tp.seed_number, u.rank,
+               COALESCE(u.display_name, u.full_name)
+        FROM tournament_participants tp
+        JOIN users u ON u.id = tp.user_id
+        WHERE tp.tournament_id = %s
+    """, (tournament_id,))
+    return {row[1]: Participant(*row) for row in cur.fetchall()}
+
+
+def plan_roster_sync(cur, tournament_id, players):
+    """Build a RosterDiff for players given as [(name, rank), ...] in seed order"""
+    current = load_participants(cur, tournament_id)
+    resolved = resolve_player_names(cur, [name for name, _ in players])
+    diff = RosterDiff()
+
+    desired = {}  # user_id -> (seed, rank)
+    for seed, (name, rank) in enumerate(players, 1):
+        match = best_match(resolved[name])
+        if match:
+            user_id, current_rank = match.user_id, match.rank
+        else:
+            user_id, current_rank = str(uuid.uuid4()), rank
+            diff.new_users.append(NewUser(user_id, name, generate_username(name), rank, generate_avatar_url(user_id)))
+        if user_id in desired:
+            raise ValueError(f'"{name}" resolves to the same user as seed #{desired[user_id][0]}')
+        desired[user_id] = (seed, rank)
+        if current_rank != rank and match:
+            diff.rank_updates.append((user_id, current_rank, rank))
+
+    for user_id, participant in current.items():
+        if user_id not in desired:
+            diff.deletes.append(participant)
+
+    for user_id, (seed, _) in desired.items():
+        participant = current.get(user_id)
+        if participant is None:
+            diff.inserts.append((user_id, seed))
+        elif participant.seed != seed:
+            diff.seed_updates.append((participant.participant_id, participant.seed, seed))
+
+    # Seats whose occupant changed: the new occupant inherits the old one's bracket slots
+    old_by_seed = {p.seed: user_id for user_id, p in current.items() if p.seed is not None}
+    new_by_seed = {seed: user_id for user_id, (seed, _) in desired.items()}
+    for seed, old_user in sorted(old_by_seed.items()):
+        new_user = new_by_seed.get(seed)
+        if new_user and new_user != old_user:
+            diff.moves.append((old_user, new_user))
+
+    diff.final_count = len(desired)
+    return diff
+
+
+def apply_roster_sync(cur, tournament_id, diff):
+    """Apply a RosterDiff with one set-based statement per kind of change"""
+    if diff.new_users:
+        cur.execute("""
+            INSERT INTO users (id, email, full_name, display_name, username, avatar_url,
+                               rank, role, skill_level, is_verified, is_active, created_at, updated_at)
+            SELECT n.id, n.username || '_' || left(n.id::text, 4) || '@sabo-arena.local',
+                   n.name, n.name, n.username, n.avatar_url,
+                   n.rank, 'player', 'intermediate', false, true, NOW(), NOW()
+            FROM unnest(%s::uuid[], %s::text[], %s::text[], %s::text[], %s::text[])
+                 AS n(id, name, username, rank, avatar_url)
+        """, tuple(map(list, zip(*[
+            (u.user_id, u.name, u.username, u.rank, u.avatar_url) for u in diff.new_users
+        ]))))
+
+    if diff.rank_updates:
+        cur.execute("""
+            UPDATE users u
+            SET rank = c.rank, updated_at = NOW()
+            FROM unnest(%s::uuid[], %s::text[]) AS c(id, rank)
+            WHERE u.id = c.id AND u.rank IS DISTINCT FROM c.rank
+        """, ([r[0] for r in diff.rank_updates], [r[2] for r in diff.rank_updates]))
+
+    if diff.deletes:
+        cur.execute("""
+            DELETE FROM tournament_participants WHERE id = ANY(%s::uuid[])
+        """, ([p.participant_id for p in diff.deletes],))
+
+    if diff.seed_updates:
+        cur.execute("""
+            UPDATE tournament_participants tp
+            SET seed_number = c.seed, updated_at = NOW()
+            FROM unnest(%s::uuid[], %s::int[]) AS c(id, seed)
+            WHERE tp.id = c.id
+        """, ([s[0] for s in diff.seed_updates], [s[2] for s in diff.seed_updates]))
+
+    if diff.inserts:
+        cur.execute("""
+            INSERT INTO tournament_participants (tournament_id, user_id, seed_number, status,
+                                                 registered_at, created_at, updated_at)
+            SELECT %s, c.user_id, c.seed, 'registered', NOW(), NOW(), NOW()
+            FROM unnest(%s::uuid[], %s::int[]) AS c(user_id, seed)
+            ON CONFLICT (tournament_id, user_id) DO UPDATE SET seed_number = EXCLUDED.seed_number
+        """, (tournament_id, [i[0] for i in diff.inserts], [i[1] for i in diff.inserts]))
+
+    touched_matches = 0
+    if diff.moves:
+        old_ids = [m[0] for m in diff.moves]
+        new_ids = [m[1] for m in diff.moves]
+        # Sub-selects (not a join) so a swap A<->B inside one match maps both slots
+        cur.execute("""
+            WITH moves(old_id, new_id) AS (
+                SELECT * FROM unnest(%s::uuid[], %s::uuid[])
+            )
+            UPDATE matches m
+            SET player1_id = COALESCE((SELECT new_id FROM moves WHERE old_id = m.player1_id), m.player1_id),
+                player2_id = COALESCE((SELECT new_id FROM moves WHERE old_id = m.player2_id), m.player2_id),
+                winner_id  = COALESCE((SELECT new_id FROM moves WHERE old_id = m.winner_id), m.winner_id),
+                updated_at = NOW()
+            WHERE m.tournament_id = %s
+              AND (m.player1_id = ANY(%s::uuid[])
+                   OR m.player2_id = ANY(%s::uuid[])
+                   OR m.winner_id = ANY(%s::uuid[]))
+        """, (old_ids, new_ids, tournament_id, old_ids, old_ids, old_ids))
+        touched_matches = cur.rowcount
+
+    if diff.inserts or diff.deletes:
+        cur.execute("""
+            UPDATE tournaments
+            SET current_participants = %s, updated_at = NOW()
+            WHERE id = %s AND current_participants IS DISTINCT FROM %s
+        """, (diff.final_count, tournament_id, diff.final_count))
+
+    return touched_matches
+
+
+def print_roster_diff(diff, touched_matches=None):
+    print(f'   ➕ New users:        {len(diff.new_users)}')
+    for u in diff.new_users:
+        print(f'        {u.name} (@{u.username}) - Hạng {u.rank}')
+    print(f'   ✅ Participants in:  {len(diff.inserts)}')
+    print(f'   🗑️ Participants out: {len(diff.deletes)}')
+    for p in diff.deletes:
+        print(f'        #{p.seed} {p.name}')
+    print(f'   🔢 Seed moves:       {len(diff.seed_updates)}')
+    for _, old_seed, new_seed in diff.seed_updates:
+        print(f'        #{old_seed} → #{new_seed}')
+    print(f'   🎖️ Rank updates:     {len(diff.rank_updates)}')
+    for _, old_rank, new_rank in diff.rank_updates:
+        print(f'        {old_rank} → {new_rank}')
+    if touched_matches is not None:
+        print(f'   🎱 Matches remapped: {touched_matches}')
+
+
+def sync_roster(conn, tournament_id, players, dry_run=False):
+    """Plan and apply a roster sync in one transaction, returns the RosterDiff"""
+    cur = conn.cursor()
+    try:
+        diff = plan_roster_sync(cur, tournament_id, players)
+        if diff.is_empty:
+            print('✅ Roster already up to date - nothing to change')
+            conn.rollback()
+            return diff
+
+        if dry_run:
+            print('🔍 Dry run - planned changes:')
+            print_roster_diff(diff)
+            conn.rollback()
+            return diff
+
+        touched_matches = apply_roster_sync(cur, tournament_id, diff)
+        conn.commit()
+        print('✅ Roster synced:')
+        print_roster_diff(diff, touched_matches)
+        return diff
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+🗓️ Create Season Tournaments from a YAML/JSON spec
+Publishes many tournaments across clubs in one go:
+
+- Clubs and organizers are resolved by exact name/username/id in one query each
+- Fee and prize templates are expanded locally (prize_distribution uses the
+  same custom distribution shape as update_prize_distribution.py)
+- All tournaments are inserted with one multi-row INSERT
+- Optionally the empty SABO bracket skeletons (DE16/24/32/64) are loaded with
+  COPY, with display_order and advancement links from sabo_bracket_layouts,
+  and get their race-to per stage from handicap_engine
+
+Everything runs in one transaction. See season_spec.example.yaml.
+
+Usage:
+    python scripts/tournament_utils/create_season_tournaments.py season.yaml
+    python scripts/tournament_utils/create_season_tournaments.py season.yaml --dry-run
+    python scripts/tournament_utils/create_season_tournaments.py season.yaml --with-brackets
+"""
+
+import csv
+import io
+import json
+import os
+import sys
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import psycopg2
+from psycopg2.extras import execute_values
+from dotenv import load_dotenv
+
+from handicap_engine import stamp_tournaments
+from sabo_bracket_layouts import MATCH_COLUMNS, MAX_PARTICIPANTS, build_layout
+
+load_dotenv()
+
+TOURNAMENT_COLUMNS = (
+    'id', 'title', 'description', 'club_id', 'organizer_id',
+    'bracket_format', 'game_format', 'max_participants',
+    'start_date', 'registration_deadline', 'status',
+    'entry_fee', 'prize_pool', 'prize_distribution', 'prize_source',
+    'distribution_template', 'organizer_fee_percent', 'sponsor_contribution',
+    'skill_level_required', 'min_rank', 'max_rank', 'venue_address',
+)
+
+
+def load_spec(path):
+    with open(path, encoding='utf-8') as f:
+        if path.endswith('.json'):
+            return json.load(f)
+        import yaml
+        return yaml.safe_load(f)
+
+
+def parse_tz(value):
+    """'+07:00' → tzinfo"""
+    sign = -1 if value.startswith('-') else 1
+    hours, minutes = value.lstrip('+-').split(':')
+    return timezone(sign * timedelta(hours=int(hours), minutes=int(minutes)))
+
+
+def parse_start(value, tz):
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=tz)
+    return value
+
+
+def format_vnd(amount):
+    return f'{int(amount):,}'.replace(',', '.')
+
+
+def expand_prize_template(template):
+    """Prize template → (prize_pool, custom distribution dict, description lines)"""
+    distribution = []
+    lines = []
+    for place in template.get('places', []):
+        first = place.get('position', place.get('from'))
+        last = place.get('to', first)
+        cash = place.get('cash', 0)
+        voucher = place.get('voucher', 0)
+        for position in range(first, last + 1):
+            distribution.append({'position': position, 'cashAmount': cash, 'voucherAmount': voucher})
+
+        label = place.get('label') or (f'Top {first}' if first == last else f'Top {first}-{last}')
+        parts = []
+        if cash:
+            parts.append(f'{format_vnd(cash)} VNĐ')
+        if voucher:
+            parts.append(f'{voucher // 1000}k Voucher')
+        if place.get('extra'):
+            parts.append(place['extra'])
+        lines.append(f'• {label}: {" + ".join(parts)}')
+
+    total = sum(d['cashAmount'] for d in distribution)
+    for d in distribution:
+        d['percentage'] = round(d['cashAmount'] * 100 / total, 2) if total else 0
+
+    source = template.get('source', 'entry_fees')
+    custom = {
+        'source': source,
+        'template': 'custom',
+        'organizerFeePercent': template.get('organizer_fee_percent', 0),
+        'sponsorContribution': total if source == 'sponsor' else template.get('sponsor_contribution', 0),
+        'totalPrizePool': total,
+        'distribution': distribution,
+    }
+    return total, custom, lines
+
+
+def expand_tournaments(spec):
+    """Spec entries (with repeat) → flat list of tournament dicts, ids assigned"""
+    tz = parse_tz(spec.get('timezone', '+07:00'))
+    defaults = spec.get('defaults', {})
+    fee_templates = spec.get('fee_templates', {})
+    prize_templates = spec.get('prize_templates', {})
+
+    tournaments = []
+    for entry in spec['tournaments']:
+        entry = {**defaults, **entry}
+        bracket_format = entry['format']
+        if bracket_format not in MAX_PARTICIPANTS:
+            raise ValueError(f'{entry["title"]}: unsupported format {bracket_format}')
+
+        fee = fee_templates[entry['fee']] if 'fee' in entry else {}
+        prize_pool, custom, prize_lines = (0, None, [])
+        if 'prizes' in entry:
+            prize_pool, custom, prize_lines = expand_prize_template(prize_templates[entry['prizes']])
+
+        repeat = entry.get('repeat', {})
+        count = repeat.get('count', 1)
+        step = timedelta(days=repeat.get('every_days', 7))
+        first_start = parse_start(entry['start'], tz)
+
+        for n in range(count):
+            start = first_start + n * step
+            if '{' in entry['title']:
+                title = entry['title'].format(date=start, n=n + 1)
+            elif count > 1:
+                title = f'{entry["title"]} ({start:%d/%m})'
+            else:
+                title = entry['title']
+
+            description = entry.get('description', '').rstrip()
+            if '{date' in description:
+                description = description.format(date=start)
+            if fee.get('note'):
+                description += f'\n💸 Lệ phí: {fee["note"]}'
+            if prize_lines:
+                description += '\n\n🥇 CƠ CẤU GIẢI THƯỞNG\n' + '\n'.join(prize_lines)
+
+            tournaments.append({
+                'id': str(uuid.uuid4()),
+                'title': title,
+                'description': description.strip(),
+                'club': entry['club'],
+                'organizer': entry.get('organizer', spec.get('organizer')),
+                'bracket_format': bracket_format,
+                'game_format': entry.get('game_format', '9-ball'),
+                'max_participants': MAX_PARTICIPANTS[bracket_format],
+                'start_date': start,
+                'registration_deadline': start - timedelta(hours=entry.get('registration_deadline_hours', 12)),
+                'status': entry.get('status', 'upcoming'),
+                'entry_fee': fee.get('entry_fee', 0),
+                'prize_pool': prize_pool,
+                'prize_distribution': json.dumps(custom) if custom else None,
+                'prize_source': custom['source'] if custom else 'entry_fees',
+                'distribution_template': 'custom' if custom else 'top_4',
+                'organizer_fee_percent': custom['organizerFeePercent'] if custom else 10,
+                'sponsor_contribution': custom['sponsorContribution'] if custom else 0,
+                'skill_level_required': entry.get('skill_level_required', 'intermediate'),
+                'min_rank': entry.get('min_rank'),
+                'max_rank': entry.get('max_rank'),
+                'venue_address': entry.get('venue_address'),
+                'pre_generate_bracket': entry.get('pre_generate_bracket', False),
+            })
+    return tournaments
+
+
+def resolve_references(cur, spec, tournaments):
+    """Fill club_id/organizer_id/venue_address with one query per table"""
+    club_refs = {alias: str(ref) for alias, ref in spec.get('clubs', {}).items()}
+    wanted = {club_refs.get(t['club'], str(t['club'])) for t in tournaments}
+    cur.execute("""
+        SELECT id::text, name, owner_id::text, address
+        FROM clubs
+        WHERE id::text = ANY(%s) OR name = ANY(%s)
+    """, (list(wanted), list(wanted)))
+    clubs = {}
+    for club_id, name, owner_id, address in cur.fetchall():
+        clubs[club_id] = clubs[name] = (club_id, name, owner_id, address)
+
+    organizer_refs = {str(t['organizer']) for t in tournaments if t['organizer']}
+    organizers = {}
+    if organizer_refs:
+        cur.execute("""
+            SELECT id::text, username FROM users
+            WHERE id::text = ANY(%s) OR username = ANY(%s)
+        """, (list(organizer_refs), list(organizer_refs)))
+        for user_id, username in cur.fetchall():
+            organizers[user_id] = organizers[username] = user_id
+
+    missing = []
+    for t in tournaments:
+        club = clubs.get(club_refs.get(t['club'], str(t['club'])))
+        if not club:
+            missing.append(f'club "{t["club"]}"')
+            continue
+        t['club_id'], t['club_name'], owner_id, address = club
+        t['venue_address'] = t['venue_address'] or address
+        if t['organizer']:
+            t['organizer_id'] = organizers.get(str(t['organizer']))
+            if not t['organizer_id']:
+                missing.append(f'organizer "{t["organizer"]}"')
+        else:
+            t['organizer_id'] = owner_id
+    if missing:
+        raise ValueError('Unknown ' + ', '.join(sorted(set(missing))))
+
+
+def insert_tournaments(cur, tournaments):
+    """One multi-row INSERT for the whole season"""
+    rows = [tuple(t[c] for c in TOURNAMENT_COLUMNS) for t in tournaments]
+    template = '(' + ', '.join(
+        '%s::jsonb' if c == 'prize_distribution' else
+        '%s::tournament_status' if c == 'status' else
+        '%s::skill_level' if c == 'skill_level_required' else '%s'
+        for c in TOURNAMENT_COLUMNS
+    ) + ')'
+    execute_values(cur, f"""
+        INSERT INTO tournaments ({', '.join(TOURNAMENT_COLUMNS)})
+        VALUES %s
+    """, rows, template=template, page_size=len(rows))
+
+
+def copy_bracket_skeletons(cur, tournaments):
+    """COPY the empty matches of every tournament in one stream"""
+    columns = ('tournament_id', 'bracket_format', 'status', 'match_type',
+               'player1_score', 'player2_score') + MATCH_COLUMNS
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    layouts = {}
+    count = 0
+    for t in tournaments:
+        fmt = t['bracket_format']
+        layout = layouts.setdefault(fmt, build_layout(fmt))
+        for match in layout:
+            # Empty CSV fields are loaded as NULL
+            writer.writerow([t['id'], fmt, 'pending', 'tournament', 0, 0] +
+                            ['' if match[c] is None else match[c] for c in MATCH_COLUMNS])
+            count += 1
+    buffer.seek(0)
+    cur.copy_expert(f"COPY matches ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+    return count
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    if not args:
+        print('Usage: python scripts/tournament_utils/create_season_tournaments.py season.yaml [--dry-run] [--with-brackets]')
+        return
+    dry_run = '--dry-run' in sys.argv
+    with_brackets = '--with-brackets' in sys.argv
+
+    spec = load_spec(args[0])
+    tournaments = expand_tournaments(spec)
+
+    conn = psycopg2.connect(os.getenv('SUPABASE_DB_TRANSACTION_URL'))
+    cur = conn.cursor()
+
+    print(f'🗓️ Season spec: {args[0]} - {len(tournaments)} tournaments\n')
+    resolve_references(cur, spec, tournaments)
+
+    for t in sorted(tournaments, key=lambda t: t['start_date']):
+        print(f"   {t['start_date']:%d/%m %H:%M}  {t['title']:<40} {t['bracket_format']:<10} "
+              f"📍 {t['club_name']}  💸 {format_vnd(t['entry_fee'])}  🏆 {format_vnd(t['prize_pool'])}")
+
+    if dry_run:
+        print('\n🔍 Dry run - nothing written')
+        conn.rollback()
+        conn.close()
+        return
+
+    try:
+        insert_tournaments(cur, tournaments)
+        matches = 0
+        bracketed = [t for t in tournaments if with_brackets or t['pre_generate_bracket']]
+        if bracketed:
+            matches = copy_bracket_skeletons(cur, bracketed)
+            stamp_tournaments(cur, [t['id'] for t in bracketed])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+        conn.close()
+
+    print('\n' + '='*60)
+    print('🎉 SEASON PUBLISHED!')
+    print('='*60)
+    print(f'\n🏆 Tournaments: {len(tournaments)}')
+    print(f'🎱 Bracket matches: {matches} ({len(bracketed)} brackets)')
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except Exception as e:
+        print(f'\n❌ ERROR: {e}')
+        import traceback
+        traceback.print_exc()
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+⚖️ Handicap Engine - race-to and handicap for every match of a bracket
+Loads the rules once into a dense rank × rank × stage matrix and looks up
+all matches of the selected tournaments in one numpy pass:
+
+- Ranks: rank_system ordered by rank_value, one step = one sub-rank
+  (K, K+, I, I+ ...), like rankValues in scripts/sabo_handicap_calculator.dart
+- Handicap: the weaker player starts with it, by sub-rank difference
+    tournament (default)  difference × per-rank / 2 - "I chấp K: 1 ván"
+    --bet=N               handicap_rules.handicap_value of that bet amount
+                          (rank_difference_value = sub-rank difference)
+  Differences beyond the largest rule use the largest rule and are reported.
+- Race-to by stage: early, quarterfinal, semifinal, final
+    tournament (default)  6,7,7,9 - "Đồng cơ: Chạm 6, Tứ kết/Bán kết: Chạm 7,
+                          Chung kết: Chạm 9"
+    --bet=N               challenge_configurations.race_to for every stage
+- Stage: hops to the final along winner_advances_to (0 final, 1 semifinal,
+  2 quarterfinal, more early); brackets without advancement links use
+  round_number. is_final / is_third_place override.
+
+matches has no race_to/handicap columns, so the values are merged into
+match_conditions (race_to, handicap_player1, handicap_player2, stage) with
+one UPDATE ... FROM unnest(...). Only pending matches whose values changed
+are written; matches without both players get the race-to only.
+create_season_tournaments.py stamps new bracket skeletons the same way.
+
+Usage:
+    python scripts/tournament_utils/handicap_engine.py [--dry-run]
+    python scripts/tournament_utils/handicap_engine.py <tournament_id> ... --race=6,7,7,9 --per-rank=1
+    python scripts/tournament_utils/handicap_engine.py <tournament_id> --bet=300 --show-matrix
+"""
+
+import os
+import sys
+from collections import Counter
+
+import numpy as np
+import psycopg2
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DEFAULTS = {
+    'db': '',
+    'bet': 0,             # 0 = tournament rules, otherwise a challenge_configurations.bet_amount
+    'race': '6,7,7,9',    # race-to per stage (early, quarterfinal, semifinal, final)
+    'per-rank': 1.0,      # tournament handicap per main rank (2 sub-ranks)
+    'max-diff': 4,        # largest sub-rank difference with its own handicap
+}
+
+STAGES = ('early', 'quarterfinal', 'semifinal', 'final')
+
+# Matrix fields, last axis
+RACE, HANDICAP_1, HANDICAP_2 = 0, 1, 2
+
+
+def option(name):
+    """--name=value from sys.argv, typed like its default"""
+    default = DEFAULTS[name]
+    for arg in sys.argv[1:]:
+        if arg.startswith(f'--{name}='):
+            return type(default)(arg.split('=', 1)[1])
+    return default
+
+
+def parse_race(value):
+    race = [int(v) for v in value.split(',')]
+    if len(race) != len(STAGES) or min(race) < 1:
+        raise ValueError(f"--race needs {len(STAGES)} positive values ({', '.join(STAGES)})")
+    return race
+
+
+# ---------------------------------------------------------------------------
+# Rules
+# ---------------------------------------------------------------------------
+
+def load_ranks(cur):
+    cur.execute('SELECT rank_code FROM rank_system ORDER BY rank_value')
+    codes = [r[0] for r in cur.fetchall()]
+    if not codes:
+        raise RuntimeError('rank_system is empty - run scripts/run_rank_system_migration.dart first')
+    return codes
+
+
+def tournament_rules(per_rank, max_diff, race):
+    """Handicap per sub-rank difference 0..max_diff and race-to per stage"""
+    steps = np.arange(max_diff + 1) * per_rank / 2
+    return steps, np.array(race, dtype=np.int64)
+
+
+def bet_rules(cur, bet_amount, race=None):
+    """Same from handicap_rules / challenge_configurations for one bet amount"""
+    cur.execute('SELECT race_to FROM challenge_configurations WHERE bet_amount = %s AND is_active IS NOT FALSE',
+                (bet_amount,))
+    row = cur.fetchone()
+    if not row:
+        raise RuntimeError(f'No active challenge configuration for bet {bet_amount}')
+    cur.execute("""
+        SELECT rank_difference_value, handicap_value
+        FROM handicap_rules
+        WHERE bet_amount = %s
+        ORDER BY rank_difference_value
+    """, (bet_amount,))
+    rules = cur.fetchall()
+    if not rules:
+        raise RuntimeError(f'No handicap_rules for bet {bet_amount}')
+    steps = np.zeros(max(int(d) for d, _ in rules) + 1)
+    for diff, value in rules:
+        steps[int(diff)] = float(value)
+    return steps, np.array(race or [row[0]] * len(STAGES), dtype=np.int64)
+
+
+def build_matrix(codes, steps, race):
+    """Dense (rank+1) × (rank+1) × stage × (race, handicap_1, handicap_2).
+
+    The extra last rank index stands for an unknown/empty player: race-to
+    only, no handicap.
+    """
+    n = len(codes)
+    position = np.arange(n)
+    diff = position[None, :] - position[:, None]      # > 0: player 2 is stronger
+    handicap = steps[np.minimum(np.abs(diff), len(steps) - 1)]
+
+    matrix = np.zeros((n + 1, n + 1, len(STAGES), 3))
+    matrix[..., RACE] = race
+    matrix[:n, :n, :, HANDICAP_1] = np.where(diff > 0, handicap, 0)[..., None]
+    matrix[:n, :n, :, HANDICAP_2] = np.where(diff < 0, handicap, 0)[..., None]
+    return matrix
+
+
+def print_matrix(codes, matrix):
+    print(f"\n⚖️ Handicap of the row player vs the column player ({', '.join(STAGES)}: "
+          f"race {', '.join(str(int(r)) for r in matrix[0, 0, :, RACE])})")
+    print('      ' + ''.join(f'{c:>5}' for c in codes))
+    for i, code in enumerate(codes):
+        cells = ''.join(f'{matrix[i, j, 0, HANDICAP_1]:>5g}' if matrix[i, j, 0, HANDICAP_1] else '    ·'
+                        for j in range(len(codes)))
+        print(f'   {code:>3}{cells}')
+
+
+# ---------------------------------------------------------------------------
+# Matches
+# ---------------------------------------------------------------------------
+
+def load_matches(cur, tournament_ids=None):
+    cur.execute("""
+        SELECT m.id::text, m.tournament_id::text, m.display_order, m.winner_advances_to,
+               COALESCE(m.round_number, 0), COALESCE(m.is_final, false),
+               COALESCE(m.is_third_place, false), m.status::text,
+               m.player1_id::text, m.player2_id::text, p1.rank, p2.rank,
+               COALESCE(m.match_conditions, '{}'::jsonb)
+        FROM matches m
+        JOIN tournaments t ON t.id = m.tournament_id
+        LEFT JOIN users p1 ON p1.id = m.player1_id
+        LEFT JOIN users p2 ON p2.id = m.player2_id
+        WHERE (%(ids)s::uuid[] IS NULL AND t.status NOT IN ('completed', 'cancelled')
+               OR m.tournament_id = ANY(%(ids)s::uuid[]))
+        ORDER BY m.tournament_id, m.display_order, m.round_number, m.match_number
+    """, {'ids': list(tournament_ids) if tournament_ids else None})
+    return cur.fetchall()
+
+
+def match_depths(display_order, winner_to, round_number):
+    """Hops from each match to the final of one bracket"""
+    n = len(display_order)
+    index = {d: i for i, d in enumerate(display_order) if d is not None}
+    next_match = np.array([index.get(w, -1) if w is not None else -1 for w in winner_to], dtype=np.int64)
+    if not (next_match >= 0).any():
+        return round_number.max() - round_number
+
+    depth = np.zeros(n, dtype=np.int64)
+    for _ in range(n):
+        # depth[-1] for matches without a next one is discarded by np.where
+        updated = np.where(next_match >= 0, depth[next_match] + 1, 0)
+        if np.array_equal(updated, depth):
+            break
+        depth = updated
+    return depth
+
+
+def match_stages(rows):
+    """Stage index (into STAGES) of every row, per tournament"""
+    tournament = np.array([r[1] for r in rows])
+    round_number = np.array([r[4] for r in rows], dtype=np.int64)
+    depth = np.empty(len(rows), dtype=np.int64)
+    starts = np.flatnonzero(np.r_[True, tournament[1:] != tournament[:-1]])
+    for start, end in zip(starts, np.r_[starts[1:], len(rows)]):
+        depth[start:end] = match_depths([r[2] for r in rows[start:end]],
+                                        [r[3] for r in rows[start:end]],
+                                        round_number[start:end])
+    depth[np.array([r[6] for r in rows])] = 1
+    depth[np.array([r[5] for r in rows])] = 0
+    return np.clip(len(STAGES) - 1 - depth, 0, len(STAGES) - 1)
+
+
+def compute(rows, codes, matrix, max_steps):
+    """(stage, race, handicap_1, handicap_2, out_of_range) for all rows in one lookup"""
+    unknown = len(codes)
+    rank_index = {c: i for i, c in enumerate(codes)}
+    r1 = np.array([rank_index.get(r[10], unknown) for r in rows], dtype=np.int64)
+    r2 = np.array([rank_index.get(r[11], unknown) for r in rows], dtype=np.int64)
+    # An empty slot has no handicap even if the other player is known
+    empty = (r1 == unknown) | (r2 == unknown)
+    r1[empty] = unknown
+    r2[empty] = unknown
+
+    stage = match_stages(rows)
+    values = matrix[r1, r2, stage]
+    out_of_range = ~empty & (np.abs(r1 - r2) >= max_steps)
+    return stage, values[:, RACE].astype(np.int64), values[:, HANDICAP_1], values[:, HANDICAP_2], out_of_range
+
+
+def changed_rows(rows, stage, race, handicap_1, handicap_2):
+    """Pending rows whose stored values differ from the computed ones"""
+    changed = []
+    for i, row in enumerate(rows):
+        if row[7] != 'pending':
+            continue
+        conditions = row[12] if isinstance(row[12], dict) else {}
+        wanted = {'race_to': int(race[i]), 'handicap_player1': float(handicap_1[i]),
+                  'handicap_player2': float(handicap_2[i]), 'stage': STAGES[stage[i]]}
+        if any(conditions.get(k) != v for k, v in wanted.items()):
+            changed.append(i)
+    return changed
+
+
+def persist(cur, rows, changed, stage, race, handicap_1, handicap_2):
+    """One UPDATE; a match that started or got other players since it was read is skipped"""
+    if not changed:
+        return 0
+    cur.execute("""
+        UPDATE matches m
+        SET match_conditions = COALESCE(m.match_conditions, '{}'::jsonb) || jsonb_build_object(
+                'race_to', c.race_to,
+                'handicap_player1', c.handicap_1,
+                'handicap_player2', c.handicap_2,
+                'stage', c.stage),
+            updated_at = NOW()
+        FROM unnest(%s::uuid[], %s::uuid[], %s::uuid[], %s::int[], %s::float8[], %s::float8[], %s::text[])
+             AS c(id, player1_id, player2_id, race_to, handicap_1, handicap_2, stage)
+        WHERE m.id = c.id
+          AND m.status = 'pending'
+          AND m.player1_id IS NOT DISTINCT FROM c.player1_id
+          AND m.player2_id IS NOT DISTINCT FROM c.player2_id
+    """, (
+        [rows[i][0] for i in changed],
+        [rows[i][8] for i in changed],
+        [rows[i][9] for i in changed],
+        [int(race[i]) for i in changed],
+        [float(handicap_1[i]) for i in changed],
+        [float(handicap_2[i]) for i in changed],
+        [STAGES[stage[i]] for i in changed],
+    ))
+    return cur.rowcount
+
+
+def stamp_tournaments(cur, tournament_ids):
+    """Writes the values of the given tournaments with the default tournament
+    rules; returns the number of matches updated. Does not commit."""
+    codes = load_ranks(cur)
+    steps, race = tournament_rules(DEFAULTS['per-rank'], DEFAULTS['max-diff'], parse_race(DEFAULTS['race']))
+    rows = load_matches(cur, tournament_ids)
+    if not rows:
+        return 0
+    stage, race_to, handicap_1, handicap_2, _ = compute(rows, codes, build_matrix(codes, steps, race), len(steps))
+    return persist(cur, rows, changed_rows(rows, stage, race_to, handicap_1, handicap_2),
+                   stage, race_to, handicap_1, handicap_2)
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def main():
+    dry_run = '--dry-run' in sys.argv
+    tournament_ids = [a for a in sys.argv[1:] if not a.startswith('--')]
+    explicit_race = any(a.startswith('--race=') for a in sys.argv[1:])
+
+    conn = psycopg2.connect(option('db') or os.getenv('SUPABASE_DB_TRANSACTION_URL'))
+    cur = conn.cursor()
+
+    codes = load_ranks(cur)
+    if option('bet'):
+        steps, race = bet_rules(cur, option('bet'), parse_race(option('race')) if explicit_race else None)
+        source = f"bet {option('bet')}"
+    else:
+        steps, race = tournament_rules(option('per-rank'), option('max-diff'), parse_race(option('race')))
+        source = f"tournament, {option('per-rank'):g} per rank"
+    matrix = build_matrix(codes, steps, race)
+    print(f"⚖️ Rules ({source}): handicap by sub-rank difference "
+          f"{', '.join(f'{d}→{h:g}' for d, h in enumerate(steps))}; "
+          f"race {', '.join(f'{s} {r}' for s, r in zip(STAGES, race))}")
+    if '--show-matrix' in sys.argv:
+        print_matrix(codes, matrix)
+
+    rows = load_matches(cur, tournament_ids)
+    if not rows:
+        print('📭 No bracket matches found')
+        return
+    stage, race_to, handicap_1, handicap_2, out_of_range = compute(rows, codes, matrix, len(steps))
+    changed = changed_rows(rows, stage, race_to, handicap_1, handicap_2)
+
+    print(f"\n{'tournament':36} {'matches':>7} " + ' '.join(f'{s:>12}' for s in STAGES)
+          + f" {'handicap':>8} {'changed':>7}")
+    per_tournament = Counter(r[1] for r in rows)
+    changed_count = Counter(rows[i][1] for i in changed)
+    tournament = np.array([r[1] for r in rows])
+    for tid, count in per_tournament.items():
+        mine = tournament == tid
+        stages = np.bincount(stage[mine], minlength=len(STAGES))
+        handicapped = int(((handicap_1 > 0) | (handicap_2 > 0))[mine].sum())
+        print(f'{tid:36} {count:>7} ' + ' '.join(f'{n:>12}' for n in stages)
+              + f' {handicapped:>8} {changed_count[tid]:>7}')
+
+    seeded = sum(1 for r in rows if r[8] and r[9])
+    unranked = sum(1 for r in rows if r[8] and r[9] and (r[10] not in codes or r[11] not in codes))
+    print(f'\n   Matches:             {len(rows):,} ({seeded:,} with both players)')
+    print(f'   Not pending:         {sum(1 for r in rows if r[7] != "pending"):,} (left untouched)')
+    if unranked:
+        print(f'   ⚠️  Unranked player:  {unranked:,} (no handicap)')
+    if out_of_range.any():
+        print(f'   ⚠️  Beyond {len(steps) - 1} sub-ranks: {int(out_of_range.sum()):,} '
+              f'(capped at {steps[-1]:g})')
+    print(f'   To write:            {len(changed):,}')
+
+    if not changed:
+        print('\n✅ Every pending match already has its race-to and handicap')
+        return
+    if dry_run:
+        print('\n💡 Dry run - no changes written')
+        return
+
+    written = persist(cur, rows, changed, stage, race_to, handicap_1, handicap_2)
+    conn.commit()
+    cur.close()
+    conn.close()
+    print(f'\n✅ Updated {written:,} matches'
+          + (f' ({len(changed) - written:,} changed meanwhile, skipped)' if written < len(changed) else ''))
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except Exception as e:
+        print(f'\n❌ ERROR: {e}')
+        import traceback
+        traceback.print_exc()
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+💰 Prize Distribution Engine - rebuild prize tables for many tournaments
+Computes prize_pool and the prize_distribution JSON of every selected
+tournament in one pass instead of hand-writing them per title:
+
+- Pool: same rules as TournamentService.createTournament
+    entry_fees → entry_fee × participants × (1 - organizer_fee_percent)
+    sponsor    → sponsor_contribution
+    hybrid     → entry fees after organizer fee + sponsor_contribution
+  A tournament whose computed pool is 0 keeps its existing prize_pool
+  (fixed pools entered by hand).
+- Split: templates mirror PrizeDistribution.allDistributions in
+  lib/core/constants/tournament_constants.dart (bucketed by participant
+  count); 'custom' uses the percentages in custom_distribution.
+- Amounts are computed with numpy over all tournaments at once, validated,
+  and only changed rows are written with one UPDATE ... FROM unnest(...).
+
+Usage:
+    python scripts/tournament_utils/prize_distribution_engine.py [--dry-run]
+    python scripts/tournament_utils/prize_distribution_engine.py --participants=max
+    python scripts/tournament_utils/prize_distribution_engine.py --include-completed <tournament_id> ...
+"""
+
+import json
+import os
+import sys
+from collections import namedtuple
+
+import numpy as np
+import psycopg2
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Keep in sync with PrizeDistribution.allDistributions (fractions of the pool)
+TEMPLATES = {
+    'standard': {
+        4: [0.60, 0.40],
+        8: [0.50, 0.30, 0.20],
+        16: [0.40, 0.25, 0.15, 0.10, 0.05, 0.05],
+        32: [0.35, 0.20, 0.15, 0.10, 0.08, 0.06, 0.03, 0.03],
+        64: [0.30, 0.18, 0.12, 0.08, 0.06, 0.05, 0.04, 0.04, 0.03, 0.03, 0.02, 0.02, 0.02, 0.01],
+    },
+    'winner_takes_all': {4: [1.00], 8: [1.00], 16: [1.00], 32: [1.00], 64: [1.00]},
+    'top_heavy': {
+        4: [0.80, 0.20],
+        8: [0.70, 0.20, 0.10],
+        16: [0.60, 0.20, 0.10, 0.05, 0.05],
+        32: [0.50, 0.20, 0.15, 0.08, 0.04, 0.03],
+        64: [0.45, 0.20, 0.12, 0.08, 0.05, 0.04, 0.03, 0.03],
+    },
+    'flat': {
+        4: [0.55, 0.45],
+        8: [0.35, 0.25, 0.20, 0.20],
+        16: [0.25, 0.20, 0.15, 0.15, 0.10, 0.08, 0.04, 0.03],
+        32: [0.20, 0.15, 0.12, 0.10, 0.08, 0.07, 0.06, 0.05, 0.04, 0.04, 0.03, 0.03, 0.02, 0.01],
+    },
+    'top_3': {n: [0.60, 0.25, 0.15] for n in (4, 8, 16, 32, 64)},
+    'top_4': {n: [0.40, 0.30, 0.15, 0.15] for n in (4, 8, 16, 32, 64)},
+    'top_8': {n: [0.35, 0.25, 0.15, 0.10, 0.05, 0.05, 0.025, 0.025] for n in (8, 16, 32, 64)},
+    'dong_hang_3': {n: [0.50, 0.30, 0.10, 0.10] for n in (4, 8, 16, 32, 64)},
+}
+
+MAX_PLACES = 16
+PRIZE_SOURCES = ('entry_fees', 'sponsor', 'hybrid')
+DISTRIBUTION_KEYS = ('source', 'template', 'organizerFeePercent', 'sponsorContribution',
+                     'totalPrizePool', 'distribution')
+ENTRY_KEYS = ('position', 'cashAmount', 'voucherAmount', 'percentage')
+
+PrizeRow = namedtuple('PrizeRow', 'id title source template fee_pct sponsor entry_fee '
+                                   'prize_pool registered capacity custom prize_distribution')
+
+
+def template_fractions(template, participants):
+    """Fractions for a template, using the smallest bucket that fits (last bucket otherwise)"""
+    buckets = TEMPLATES.get(template) or TEMPLATES['standard']
+    keys = sorted(buckets)
+    for key in keys:
+        if participants <= key:
+            return buckets[key]
+    return buckets[keys[-1]]
+
+
+def load_tournaments(cur, tournament_ids=None, include_completed=False):
+    """PrizeRow per tournament. Settings already in prize_distribution win over
+    the columns, because that JSON is what the app reads at payout time."""
+    cur.execute("""
+        WITH counts AS (
+            SELECT tournament_id, COUNT(*) AS participants
+            FROM tournament_participants
+            GROUP BY tournament_id
+        )
+        SELECT t.id, t.title, t.prize_source, t.distribution_template,
+               t.organizer_fee_percent, t.sponsor_contribution,
+               COALESCE(t.entry_fee, 0), COALESCE(t.prize_pool, 0),
+               COALESCE(c.participants, 0), COALESCE(t.max_participants, 0),
+               t.custom_distribution, t.prize_distribution
+        FROM tournaments t
+        LEFT JOIN counts c ON c.tournament_id = t.id
+        WHERE (%(ids)s::uuid[] IS NULL OR t.id = ANY(%(ids)s::uuid[]))
+          AND (%(all)s OR t.status NOT IN ('completed', 'cancelled'))
+        ORDER BY t.start_date
+    """, {'ids': list(tournament_ids) if tournament_ids else None, 'all': include_completed})
+
+    rows = []
+    for (tid, title, source, template, fee_pct, sponsor, entry_fee, pool,
+         registered, capacity, custom, current) in cur.fetchall():
+        saved = current if isinstance(current, dict) else {}
+        rows.append(PrizeRow(
+            tid, title,
+            saved.get('source') or source or 'entry_fees',
+            saved.get('template') or template or 'standard',
+            float(saved.get('organizerFeePercent', fee_pct if fee_pct is not None else 0)),
+            float(saved.get('sponsorContribution', sponsor or 0)),
+            float(entry_fee), float(pool), registered, capacity,
+            custom, current,
+        ))
+    return rows
+
+
+def custom_entries(row):
+    """Custom split as [(position, fraction, voucher)] from whichever column has it"""
+    entries = row.custom
+    if not entries and isinstance(row.prize_distribution, dict):
+        entries = row.prize_distribution.get('distribution')
+    result = []
+    for e in entries or []:
+        result.append((int(e.get('position', len(result) + 1)),
+                       float(e.get('percentage', 0)) / 100,
+                       int(e.get('voucherAmount', 0))))
+    return result
+
+
+def compute_distributions(rows, use_max_participants=False):
+    """Vectorized pools and cash amounts for all rows.
+
+    Returns (pools, cash, fractions, positions, vouchers); the last four are
+    (n, MAX_PLACES) matrices, zero padded.
+    """
+    n = len(rows)
+    source = np.array([r.source for r in rows])
+    fee_pct = np.array([r.fee_pct for r in rows])
+    sponsor = np.array([r.sponsor for r in rows])
+    entry_fee = np.array([r.entry_fee for r in rows])
+    existing_pool = np.array([r.prize_pool for r in rows])
+    participants = np.array([r.capacity if use_max_participants else r.registered for r in rows])
+
+    net_fees = entry_fee * participants * (1.0 - fee_pct / 100.0)
+    pools = np.select(
+        [source == 'sponsor', source == 'hybrid'],
+        [sponsor, net_fees + sponsor],
+        default=net_fees,
+    )
+    pools = np.where(pools > 0, pools, existing_pool)
+    pools = np.floor(pools + 0.5)
+
+    fractions = np.zeros((n, MAX_PLACES))
+    positions = np.tile(np.arange(1, MAX_PLACES + 1), (n, 1))
+    vouchers = np.zeros((n, MAX_PLACES), dtype=np.int64)
+    for i, r in enumerate(rows):
+        if r.template == 'custom':
+            for j, (position, fraction, voucher) in enumerate(custom_entries(r)[:MAX_PLACES]):
+                positions[i, j], fractions[i, j], vouchers[i, j] = position, fraction, voucher
+        else:
+            split = template_fractions(r.template, max(int(participants[i]), 1))
+            fractions[i, :len(split)] = split
+
+    # Dart rounds half away from zero, amounts are non-negative
+    cash = np.floor(pools[:, None] * fractions + 0.5).astype(np.int64)
+    return pools, cash, fractions, positions, vouchers
+
+
+def build_distribution_json(row, pool, cash, fractions, positions, vouchers):
+    paid = np.flatnonzero((fractions > 0) | (vouchers > 0))
+    places = int(paid[-1]) + 1 if paid.size else 0
+    return {
+        'source': row.source,
+        'template': row.template,
+        'organizerFeePercent': row.fee_pct,
+        'sponsorContribution': row.sponsor,
+        'totalPrizePool': float(pool),
+        'distribution': [
+            {
+                'position': int(positions[j]),
+                'cashAmount': int(cash[j]),
+                'voucherAmount': int(vouchers[j]),
+                'percentage': round(float(fractions[j]) * 100, 2),
+            }
+            for j in range(places)
+        ],
+    }
+
+
+def validate_distribution(data):
+    """Shape and sanity checks, returns a list of problems (empty when valid)"""
+    problems = []
+    missing = [k for k in DISTRIBUTION_KEYS if k not in data]
+    if missing:
+        problems.append(f'missing keys: {", ".join(missing)}')
+        return problems
+    if data['source'] not in PRIZE_SOURCES:
+        problems.append(f'unknown source {data["source"]!r}')
+    if data['totalPrizePool'] < 0:
+        problems.append('negative prize pool')
+
+    entries = data['distribution']
+    if not isinstance(entries, list):
+        return problems + ['distribution is not a list']
+    for e in entries:
+        if set(e) != set(ENTRY_KEYS):
+            problems.append(f'bad entry keys {sorted(e)}')
+            break
+        if e['position'] < 1 or e['cashAmount'] < 0 or e['voucherAmount'] < 0:
+            problems.append(f'invalid entry {e}')
+    positions = [e.get('position', 0) for e in entries]
+    if positions != sorted(positions):
+        problems.append('positions are not ordered')
+
+    total_pct = sum(e.get('percentage', 0) for e in entries)
+    if total_pct > 100.01:
+        problems.append(f'percentages add up to {total_pct:.2f}%')
+    # Each amount is rounded on its own, allow 1 VND per place
+    total_cash = sum(e.get('cashAmount', 0) for e in entries)
+    if total_cash > data['totalPrizePool'] + len(entries):
+        problems.append(f'cash {total_cash:,} exceeds pool {data["totalPrizePool"]:,.0f}')
+    return problems
+
+
+def write_changes(cur, changes):
+    """One batched UPDATE for all changed tournaments"""
+    cur.execute("""
+        UPDATE tournaments t
+        SET prize_pool = c.prize_pool,
+            prize_distribution = c.prize_distribution::jsonb,
+            updated_at = NOW()
+        FROM unnest(%s::uuid[], %s::numeric[], %s::text[]) AS c(id, prize_pool, prize_distribution)
+        WHERE t.id = c.id
+    """, (
+        [c[0] for c in changes],
+        [c[1] for c in changes],
+        [json.dumps(c[2], ensure_ascii=False) for c in changes],
+    ))
+    return cur.rowcount
+
+
+def main():
+    dry_run = '--dry-run' in sys.argv
+    include_completed = '--include-completed' in sys.argv
+    use_max = '--participants=max' in sys.argv
+    tournament_ids = [a for a in sys.argv[1:] if not a.startswith('--')]
+
+    conn = psycopg2.connect(os.getenv('SUPABASE_DB_TRANSACTION_URL'))
+    cur = conn.cursor()
+
+    rows = load_tournaments(cur, tournament_ids, include_completed)
+    print(f'💰 Rebuilding prize tables for {len(rows)} tournaments\n')
+    if not rows:
+        conn.close()
+        return
+
+    pools, cash, fractions, positions, vouchers = compute_distributions(rows, use_max)
+
+    changes, invalid = [], []
+    for i, row in enumerate(rows):
+        data = build_distribution_json(row, pools[i], cash[i], fractions[i], positions[i], vouchers[i])
+        problems = validate_distribution(data)
+        if problems:
+            invalid.append((row.title, problems))
+            continue
+        if data != row.prize_distribution or float(pools[i]) != row.prize_pool:
+            changes.append((row.id, float(pools[i]), data))
+            print(f'   🔄 {row.title:<40} {row.template:<16} {row.prize_pool:>12,.0f} → {pools[i]:>12,.0f}')
+
+    if invalid:
+        print('\n⚠️ Skipped (invalid distribution):')
+        for title, problems in invalid:
+            print(f'   {title}: {"; ".join(problems)}')
+
+    if changes and not dry_run:
+        written = write_changes(cur, changes)
+        conn.commit()
+    else:
+        written = 0
+        conn.rollback()
+
+    cur.close()
+    conn.close()
+
+    print('\n' + '='*60)
+    print(f'✅ {len(changes)} changed, {len(rows) - len(changes) - len(invalid)} unchanged, {len(invalid)} invalid')
+    print(f'   Written: {written}' if not dry_run else '🔍 Dry run - nothing written')
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except Exception as e:
+        print(f'\n❌ ERROR: {e}')
+        import traceback
+        traceback.print_exc()
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+🎱 SABO Bracket Layouts - empty match skeletons for SABO DE16/24/32/64
+Python mirror of lib/services/bracket/formats/sabo_de*_format.dart: same
+display_order numbering, round_number, bracket_type/bracket_group and
+winner/loser advancement links (display_order values), with no players.
+
+Used to pre-generate brackets for tournaments created ahead of time. Keep in
+sync with the Dart advancement maps when a format changes.
+
+Usage:
+    python scripts/tournament_utils/sabo_bracket_layouts.py sabo_de32
+"""
+
+import sys
+
+MATCH_COUNTS = {
+    'sabo_de16': 29,
+    'sabo_de24': 51,
+    'sabo_de32': 55,
+    'sabo_de64': 119,
+}
+
+MAX_PARTICIPANTS = {
+    'sabo_de16': 16,
+    'sabo_de24': 24,
+    'sabo_de32': 32,
+    'sabo_de64': 64,
+}
+
+# display_order of the match that decides the champion
+FINAL_DISPLAY_ORDER = {
+    'sabo_de16': 4201,
+    'sabo_de24': 4201,
+    'sabo_de32': 33101,
+    'sabo_de64': 54101,
+}
+
+# Columns every skeleton row carries, in COPY order
+MATCH_COLUMNS = (
+    'match_number', 'round_number', 'round', 'bracket_type', 'bracket_group',
+    'stage_round', 'display_order', 'winner_advances_to', 'loser_advances_to',
+)
+
+
+def _match(bracket_type, stage_round, display_order, winner, loser=None,
+           round_number=None, round_name=None, group=None):
+    return {
+        'round_number': round_number,
+        'round': round_name,
+        'bracket_type': bracket_type,
+        'bracket_group': group,
+        'stage_round': stage_round,
+        'display_order': display_order,
+        'winner_advances_to': winner,
+        'loser_advances_to': loser,
+    }
+
+
+def _double_elim_block(base, exits, lbb_extended, round_number, round_name, group=None):
+    """One 16-player SABO double elimination block.
+
+    base is added to every display_order (0 for DE16/DE24, 10000 * group
+    prefix for DE32/DE64). exits are the display_orders the WB R3 winners,
+    the LB-A champion and the LB-B champion advance to. lbb_extended adds the
+    WB R3 losers match (x3301) and the LB-B final (x3401).
+    """
+    rows = []
+
+    def add(bracket_type, stage, display_order, winner, loser=None):
+        rows.append(_match(
+            bracket_type, stage, base + display_order, winner, loser,
+            round_number=round_number(bracket_type, stage),
+            round_name=round_name(bracket_type, stage),
+            group=group,
+        ))
+
+    for i in range(8):
+        add('WB', 1, 1101 + i, base + 1201 + i // 2, base + 2101 + i // 2)
+    for i in range(4):
+        add('WB', 2, 1201 + i, base + 1301 + i // 2, base + 3101 + i // 2)
+    for i in range(2):
+        add('WB', 3, 1301 + i, exits[i], base + 3301 if lbb_extended else None)
+    for i in range(4):
+        add('LB-A', 1, 2101 + i, base + 2201 + i // 2)
+    for i in range(2):
+        add('LB-A', 2, 2201 + i, base + 2301)
+    add('LB-A', 3, 2301, exits[2])
+    for i in range(2):
+        add('LB-B', 1, 3101 + i, base + 3201)
+    if lbb_extended:
+        add('LB-B', 2, 3201, base + 3401)
+        add('LB-B', 3, 3301, base + 3401)
+        add('LB-B', 4, 3401, exits[3])
+    else:
+        add('LB-B', 2, 3201, exits[3])
+    return rows
+
+
+def _branch_round_number(bracket_type, stage):
+    """Legacy round_number: WB 1-3, LB-A 101-103, LB-B 201-204"""
+    return {'WB': 0, 'LB-A': 100, 'LB-B': 200}[bracket_type] + stage
+
+
+def _standard_round_name(bracket_type, stage):
+    """RoundNameCalculator names for brackets without groups"""
+    if bracket_type == 'WB':
+        return f'WB R{stage}'
+    if bracket_type == 'LB-A':
+        return f'LB R{stage}'
+    return f'LB R{stage + 3}'
+
+
+def _group_round_name(group):
+    def name(bracket_type, stage):
+        return f'Group {group} - {_standard_round_name(bracket_type, stage)}'
+    return name
+
+
+def _de16():
+    rows = _double_elim_block(0, (4101, 4102, 4101, 4102), True,
+                              _branch_round_number, _standard_round_name)
+    rows.append(_match('SABO', 1, 4101, 4201, round_number=250, round_name='Finals'))
+    rows.append(_match('SABO', 1, 4102, 4201, round_number=251, round_name='Finals'))
+    rows.append(_match('SABO', 2, 4201, None, round_number=300, round_name='Finals'))
+    return rows
+
+
+def _de24():
+    # 8 round-robin groups of 3, then the DE16 main stage without LB-B R3/R4
+    rows = []
+    for group in range(8):
+        group_name = chr(65 + group)
+        for k in range(1, 4):
+            rows.append(_match('groups', 1, 1000 + group * 10 + k, None,
+                               round_name=f'Group {group_name}'))
+
+    names = {'WB': 'WB R{}', 'LB-A': 'LB-A R{}', 'LB-B': 'LB-B R{}'}
+    finals = {('LB-A', 3): 'LB-A Final', ('LB-B', 2): 'LB-B Final'}
+    rows += _double_elim_block(
+        0, (4101, 4102, 4101, 4102), False,
+        lambda bracket_type, stage: stage,
+        lambda bracket_type, stage: finals.get((bracket_type, stage), names[bracket_type].format(stage)),
+    )
+    rows.append(_match('SABO', 1, 4101, 4201, round_number=1, round_name='SABO Semi'))
+    rows.append(_match('SABO', 1, 4102, 4201, round_number=1, round_name='SABO Semi'))
+    rows.append(_match('SABO', 2, 4201, None, round_number=2, round_name='SABO Final'))
+    return rows
+
+
+def _de32():
+    # (WB R3 #1, WB R3 #2, LB-A champion, LB-B champion) per group
+    exits = {
+        'A': (31101, 31102, 31102, 31101),
+        'B': (31103, 31104, 31104, 31103),
+    }
+    rows = []
+    for prefix, group in enumerate('AB', 1):
+        rows += _double_elim_block(prefix * 10000, exits[group], False,
+                                   _branch_round_number, _group_round_name(group), group)
+    for i in range(4):
+        rows.append(_match('CROSS', 1, 31101 + i, 32101 + i // 2,
+                           round_number=300, round_name='Tứ Kết Liên Bảng'))
+    for i in range(2):
+        rows.append(_match('FINAL', 2, 32101 + i, 33101,
+                           round_number=301, round_name='Bán Kết'))
+    rows.append(_match('GF', 1, 33101, None, round_number=302, round_name='🏆 Chung Kết'))
+    return rows
+
+
+def _de64():
+    # Same as the Dart advancement map, including C3/C4 both feeding R16-2
+    exits = {
+        'A': (51101, 51102, 51106, 51107),
+        'B': (51103, 51104, 51108, 51101),
+        'C': (51105, 51106, 51102, 51102),
+        'D': (51107, 51108, 51104, 51105),
+    }
+    lbb_rounds = {1: 201, 2: 202, 3: 202, 4: 203}
+
+    def round_number(bracket_type, stage):
+        if bracket_type == 'LB-B':
+            return lbb_rounds[stage]
+        return _branch_round_number(bracket_type, stage)
+
+    rows = []
+    for prefix, group in enumerate('ABCD', 1):
+        rows += _double_elim_block(prefix * 10000, exits[group], True,
+                                   round_number, _group_round_name(group), group)
+    for i in range(8):
+        rows.append(_match('R16', 1, 51101 + i, 52101 + i // 2, round_number=1,
+                           round_name='Round of 16', group='CROSS'))
+    for i in range(4):
+        rows.append(_match('QF', 2, 52101 + i, 53101 + i // 2, round_number=2,
+                           round_name='Quarter-Finals', group='CROSS'))
+    for i in range(2):
+        rows.append(_match('SF', 3, 53101 + i, 54101, round_number=3,
+                           round_name='Semi-Finals', group='CROSS'))
+    rows.append(_match('GF', 4, 54101, None, round_number=4,
+                       round_name='Grand Final', group='CROSS'))
+    return rows
+
+
+_BUILDERS = {
+    'sabo_de16': _de16,
+    'sabo_de24': _de24,
+    'sabo_de32': _de32,
+    'sabo_de64': _de64,
+}
+
+
+def build_layout(bracket_format):
+    """Empty skeleton rows for a SABO format, match_number in generation order"""
+    if bracket_format not in _BUILDERS:
+        raise ValueError(f'Unsupported bracket format: {bracket_format} '
+                         f'(expected one of {", ".join(_BUILDERS)})')
+    rows = _BUILDERS[bracket_format]()
+    for number, row in enumerate(rows, 1):
+        row['match_number'] = number
+    return rows
+
+
+def validate_layout(bracket_format, rows):
+    """Check match count, unique display_orders and that every link resolves"""
+    orders = [r['display_order'] for r in rows]
+    errors = []
+    if len(rows) != MATCH_COUNTS[bracket_format]:
+        errors.append(f'expected {MATCH_COUNTS[bracket_format]} matches, got {len(rows)}')
+    if len(set(orders)) != len(orders):
+        errors.append('duplicate display_order')
+    known = set(orders)
+    for r in rows:
+        for key in ('winner_advances_to', 'loser_advances_to'):
+            if r[key] is not None and r[key] not in known:
+                errors.append(f'{r["display_order"]}.{key} → {r[key]} does not exist')
+    final = [r for r in rows if r['display_order'] == FINAL_DISPLAY_ORDER[bracket_format]]
+    if not final or final[0]['winner_advances_to'] is not None:
+        errors.append('final match missing or not terminal')
+    return errors
+
+
+def main():
+    formats = sys.argv[1:] or list(_BUILDERS)
+    for bracket_format in formats:
+        rows = build_layout(bracket_format)
+        errors = validate_layout(bracket_format, rows)
+        status = '✅' if not errors else '❌'
+        print(f'{status} {bracket_format}: {len(rows)} matches')
+        for error in errors:
+            print(f'   ⚠️ {error}')
+        if len(sys.argv) > 1:
+            for r in rows:
+                print(f"   M{r['match_number']:<3} {r['display_order']:>5} {r['bracket_type']:<6} "
+                      f"{r['bracket_group'] or '':<5} R{r['round_number'] or '-':<4} "
+                      f"{r['round'] or '':<24} W→{r['winner_advances_to'] or '-':<6} "
+                      f"L→{r['loser_advances_to'] or '-'}")
+
+
+if __name__ == '__main__':
+    main()
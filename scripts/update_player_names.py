@@ -1,12 +1,17 @@
 #!/usr/bin/env python3
 """
 🔄 Update player names in tournament
-Directly update user names based on seed position
+Puts the named players into their seed positions via roster_sync
+
+Usage:
+    python scripts/update_player_names.py [--dry-run]
 """
 
 import os
+import sys
 import psycopg2
 from dotenv import load_dotenv
+from roster_sync import sync_roster
 
 load_dotenv()
 
@@ -33,71 +38,19 @@ NEW_PLAYERS = [
 ]
 
 def update_player_names():
+    dry_run = '--dry-run' in sys.argv
     conn = psycopg2.connect(os.getenv('SUPABASE_DB_TRANSACTION_URL'))
-    cur = conn.cursor()
     
     print(f'🔄 Updating player names for Tournament: {TOURNAMENT_ID}\n')
     
-    # First, clear matches to reset bracket
-    print('🗑️ Clearing existing matches...')
-    cur.execute("DELETE FROM matches WHERE tournament_id = %s", (TOURNAMENT_ID,))
-    print(f'   Deleted {cur.rowcount} matches')
-    
-    # Get current participants ordered by seed
-    cur.execute("""
-        SELECT tp.seed_number, tp.user_id, u.full_name, u.display_name
-        FROM tournament_participants tp
-        JOIN users u ON u.id = tp.user_id
-        WHERE tp.tournament_id = %s
-        ORDER BY tp.seed_number
-    """, (TOURNAMENT_ID,))
-    
-    participants = cur.fetchall()
-    
-    print(f'\n👥 Updating {len(participants)} player names...\n')
-    print(f"{'Seed':<6} {'Old Name':<25} → {'New Name':<25} {'Rank'}")
-    print("-"*75)
-    
-    for seed, user_id, old_full_name, old_display_name in participants:
-        old_name = old_display_name or old_full_name or "N/A"
-        
-        if seed <= len(NEW_PLAYERS):
-            new_name, new_rank = NEW_PLAYERS[seed - 1]
-            
-            # Generate new avatar
-            avatar_seed = new_name.replace(' ', '_').lower()
-            avatar_url = f"https://api.dicebear.com/7.x/avataaars/svg?seed={avatar_seed}"
-            
-            # Update user
-            cur.execute("""
-                UPDATE users 
-                SET full_name = %s, 
-                    display_name = %s, 
-                    rank = %s,
-                    avatar_url = %s,
-                    updated_at = NOW()
-                WHERE id = %s
-            """, (new_name, new_name, new_rank, avatar_url, user_id))
-            
-            status = "✅" if old_name == new_name else "🔄"
-            print(f"{seed:<6} {old_name:<25} → {new_name:<25} {new_rank} {status}")
-    
-    # Reset tournament status
-    cur.execute("""
-        UPDATE tournaments SET status = 'upcoming', updated_at = NOW() WHERE id = %s
-    """, (TOURNAMENT_ID,))
-    
-    conn.commit()
+    # Seats are matched to existing accounts by name instead of renaming
+    # whoever currently holds the seed, matches keep their state
+    sync_roster(conn, TOURNAMENT_ID, NEW_PLAYERS, dry_run=dry_run)
     
     print("\n" + "="*75)
-    print("✅ PLAYER NAMES UPDATED SUCCESSFULLY!")
+    print("✅ PLAYER NAMES UPDATED SUCCESSFULLY!" if not dry_run else "🔍 DRY RUN - NOTHING WRITTEN")
     print("="*75)
-    print("\n📝 Next steps:")
-    print("   1. Open SABO Arena app")
-    print("   2. Go to tournament details")
-    print("   3. Start tournament to generate new bracket")
     
-    cur.close()
     conn.close()
 
 if __name__ == '__main__':
@@ -1,14 +1,18 @@
 #!/usr/bin/env python3
 """
 🔄 Update POOL 9 BALL RANK I-K Tournament
-- Clear all matches
-- Update player list with new 16 players
+- Sync the participant list to the 16 players below
+- Existing bracket matches are kept, only seeds that changed hands are remapped
+
+Usage:
+    python scripts/update_tournament_players.py [--dry-run]
 """
 
 import os
+import sys
 import psycopg2
 from dotenv import load_dotenv
-import uuid
+from roster_sync import sync_roster
 
 load_dotenv()
 
@@ -35,87 +39,16 @@ PLAYERS = [
 ]
 
 def update_tournament():
+    dry_run = '--dry-run' in sys.argv
     conn = psycopg2.connect(os.getenv('SUPABASE_DB_TRANSACTION_URL'))
-    cur = conn.cursor()
     
     print(f'🔄 Updating Tournament: {TOURNAMENT_ID}\n')
     
-    # 1. Clear all matches for this tournament
-    print('🗑️ Clearing existing matches...')
-    
-    # Try bracket_matches first (if exists)
-    try:
-        cur.execute("""
-            DELETE FROM bracket_matches WHERE tournament_id = %s
-        """, (TOURNAMENT_ID,))
-        deleted_bracket = cur.rowcount
-        print(f'   Deleted {deleted_bracket} bracket_matches')
-    except:
-        conn.rollback()
-        print('   bracket_matches table does not exist, skipping...')
-    
-    cur.execute("""
-        DELETE FROM matches WHERE tournament_id = %s
-    """, (TOURNAMENT_ID,))
-    deleted_matches = cur.rowcount
-    print(f'   Deleted {deleted_matches} matches')
-    
-    # 2. Clear existing participants
-    print('\n🗑️ Clearing existing participants...')
-    cur.execute("""
-        DELETE FROM tournament_participants WHERE tournament_id = %s
-    """, (TOURNAMENT_ID,))
-    deleted_participants = cur.rowcount
-    print(f'   Deleted {deleted_participants} participants')
-    
-    # 3. Create/update profiles and add as participants
-    print('\n👥 Adding new players...')
-    
-    for i, (name, rank) in enumerate(PLAYERS, 1):
-        # Generate avatar URL using DiceBear
-        avatar_seed = name.replace(' ', '_').lower()
-        avatar_url = f"https://api.dicebear.com/7.x/avataaars/svg?seed={avatar_seed}"
-        
-        # Check if user exists by full_name or display_name
-        cur.execute("""
-            SELECT id FROM users WHERE full_name = %s OR display_name = %s LIMIT 1
-        """, (name, name))
-        user = cur.fetchone()
-        
-        if user:
-            user_id = user[0]
-            # Update avatar and rank if needed
-            cur.execute("""
-                UPDATE users SET avatar_url = %s, rank = %s, updated_at = NOW() WHERE id = %s
-            """, (avatar_url, rank, user_id))
-            print(f'   {i:2d}. {name} (Hạng {rank}) - Updated existing user')
-        else:
-            # Create new user - need email for contact_check constraint
-            user_id = str(uuid.uuid4())
-            username = name.lower().replace(' ', '_').replace('+', 'plus')
-            email = f"{username}@sabo-arena.local"
-            cur.execute("""
-                INSERT INTO users (id, email, full_name, display_name, username, avatar_url, rank, role, skill_level, is_verified, is_active, created_at, updated_at)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, 'player', 'intermediate', false, true, NOW(), NOW())
-            """, (user_id, email, name, name, username, avatar_url, rank))
-            print(f'   {i:2d}. {name} (Hạng {rank}) - Created new user')
-        
-        # Add to tournament_participants
-        cur.execute("""
-            INSERT INTO tournament_participants (tournament_id, user_id, seed_number, status, created_at)
-            VALUES (%s, %s, %s, 'registered', NOW())
-            ON CONFLICT (tournament_id, user_id) DO UPDATE SET seed_number = %s
-        """, (TOURNAMENT_ID, user_id, i, i))
-    
-    # 4. Update tournament status to 'upcoming' (ready for bracket generation)
-    cur.execute("""
-        UPDATE tournaments SET status = 'upcoming', updated_at = NOW() WHERE id = %s
-    """, (TOURNAMENT_ID,))
-    
-    conn.commit()
+    # Only the participants, seeds and ranks that differ are touched
+    sync_roster(conn, TOURNAMENT_ID, PLAYERS, dry_run=dry_run)
     
     print('\n' + '='*60)
-    print('✅ TOURNAMENT UPDATED SUCCESSFULLY!')
+    print('✅ TOURNAMENT UPDATED SUCCESSFULLY!' if not dry_run else '🔍 DRY RUN - NOTHING WRITTEN')
     print('='*60)
     print(f'\n📋 Tournament ID: {TOURNAMENT_ID}')
     print(f'👥 Players: {len(PLAYERS)}')
@@ -123,12 +56,6 @@ def update_tournament():
     for i, (name, rank) in enumerate(PLAYERS, 1):
         print(f'   {i:2d}. {name} - Hạng {rank}')
     
-    print('\n🎯 Next steps:')
-    print('   1. Open SABO Arena app')
-    print('   2. Go to tournament details')
-    print('   3. Start tournament to generate bracket')
-    
-    cur.close()
     conn.close()
 
 if __name__ == '__main__':
@@ -0,0 +1,95 @@
+-- supabase/migrations/20251210000000_add_player_name_search_index.sql
+
+-- Accent-insensitive player name lookup.
+-- Import scripts used to match players with `display_name ILIKE %s` or an exact
+-- `full_name = %s`, which cannot use an index and misses near matches such as
+-- "Xin Con 1" vs "Xìn Con 1". This adds an unaccent + pg_trgm expression index
+-- and a batch resolver that matches hundreds of names in one round trip.
+-- The Python side mirrors normalize_player_name() in scripts/player_name_index.py.
+
+CREATE SCHEMA IF NOT EXISTS extensions;
+CREATE EXTENSION IF NOT EXISTS unaccent WITH SCHEMA extensions;
+CREATE EXTENSION IF NOT EXISTS pg_trgm WITH SCHEMA extensions;
+
+-- unaccent() is only STABLE because it resolves its dictionary through the
+-- search_path. Pinning the dictionary makes the wrapper safe to index.
+-- unaccent already folds Đ/đ to D/d, which NFD on the client does not.
+CREATE OR REPLACE FUNCTION public.normalize_player_name(name TEXT)
+RETURNS TEXT
+LANGUAGE sql
+IMMUTABLE STRICT PARALLEL SAFE
+AS $$
+  SELECT btrim(regexp_replace(
+    lower(extensions.unaccent('extensions.unaccent'::regdictionary, name)),
+    '[^a-z0-9]+', ' ', 'g'
+  ))
+$$;
+
+CREATE INDEX IF NOT EXISTS idx_users_display_name_norm_trgm
+ON public.users USING gin (public.normalize_player_name(display_name) extensions.gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_users_full_name_norm_trgm
+ON public.users USING gin (public.normalize_player_name(full_name) extensions.gin_trgm_ops);
+
+-- Resolve a batch of names in one query.
+-- Returns up to p_limit candidates per input name (1-based ordinal), best first.
+-- A username equal to the generated username also counts as an exact match.
+-- The `%` operator is index-backed; the outer filter applies p_min_similarity.
+DROP FUNCTION IF EXISTS public.resolve_player_names(TEXT[], REAL, INTEGER);
+
+CREATE OR REPLACE FUNCTION public.resolve_player_names(
+  p_names TEXT[],
+  p_min_similarity REAL DEFAULT 0.45,
+  p_limit INTEGER DEFAULT 3
+)
+RETURNS TABLE (
+  ordinal INTEGER,
+  input_name TEXT,
+  user_id UUID,
+  matched_name TEXT,
+  username TEXT,
+  rank TEXT,
+  score REAL
+)
+LANGUAGE sql
+STABLE
+SET search_path = public, extensions
+AS $$
+  SELECT
+    q.ordinal::INTEGER,
+    q.input_name,
+    c.id,
+    c.matched_name,
+    c.username,
+    c.rank,
+    c.score
+  FROM unnest(p_names) WITH ORDINALITY AS q(input_name, ordinal)
+  CROSS JOIN LATERAL (
+    SELECT
+      u.id,
+      COALESCE(u.display_name, u.full_name) AS matched_name,
+      u.username,
+      u.rank,
+      CASE
+        WHEN u.username = replace(public.normalize_player_name(q.input_name), ' ', '_')
+          OR public.normalize_player_name(u.display_name) = public.normalize_player_name(q.input_name)
+          OR public.normalize_player_name(u.full_name) = public.normalize_player_name(q.input_name)
+          THEN 1.0::REAL
+        ELSE GREATEST(
+          COALESCE(similarity(public.normalize_player_name(u.display_name), public.normalize_player_name(q.input_name)), 0),
+          COALESCE(similarity(public.normalize_player_name(u.full_name), public.normalize_player_name(q.input_name)), 0)
+        )
+      END AS score
+    FROM public.users u
+    WHERE u.username = replace(public.normalize_player_name(q.input_name), ' ', '_')
+       OR public.normalize_player_name(u.display_name) % public.normalize_player_name(q.input_name)
+       OR public.normalize_player_name(u.full_name) % public.normalize_player_name(q.input_name)
+    ORDER BY score DESC, u.created_at
+    LIMIT p_limit
+  ) c
+  WHERE c.score >= p_min_similarity
+  ORDER BY q.ordinal, c.score DESC
+$$;
+
+GRANT EXECUTE ON FUNCTION public.normalize_player_name(TEXT) TO authenticated, service_role;
+GRANT EXECUTE ON FUNCTION public.resolve_player_names(TEXT[], REAL, INTEGER) TO service_role;
@@ -0,0 +1,16 @@
+-- supabase/migrations/20251210010000_add_open_matches_index.sql
+
+-- Partial index for the tournament completion sweep
+-- (scripts/maintenance/update_tournament_status.py). The sweep asks "does this
+-- tournament still have an unfinished match?" for every open tournament each
+-- minute; only unfinished matches are indexed, so the probe stays small no
+-- matter how many completed matches accumulate.
+
+CREATE INDEX IF NOT EXISTS idx_matches_open_by_tournament
+ON public.matches (tournament_id)
+WHERE status <> 'completed';
+
+-- The sweep records the champion it resolves (the app's completion hook writes
+-- the same column)
+ALTER TABLE public.tournaments
+ADD COLUMN IF NOT EXISTS winner_id UUID REFERENCES public.users(id) ON DELETE SET NULL;
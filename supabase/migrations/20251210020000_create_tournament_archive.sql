@@ -0,0 +1,65 @@
+-- supabase/migrations/20251210020000_create_tournament_archive.sql
+
+-- Archive storage for old tournaments, filled by
+-- scripts/database_utils/archive_tournaments.py in bounded chunks.
+--
+-- archive.<table>           moved rows, same columns as public.<table> + archived_at
+-- archive.detached_links    rows kept in public (elo_history, spa_transactions, ...)
+--                           whose tournament/match reference was cleared
+-- archive.archival_runs     resumable checkpoint per job
+--
+-- The archive schema is not exposed through PostgREST.
+
+CREATE SCHEMA IF NOT EXISTS archive;
+REVOKE ALL ON SCHEMA archive FROM anon, authenticated;
+
+DO $$
+DECLARE
+  t TEXT;
+BEGIN
+  FOREACH t IN ARRAY ARRAY[
+    'tournaments', 'matches', 'tournament_participants',
+    'tournament_results', 'tournament_completion_logs',
+    'tournament_payments', 'tournament_result_history'
+  ] LOOP
+    IF to_regclass('public.' || t) IS NOT NULL AND to_regclass('archive.' || t) IS NULL THEN
+      EXECUTE format('CREATE TABLE archive.%I (LIKE public.%I INCLUDING DEFAULTS)', t, t);
+      EXECUTE format(
+        'ALTER TABLE archive.%I ADD PRIMARY KEY (id), '
+        'ADD COLUMN archived_at TIMESTAMPTZ NOT NULL DEFAULT NOW()', t
+      );
+      IF t <> 'tournaments' THEN
+        EXECUTE format('CREATE INDEX ON archive.%I (tournament_id)', t);
+      END IF;
+    END IF;
+  END LOOP;
+END
+$$;
+
+CREATE TABLE IF NOT EXISTS archive.detached_links (
+  table_name TEXT NOT NULL,
+  column_name TEXT NOT NULL,
+  row_id TEXT NOT NULL,
+  parent_id UUID NOT NULL,
+  archived_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  PRIMARY KEY (table_name, column_name, row_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_detached_links_parent ON archive.detached_links (parent_id);
+
+CREATE TABLE IF NOT EXISTS archive.archival_runs (
+  job TEXT PRIMARY KEY,
+  cutoff TIMESTAMPTZ NOT NULL,
+  last_tournament_id UUID,
+  tournaments_archived BIGINT NOT NULL DEFAULT 0,
+  rows_moved BIGINT NOT NULL DEFAULT 0,
+  rows_detached BIGINT NOT NULL DEFAULT 0,
+  started_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  finished_at TIMESTAMPTZ
+);
+
+-- Candidate lookup: completed tournaments by id
+CREATE INDEX IF NOT EXISTS idx_tournaments_completed_id
+ON public.tournaments (id)
+WHERE status = 'completed';
@@ -0,0 +1,149 @@
+-- supabase/migrations/20251210030000_create_leaderboard_snapshots.sql
+
+-- Precomputed leaderboards, filled by
+-- scripts/database_utils/leaderboard_builder.py.
+--
+-- get_leaderboard() ranks every user with total_matches > 0 on each call and
+-- orders by a CASE expression no index can serve. The snapshot keeps one row
+-- per (board_type, player) with the value that board sorts by, so a read is an
+-- index scan that stops after limit_count rows - with or without rank filter.
+--
+-- leaderboard_snapshots          board_type, player_id, rank, sort_value
+-- leaderboard_dirty_users        users whose ranking columns changed since the
+--                                last refresh (filled by trigger, drained by
+--                                the builder)
+-- get_leaderboard_snapshot()     same signature and result as get_leaderboard()
+
+CREATE TABLE IF NOT EXISTS public.leaderboard_snapshots (
+  board_type TEXT NOT NULL CHECK (board_type IN ('elo', 'wins', 'tournaments', 'spa_points')),
+  player_id UUID NOT NULL,
+  rank TEXT,
+  sort_value INTEGER NOT NULL,
+  PRIMARY KEY (player_id, board_type)
+);
+
+CREATE INDEX IF NOT EXISTS idx_leaderboard_snapshots_board
+  ON public.leaderboard_snapshots (board_type, sort_value DESC, player_id);
+CREATE INDEX IF NOT EXISTS idx_leaderboard_snapshots_board_rank
+  ON public.leaderboard_snapshots (board_type, rank, sort_value DESC, player_id);
+
+CREATE TABLE IF NOT EXISTS public.leaderboard_dirty_users (
+  user_id UUID PRIMARY KEY,
+  changed_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- Only reachable through get_leaderboard_snapshot() / the builder
+ALTER TABLE public.leaderboard_snapshots ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.leaderboard_dirty_users ENABLE ROW LEVEL SECURITY;
+
+-- users.updated_at is not touched by the match stat updates, so changes are
+-- tracked here instead
+CREATE OR REPLACE FUNCTION public.mark_leaderboard_dirty()
+RETURNS TRIGGER
+SECURITY DEFINER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  INSERT INTO public.leaderboard_dirty_users (user_id)
+  VALUES (CASE WHEN TG_OP = 'DELETE' THEN OLD.id ELSE NEW.id END)
+  ON CONFLICT (user_id) DO NOTHING;
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trigger_leaderboard_dirty_update ON public.users;
+CREATE TRIGGER trigger_leaderboard_dirty_update
+  AFTER UPDATE OF elo_rating, wins, tournament_wins, spa_points, rank, total_matches ON public.users
+  FOR EACH ROW
+  WHEN (OLD.elo_rating IS DISTINCT FROM NEW.elo_rating
+     OR OLD.wins IS DISTINCT FROM NEW.wins
+     OR OLD.tournament_wins IS DISTINCT FROM NEW.tournament_wins
+     OR OLD.spa_points IS DISTINCT FROM NEW.spa_points
+     OR OLD.rank IS DISTINCT FROM NEW.rank
+     OR OLD.total_matches IS DISTINCT FROM NEW.total_matches)
+  EXECUTE FUNCTION public.mark_leaderboard_dirty();
+
+DROP TRIGGER IF EXISTS trigger_leaderboard_dirty_delete ON public.users;
+CREATE TRIGGER trigger_leaderboard_dirty_delete
+  AFTER DELETE ON public.users
+  FOR EACH ROW
+  EXECUTE FUNCTION public.mark_leaderboard_dirty();
+
+-- Same result columns as get_leaderboard(); ranks are the row order of the
+-- index scan (ties broken by player_id). Falls back to the live function
+-- while the snapshot for a board has not been built yet.
+CREATE OR REPLACE FUNCTION public.get_leaderboard_snapshot(
+  board_type TEXT DEFAULT 'elo',
+  rank_filter TEXT DEFAULT NULL,
+  limit_count INTEGER DEFAULT 20
+)
+RETURNS TABLE(
+  rank INTEGER,
+  player_id UUID,
+  username TEXT,
+  display_name TEXT,
+  player_rank TEXT,
+  elo_rating INTEGER,
+  total_wins INTEGER,
+  tournament_wins INTEGER,
+  spa_points INTEGER,
+  win_rate DECIMAL(5,2),
+  recent_activity TEXT,
+  avatar_url TEXT
+)
+SECURITY DEFINER
+STABLE
+LANGUAGE plpgsql
+AS $$
+#variable_conflict use_column
+DECLARE
+  v_board TEXT := CASE
+    WHEN get_leaderboard_snapshot.board_type IN ('elo', 'wins', 'tournaments', 'spa_points')
+    THEN get_leaderboard_snapshot.board_type ELSE 'elo' END;
+BEGIN
+  RETURN QUERY
+  SELECT
+    (ROW_NUMBER() OVER (ORDER BY s.sort_value DESC, s.player_id))::INTEGER,
+    u.id,
+    u.username,
+    u.display_name,
+    u.rank,
+    u.elo_rating,
+    u.wins,
+    u.tournament_wins,
+    COALESCE(u.spa_points, 1000),
+    CASE WHEN u.total_matches > 0
+      THEN ROUND((u.wins::DECIMAL / u.total_matches::DECIMAL) * 100, 2)
+      ELSE 0.00 END,
+    CASE
+      WHEN u.last_seen >= NOW() - INTERVAL '7 days' THEN 'Very Active'
+      WHEN u.last_seen >= NOW() - INTERVAL '30 days' THEN 'Active'
+      WHEN u.last_seen >= NOW() - INTERVAL '90 days' THEN 'Somewhat Active'
+      ELSE 'Inactive'
+    END,
+    u.avatar_url
+  FROM (
+    SELECT ls.player_id, ls.sort_value
+    FROM public.leaderboard_snapshots ls
+    WHERE ls.board_type = v_board
+      AND (get_leaderboard_snapshot.rank_filter IS NULL OR ls.rank = get_leaderboard_snapshot.rank_filter)
+    ORDER BY ls.sort_value DESC, ls.player_id
+    LIMIT get_leaderboard_snapshot.limit_count
+  ) s
+  JOIN public.users u ON u.id = s.player_id
+  ORDER BY s.sort_value DESC, s.player_id;
+
+  IF NOT FOUND AND NOT EXISTS (
+    SELECT 1 FROM public.leaderboard_snapshots ls WHERE ls.board_type = v_board
+  ) THEN
+    RETURN QUERY SELECT * FROM public.get_leaderboard(
+      get_leaderboard_snapshot.board_type,
+      get_leaderboard_snapshot.rank_filter,
+      get_leaderboard_snapshot.limit_count
+    );
+  END IF;
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION public.get_leaderboard_snapshot(TEXT, TEXT, INTEGER) TO authenticated;
+GRANT EXECUTE ON FUNCTION public.get_leaderboard_snapshot(TEXT, TEXT, INTEGER) TO anon;
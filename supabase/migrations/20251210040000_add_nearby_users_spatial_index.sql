@@ -0,0 +1,92 @@
+-- supabase/migrations/20251210040000_add_nearby_users_spatial_index.sql
+
+-- Spatial index for find_nearby_users().
+--
+-- The original function computes earth_distance() for every user with
+-- coordinates, twice (filter and sort). Here:
+--
+-- idx_users_ll_to_earth       GiST (cube) index on ll_to_earth(latitude, longitude)
+-- find_nearby_users()         same signature and result; earth_box() @> point
+--                             prefilter served by the index, distance computed
+--                             once and only for the rows inside the box
+-- find_nearby_user_ids()      id + distance only, nearest first, with a limit -
+--                             for lists that load the profiles they show
+--
+-- earth_box() is a cube around the sphere of the radius, so it keeps a few
+-- rows just outside the radius; the exact earth_distance() check stays.
+-- Latency at 10k / 100k / 1M users: scripts/load_testing/nearby_search_benchmark.py
+
+CREATE EXTENSION IF NOT EXISTS cube;
+CREATE EXTENSION IF NOT EXISTS earthdistance;
+
+-- Must match the expression used in the functions below exactly
+CREATE INDEX IF NOT EXISTS idx_users_ll_to_earth
+  ON public.users USING gist (ll_to_earth(latitude::float8, longitude::float8))
+  WHERE latitude IS NOT NULL AND longitude IS NOT NULL;
+
+CREATE OR REPLACE FUNCTION find_nearby_users(
+  current_user_id UUID,
+  user_lat DECIMAL(10, 8),
+  user_lon DECIMAL(11, 8),
+  radius_km REAL
+)
+RETURNS SETOF users AS $$
+DECLARE
+  radius_meters REAL;
+BEGIN
+  -- Convert radius from kilometers to meters
+  radius_meters := radius_km * 1000;
+
+  RETURN QUERY
+  SELECT u.*
+  FROM users u
+  CROSS JOIN LATERAL (
+    SELECT earth_distance(
+      ll_to_earth(user_lat, user_lon),
+      ll_to_earth(u.latitude::float8, u.longitude::float8)
+    ) AS meters
+  ) d
+  WHERE
+    u.latitude IS NOT NULL AND
+    u.longitude IS NOT NULL AND
+    earth_box(ll_to_earth(user_lat, user_lon), radius_meters)
+      @> ll_to_earth(u.latitude::float8, u.longitude::float8) AND
+    u.id != current_user_id AND
+    d.meters <= radius_meters
+  ORDER BY d.meters;
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+CREATE OR REPLACE FUNCTION find_nearby_user_ids(
+  current_user_id UUID,
+  user_lat DECIMAL(10, 8),
+  user_lon DECIMAL(11, 8),
+  radius_km REAL,
+  limit_count INTEGER DEFAULT 50
+)
+RETURNS TABLE(user_id UUID, distance_km DOUBLE PRECISION) AS $$
+DECLARE
+  radius_meters REAL;
+BEGIN
+  radius_meters := radius_km * 1000;
+
+  RETURN QUERY
+  SELECT u.id, d.meters / 1000
+  FROM users u
+  CROSS JOIN LATERAL (
+    SELECT earth_distance(
+      ll_to_earth(user_lat, user_lon),
+      ll_to_earth(u.latitude::float8, u.longitude::float8)
+    ) AS meters
+  ) d
+  WHERE
+    u.latitude IS NOT NULL AND
+    u.longitude IS NOT NULL AND
+    earth_box(ll_to_earth(user_lat, user_lon), radius_meters)
+      @> ll_to_earth(u.latitude::float8, u.longitude::float8) AND
+    u.id != current_user_id AND
+    d.meters <= radius_meters
+  ORDER BY d.meters
+  LIMIT limit_count;
+END;
+$$ LANGUAGE plpgsql STABLE;
@@ -0,0 +1,219 @@
+-- supabase/migrations/20251210050000_create_user_geo_buckets.sql
+
+-- Geohash buckets for the "find opponents" tab (optional, independent of
+-- 20251210040000_add_nearby_users_spatial_index.sql).
+--
+-- Every user with coordinates gets one row keyed by a 6-character geohash
+-- (~1.2 x 0.6 km cell) plus a copy of the coordinates, kept in sync by a
+-- trigger on users. A search turns the radius into the handful of cells
+-- covering its bounding box, range-scans those prefixes on a btree and checks
+-- the exact distance on the bucket rows only - no access to the wide users
+-- rows until the app loads the profiles it shows.
+--
+-- user_geo_buckets                user_id, geohash, latitude, longitude
+-- geohash_encode()                standard base32 geohash
+-- geohash_cover()                 cells covering a radius, precision picked so
+--                                 a handful of cells cover it
+-- find_nearby_users_bucketed()    same result as find_nearby_user_ids()
+--
+-- Coordinates across the antimeridian are not covered (not needed for VN).
+
+CREATE EXTENSION IF NOT EXISTS cube;
+CREATE EXTENSION IF NOT EXISTS earthdistance;
+
+CREATE OR REPLACE FUNCTION public.geohash_encode(
+  lat DOUBLE PRECISION,
+  lon DOUBLE PRECISION,
+  chars INTEGER DEFAULT 6
+)
+RETURNS TEXT
+IMMUTABLE
+STRICT
+PARALLEL SAFE
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  base32 CONSTANT TEXT := '0123456789bcdefghjkmnpqrstuvwxyz';
+  lat_lo DOUBLE PRECISION := -90;
+  lat_hi DOUBLE PRECISION := 90;
+  lon_lo DOUBLE PRECISION := -180;
+  lon_hi DOUBLE PRECISION := 180;
+  mid DOUBLE PRECISION;
+  even_bit BOOLEAN := TRUE;
+  bits INTEGER := 0;
+  ch INTEGER := 0;
+  result TEXT := '';
+BEGIN
+  -- Bits alternate longitude / latitude, 5 bits per character
+  WHILE length(result) < chars LOOP
+    IF even_bit THEN
+      mid := (lon_lo + lon_hi) / 2;
+      IF lon >= mid THEN
+        ch := ch * 2 + 1;
+        lon_lo := mid;
+      ELSE
+        ch := ch * 2;
+        lon_hi := mid;
+      END IF;
+    ELSE
+      mid := (lat_lo + lat_hi) / 2;
+      IF lat >= mid THEN
+        ch := ch * 2 + 1;
+        lat_lo := mid;
+      ELSE
+        ch := ch * 2;
+        lat_hi := mid;
+      END IF;
+    END IF;
+    even_bit := NOT even_bit;
+    bits := bits + 1;
+    IF bits = 5 THEN
+      result := result || substr(base32, ch + 1, 1);
+      bits := 0;
+      ch := 0;
+    END IF;
+  END LOOP;
+  RETURN result;
+END;
+$$;
+
+-- Cells of the largest precision (<= 6) whose cells are at least a quarter
+-- of the box side, so at most 4-5 cells per axis. Sampling the box every
+-- cell size hits every cell that intersects it.
+CREATE OR REPLACE FUNCTION public.geohash_cover(
+  lat DOUBLE PRECISION,
+  lon DOUBLE PRECISION,
+  radius_km DOUBLE PRECISION
+)
+RETURNS TABLE(cell TEXT)
+IMMUTABLE
+STRICT
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  dlat DOUBLE PRECISION := radius_km / 111.2;
+  dlon DOUBLE PRECISION := LEAST(radius_km / (111.2 * GREATEST(cos(radians(lat)), 0.01)), 180);
+  chars INTEGER := 6;
+  cell_h DOUBLE PRECISION;
+  cell_w DOUBLE PRECISION;
+BEGIN
+  LOOP
+    cell_h := 180 / 2 ^ floor(chars * 5 / 2.0);
+    cell_w := 360 / 2 ^ ceil(chars * 5 / 2.0);
+    EXIT WHEN chars = 1 OR (cell_h >= dlat / 2 AND cell_w >= dlon / 2);
+    chars := chars - 1;
+  END LOOP;
+
+  RETURN QUERY
+  SELECT DISTINCT public.geohash_encode(
+    LEAST(GREATEST(y, -90), 90),
+    LEAST(GREATEST(x, -180), 180 - 1e-9),
+    chars)
+  FROM (
+    SELECT LEAST(lat - dlat + i * cell_h, lat + dlat) AS y
+    FROM generate_series(0, ceil(2 * dlat / cell_h)::INTEGER) i
+  ) ys
+  CROSS JOIN (
+    SELECT LEAST(lon - dlon + j * cell_w, lon + dlon) AS x
+    FROM generate_series(0, ceil(2 * dlon / cell_w)::INTEGER) j
+  ) xs;
+END;
+$$;
+
+CREATE TABLE IF NOT EXISTS public.user_geo_buckets (
+  user_id UUID PRIMARY KEY REFERENCES public.users(id) ON DELETE CASCADE,
+  geohash TEXT COLLATE "C" NOT NULL,
+  latitude DOUBLE PRECISION NOT NULL,
+  longitude DOUBLE PRECISION NOT NULL,
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- Prefix range scans; the covering columns avoid a heap visit per candidate
+CREATE INDEX IF NOT EXISTS idx_user_geo_buckets_geohash
+  ON public.user_geo_buckets (geohash) INCLUDE (user_id, latitude, longitude);
+
+-- Only reachable through find_nearby_users_bucketed()
+ALTER TABLE public.user_geo_buckets ENABLE ROW LEVEL SECURITY;
+
+CREATE OR REPLACE FUNCTION public.sync_user_geo_bucket()
+RETURNS TRIGGER
+SECURITY DEFINER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  IF NEW.latitude IS NULL OR NEW.longitude IS NULL THEN
+    DELETE FROM public.user_geo_buckets WHERE user_id = NEW.id;
+  ELSE
+    INSERT INTO public.user_geo_buckets (user_id, geohash, latitude, longitude)
+    VALUES (NEW.id, public.geohash_encode(NEW.latitude, NEW.longitude),
+            NEW.latitude, NEW.longitude)
+    ON CONFLICT (user_id) DO UPDATE SET
+      geohash = EXCLUDED.geohash,
+      latitude = EXCLUDED.latitude,
+      longitude = EXCLUDED.longitude,
+      updated_at = NOW();
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trigger_user_geo_bucket_insert ON public.users;
+CREATE TRIGGER trigger_user_geo_bucket_insert
+  AFTER INSERT ON public.users
+  FOR EACH ROW
+  WHEN (NEW.latitude IS NOT NULL AND NEW.longitude IS NOT NULL)
+  EXECUTE FUNCTION public.sync_user_geo_bucket();
+
+DROP TRIGGER IF EXISTS trigger_user_geo_bucket_update ON public.users;
+CREATE TRIGGER trigger_user_geo_bucket_update
+  AFTER UPDATE OF latitude, longitude ON public.users
+  FOR EACH ROW
+  WHEN (OLD.latitude IS DISTINCT FROM NEW.latitude
+     OR OLD.longitude IS DISTINCT FROM NEW.longitude)
+  EXECUTE FUNCTION public.sync_user_geo_bucket();
+
+-- Backfill (deletes cascade from users)
+INSERT INTO public.user_geo_buckets (user_id, geohash, latitude, longitude)
+SELECT id, public.geohash_encode(latitude, longitude), latitude, longitude
+FROM public.users
+WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+ON CONFLICT (user_id) DO UPDATE SET
+  geohash = EXCLUDED.geohash,
+  latitude = EXCLUDED.latitude,
+  longitude = EXCLUDED.longitude,
+  updated_at = NOW();
+
+CREATE OR REPLACE FUNCTION public.find_nearby_users_bucketed(
+  current_user_id UUID,
+  user_lat DECIMAL(10, 8),
+  user_lon DECIMAL(11, 8),
+  radius_km REAL,
+  limit_count INTEGER DEFAULT 50
+)
+RETURNS TABLE(user_id UUID, distance_km DOUBLE PRECISION)
+SECURITY DEFINER
+STABLE
+LANGUAGE plpgsql
+AS $$
+#variable_conflict use_column
+BEGIN
+  RETURN QUERY
+  SELECT b.user_id, d.meters / 1000
+  FROM public.geohash_cover(user_lat, user_lon, radius_km) c
+  JOIN public.user_geo_buckets b
+    ON b.geohash >= c.cell COLLATE "C"
+   AND b.geohash < (c.cell || '~') COLLATE "C"
+  CROSS JOIN LATERAL (
+    SELECT earth_distance(
+      ll_to_earth(user_lat, user_lon),
+      ll_to_earth(b.latitude, b.longitude)
+    ) AS meters
+  ) d
+  WHERE b.user_id != current_user_id
+    AND d.meters <= radius_km * 1000
+  ORDER BY d.meters
+  LIMIT limit_count;
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION public.find_nearby_users_bucketed(UUID, DECIMAL, DECIMAL, REAL, INTEGER) TO authenticated;
@@ -0,0 +1,136 @@
+-- supabase/migrations/20251210060000_add_table_reservation_overlap_guard.sql
+
+-- Range-based conflict detection for table reservations.
+--
+-- is_table_available() counted overlaps with a three-way OR on start/end
+-- that no index serves, and get_available_tables() called it once per table
+-- via generate_series. Here:
+--
+-- table_reservations_no_overlap    GiST exclusion constraint: two active
+--                                  reservations (not cancelled / no_show) of
+--                                  the same club table cannot overlap
+-- is_table_available()             same signature, one probe of that index
+-- get_available_tables()           same signature, one index scan for all
+--                                  tables
+-- get_table_availability_day()     every hourly slot of a day with its free
+--                                  tables in one query, like
+--                                  TableReservationService.getAvailableSlots
+--
+-- Ranges are half-open [start, end), the same overlap rule as before: a
+-- reservation ending at 10:00 does not block one starting at 10:00.
+--
+-- Adding the constraint fails while overlapping reservations exist; run
+-- `python _SCRIPTS_ORGANIZED/other/table_reservation_engine.py check` first
+-- (`deploy` does both).
+
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+
+DO $$
+BEGIN
+  IF NOT EXISTS (
+    SELECT 1 FROM pg_constraint WHERE conname = 'table_reservations_no_overlap'
+  ) THEN
+    ALTER TABLE public.table_reservations
+      ADD CONSTRAINT table_reservations_no_overlap
+      EXCLUDE USING gist (
+        club_id WITH =,
+        table_number WITH =,
+        tstzrange(start_time, end_time, '[)') WITH &&
+      ) WHERE (status NOT IN ('cancelled', 'no_show'));
+  END IF;
+END $$;
+
+-- Queries below repeat the constraint's expression and predicate so the
+-- planner can use its index
+
+CREATE OR REPLACE FUNCTION public.is_table_available(
+  p_club_id UUID,
+  p_table_number INT,
+  p_start_time TIMESTAMPTZ,
+  p_end_time TIMESTAMPTZ
+)
+RETURNS BOOLEAN AS $$
+BEGIN
+  RETURN NOT EXISTS (
+    SELECT 1
+    FROM public.table_reservations r
+    WHERE r.club_id = p_club_id
+      AND r.table_number = p_table_number
+      AND r.status NOT IN ('cancelled', 'no_show')
+      AND tstzrange(r.start_time, r.end_time, '[)') && tstzrange(p_start_time, p_end_time, '[)')
+  );
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+CREATE OR REPLACE FUNCTION public.get_available_tables(
+  p_club_id UUID,
+  p_start_time TIMESTAMPTZ,
+  p_end_time TIMESTAMPTZ
+)
+RETURNS TABLE(table_number INT) AS $$
+BEGIN
+  RETURN QUERY
+  SELECT t.table_num
+  FROM generate_series(1, (SELECT total_tables FROM public.clubs WHERE id = p_club_id)) t(table_num)
+  WHERE t.table_num NOT IN (
+    SELECT r.table_number
+    FROM public.table_reservations r
+    WHERE r.club_id = p_club_id
+      AND r.status NOT IN ('cancelled', 'no_show')
+      AND tstzrange(r.start_time, r.end_time, '[)') && tstzrange(p_start_time, p_end_time, '[)')
+  )
+  ORDER BY t.table_num;
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+-- Slots start every hour from p_first_hour to p_last_hour - 1 (local time)
+-- and last p_duration_hours. The day's reservations are read once.
+CREATE OR REPLACE FUNCTION public.get_table_availability_day(
+  p_club_id UUID,
+  p_date DATE,
+  p_duration_hours NUMERIC DEFAULT 2,
+  p_first_hour INT DEFAULT 8,
+  p_last_hour INT DEFAULT 22,
+  p_timezone TEXT DEFAULT 'Asia/Ho_Chi_Minh'
+)
+RETURNS TABLE(slot_start TIMESTAMPTZ, slot_end TIMESTAMPTZ, available_tables INT[]) AS $$
+DECLARE
+  v_length INTERVAL := make_interval(secs => p_duration_hours * 3600);
+  v_day TSTZRANGE := tstzrange(
+    (p_date + make_time(p_first_hour, 0, 0)) AT TIME ZONE p_timezone,
+    (p_date + make_time(p_last_hour - 1, 0, 0)) AT TIME ZONE p_timezone + v_length,
+    '[)'
+  );
+BEGIN
+  RETURN QUERY
+  WITH slots AS (
+    SELECT (p_date + make_time(h, 0, 0)) AT TIME ZONE p_timezone AS starts_at
+    FROM generate_series(p_first_hour, p_last_hour - 1) h
+  ),
+  booked AS MATERIALIZED (
+    SELECT r.table_number AS table_num, tstzrange(r.start_time, r.end_time, '[)') AS span
+    FROM public.table_reservations r
+    WHERE r.club_id = p_club_id
+      AND r.status NOT IN ('cancelled', 'no_show')
+      AND tstzrange(r.start_time, r.end_time, '[)') && v_day
+  )
+  SELECT
+    s.starts_at,
+    s.starts_at + v_length,
+    COALESCE(array_agg(t.table_num ORDER BY t.table_num) FILTER (
+      WHERE NOT EXISTS (
+        SELECT 1 FROM booked b
+        WHERE b.table_num = t.table_num
+          AND b.span && tstzrange(s.starts_at, s.starts_at + v_length, '[)')
+      )
+    ), '{}')
+  FROM slots s
+  CROSS JOIN generate_series(1, (SELECT total_tables FROM public.clubs WHERE id = p_club_id)) t(table_num)
+  GROUP BY s.starts_at
+  ORDER BY s.starts_at;
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+COMMENT ON CONSTRAINT table_reservations_no_overlap ON public.table_reservations
+  IS 'Active reservations of the same club table cannot overlap';
+COMMENT ON FUNCTION public.get_table_availability_day IS 'Hourly slots of a day with the tables free for the whole slot';
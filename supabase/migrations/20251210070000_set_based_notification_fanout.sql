@@ -0,0 +1,204 @@
+-- supabase/migrations/20251210070000_set_based_notification_fanout.sql
+
+-- Set-based notification inserts.
+--
+-- send_batch_notifications() (sql_migrations/create_notification_functions.sql)
+-- looped over jsonb_array_elements() with one INSERT per element, and the
+-- tournament triggers (20250125_add_tournament_notification_triggers.sql)
+-- looped over participants / club members the same way. Same rows, same
+-- signatures, one INSERT ... SELECT each:
+--
+-- send_batch_notifications()          jsonb_to_recordset() → one INSERT
+-- notify_tournament_created()         club members, one INSERT
+-- notify_tournament_started()         participants, one INSERT
+-- notify_tournament_completed()       participants, one INSERT
+-- notify_tournament_match_created()   now a statement trigger over the
+--                                     inserted matches (transition table), so
+--                                     a bracket inserted in one statement
+--                                     notifies every player in one INSERT
+--
+-- Bulk sends from scripts: scripts/database_utils/notification_dispatcher.py
+
+CREATE OR REPLACE FUNCTION send_batch_notifications(
+  p_notifications JSONB
+)
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  v_count INTEGER;
+BEGIN
+  INSERT INTO notifications (
+    user_id,
+    title,
+    message,
+    type,
+    data,
+    is_read,
+    is_dismissed,
+    created_at
+  )
+  SELECT
+    n.user_id,
+    n.title,
+    n.message,
+    n.type,
+    COALESCE(n.data, '{}'::jsonb),
+    false,
+    false,
+    NOW()
+  FROM jsonb_to_recordset(p_notifications)
+    AS n(user_id UUID, title TEXT, message TEXT, type TEXT, data JSONB);
+
+  GET DIAGNOSTICS v_count = ROW_COUNT;
+  RETURN v_count;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION notify_tournament_created()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_club_name text;
+    v_creator_name text;
+BEGIN
+    SELECT
+        c.name,
+        u.display_name
+    INTO v_club_name, v_creator_name
+    FROM clubs c
+    LEFT JOIN users u ON u.id = NEW.organizer_id
+    WHERE c.id = NEW.club_id;
+
+    INSERT INTO notifications (user_id, type, title, message, data, created_at)
+    SELECT
+        cm.user_id,
+        'tournament',
+        '🏆 Giải đấu mới!',
+        format('%s vừa tạo giải đấu "%s" tại %s. Hãy đăng ký tham gia ngay!',
+            COALESCE(v_creator_name, 'Admin'),
+            NEW.title,
+            COALESCE(v_club_name, 'club')
+        ),
+        jsonb_build_object(
+            'tournament_id', NEW.id,
+            'club_id', NEW.club_id,
+            'tournament_name', NEW.title,
+            'start_date', NEW.start_date,
+            'max_players', NEW.max_participants
+        ),
+        NOW()
+    FROM club_members cm
+    WHERE cm.club_id = NEW.club_id
+    AND cm.user_id != NEW.organizer_id
+    AND cm.status = 'active';
+
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+CREATE OR REPLACE FUNCTION notify_tournament_started()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_club_name text;
+BEGIN
+    -- Chỉ trigger khi status chuyển sang 'ongoing'
+    IF OLD.status != 'ongoing' AND NEW.status = 'ongoing' THEN
+        SELECT c.name INTO v_club_name FROM clubs c WHERE c.id = NEW.club_id;
+
+        INSERT INTO notifications (user_id, type, title, message, data, created_at)
+        SELECT
+            tp.user_id,
+            'tournament_started',
+            'Giải đấu đã bắt đầu! 🎱',
+            format('Giải đấu "%s" tại %s đã bắt đầu! Vào xem lịch thi đấu của bạn.',
+                NEW.title,
+                COALESCE(v_club_name, 'club')
+            ),
+            jsonb_build_object(
+                'tournament_id', NEW.id,
+                'club_id', NEW.club_id,
+                'tournament_name', NEW.title
+            ),
+            NOW()
+        FROM tournament_participants tp
+        WHERE tp.tournament_id = NEW.id;
+    END IF;
+
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+CREATE OR REPLACE FUNCTION notify_tournament_completed()
+RETURNS TRIGGER AS $$
+BEGIN
+    -- Chỉ trigger khi status chuyển sang 'completed'
+    IF OLD.status != 'completed' AND NEW.status = 'completed' THEN
+        INSERT INTO notifications (user_id, type, title, message, data, created_at)
+        SELECT
+            tp.user_id,
+            'tournament_completed',
+            'Giải đấu đã kết thúc! 🏆',
+            format('Giải đấu "%s" đã kết thúc! Vào xem kết quả chi tiết.', NEW.title),
+            jsonb_build_object(
+                'tournament_id', NEW.id,
+                'club_id', NEW.club_id,
+                'tournament_name', NEW.title
+            ),
+            NOW()
+        FROM tournament_participants tp
+        WHERE tp.tournament_id = NEW.id;
+    END IF;
+
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- One row per (match, player) of every tournament match in the statement;
+-- the opponent is the other slot
+CREATE OR REPLACE FUNCTION notify_tournament_match_created()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO notifications (user_id, type, title, message, data, created_at)
+    SELECT
+        p.player_id,
+        'tournament_match',
+        '🎱 Trận đấu mới trong giải!',
+        format('Bạn có trận đấu với %s trong giải "%s". %s',
+            COALESCE(opp.display_name, 'đối thủ'),
+            t.title,
+            CASE
+                WHEN m.scheduled_time IS NOT NULL THEN
+                    format('Thời gian: %s', to_char(m.scheduled_time, 'DD/MM HH24:MI'))
+                ELSE 'Vào xem chi tiết.'
+            END
+        ),
+        jsonb_build_object(
+            'match_id', m.id,
+            'tournament_id', m.tournament_id,
+            'tournament_name', t.title,
+            'opponent_id', p.opponent_id,
+            'opponent_name', opp.display_name,
+            'scheduled_time', m.scheduled_time
+        ),
+        NOW()
+    FROM new_matches m
+    LEFT JOIN tournaments t ON t.id = m.tournament_id
+    CROSS JOIN LATERAL (
+        VALUES (m.player1_id, m.player2_id), (m.player2_id, m.player1_id)
+    ) AS p(player_id, opponent_id)
+    LEFT JOIN users opp ON opp.id = p.opponent_id
+    WHERE m.tournament_id IS NOT NULL
+    AND p.player_id IS NOT NULL;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+DROP TRIGGER IF EXISTS trigger_notify_tournament_match_created ON matches;
+CREATE TRIGGER trigger_notify_tournament_match_created
+    AFTER INSERT ON matches
+    REFERENCING NEW TABLE AS new_matches
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION notify_tournament_match_created();